@@ -1,182 +1,145 @@
-from fastapi import FastAPI, HTTPException
-import requests
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Query
+from typing import Optional
 import os
 
-app = FastAPI()
+from models.amadeus_models import (
+    ActivitiesQuery, CitySearchQuery, FlightOffersQuery, HotelOffersQuery, NearbyQuery
+)
+from services.amadeus_auth import AmadeusTokenManager
+from services.amadeus_client import AmadeusClient, AmadeusError
+from services.reference_data import ReferenceDataStore
 
 # Amadeus API credentials
 AMADEUS_CLIENT_ID = os.getenv("AMADEUS_CLIENT_ID")
 AMADEUS_CLIENT_SECRET = os.getenv("AMADEUS_CLIENT_SECRET")
-AMADEUS_API_URL = "https://test.api.amadeus.com"  # Sandbox environment
-
-# Helper function to get access token
-def get_amadeus_token():
-    url = f"{AMADEUS_API_URL}/v1/security/oauth2/token"
-    payload = {
-        "grant_type": "client_credentials",
-        "client_id": AMADEUS_CLIENT_ID,
-        "client_secret": AMADEUS_CLIENT_SECRET
-    }
-    headers = {"Content-Type": "application/x-www-form-urlencoded"}
-    response = requests.post(url, data=payload, headers=headers)
-    if response.status_code == 200:
-        return response.json()["access_token"]
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Failed to obtain access token")
+AMADEUS_API_URL = os.getenv("AMADEUS_API_URL", "https://test.api.amadeus.com")  # Sandbox environment
+
+# Cached OAuth token, refreshed ahead of expiry and shared by all requests
+token_manager = AmadeusTokenManager(AMADEUS_CLIENT_ID, AMADEUS_CLIENT_SECRET, AMADEUS_API_URL)
+
+# Pooled, rate-limited client; honours UPSTREAM_MODE record/replay
+amadeus = AmadeusClient(token_manager)
+
+# Airlines, airports and routes served from memory; refreshed from Amadeus every REFERENCE_DATA_TTL
+reference_data = ReferenceDataStore(amadeus)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    reference_data.load()
+    reference_data.start()
+    yield
+    await reference_data.close()
+    await amadeus.aclose()
+
+app = FastAPI(lifespan=lifespan)
+
+# Helper function to turn client errors into HTTP errors
+async def amadeus_call(request, detail: str):
+    try:
+        return await request
+    except AmadeusError as e:
+        raise HTTPException(status_code=e.status_code or 502, detail=f"{detail}: {str(e)}")
+
+@app.get("/metrics")
+def get_client_metrics():
+    return {**amadeus.get_metrics(), "reference_data": reference_data.get_metrics()}
+
+def reference_response(data: list) -> dict:
+    return {"data": data, "meta": {"count": len(data)}}
 
 # ------------------------------
 # Flight APIs
 # ------------------------------
 
 @app.get("/flights/offer")
-def get_flight_offer():
-    token = get_amadeus_token()
-    url = f"{AMADEUS_API_URL}/v2/shopping/flight-offers"
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Failed to fetch flight offers")
+async def get_flight_offer(query: FlightOffersQuery = Depends()):
+    return await amadeus_call(amadeus.flight_offers(query), "Failed to fetch flight offers")
 
 # ------------------------------
 # Hotel APIs
 # ------------------------------
 
 @app.get("/hotels/search")
-def search_hotels():
-    token = get_amadeus_token()
-    url = f"{AMADEUS_API_URL}/v2/shopping/hotel-offers"
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Failed to search hotels")
+async def search_hotels(query: HotelOffersQuery = Depends()):
+    return await amadeus_call(amadeus.hotel_offers(query), "Failed to search hotels")
 
 # ------------------------------
 # Destination APIs
 # ------------------------------
 
 @app.get("/destinations/city")
-def get_city_info():
-    token = get_amadeus_token()
-    url = f"{AMADEUS_API_URL}/v1/reference-data/locations/cities"
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Failed to fetch city information")
+async def get_city_info(query: CitySearchQuery = Depends()):
+    return await amadeus_call(amadeus.cities(query), "Failed to fetch city information")
 
 # ------------------------------
 # Car APIs
 # ------------------------------
 
 @app.get("/cars/search")
-def search_cars():
-    token = get_amadeus_token()
-    url = f"{AMADEUS_API_URL}/v2/shopping/car-offers"
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Failed to search car offers")
+async def search_cars():
+    return await amadeus_call(amadeus.get("/v2/shopping/car-offers"), "Failed to search car offers")
 
 # ------------------------------
 # Airport APIs
 # ------------------------------
 
 @app.get("/airports/nearby")
-def get_nearby_airports():
-    token = get_amadeus_token()
-    url = f"{AMADEUS_API_URL}/v1/reference-data/locations/airports/nearby"
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Failed to fetch nearby airports")
+async def get_nearby_airports(query: NearbyQuery = Depends()):
+    return await amadeus_call(amadeus.nearby_airports(query), "Failed to fetch nearby airports")
 
 # ------------------------------
 # Travel Insights APIs
 # ------------------------------
 
 @app.get("/insights/most-traveled-destinations")
-def get_most_traveled_destinations():
-    token = get_amadeus_token()
-    url = f"{AMADEUS_API_URL}/v1/analytics/most-traveled-destinations"
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Failed to fetch travel insights")
+async def get_most_traveled_destinations():
+    return await amadeus_call(amadeus.get("/v1/analytics/most-traveled-destinations"), "Failed to fetch travel insights")
 
 # ------------------------------
 # Tours & Activities APIs
 # ------------------------------
 
 @app.get("/tours/activities")
-def get_tours_activities():
-    token = get_amadeus_token()
-    url = f"{AMADEUS_API_URL}/v1/activities/tours"
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Failed to fetch tours and activities")
+async def get_tours_activities(query: ActivitiesQuery = Depends()):
+    return await amadeus_call(amadeus.activities(query), "Failed to fetch tours and activities")
 
 # ------------------------------
 # Airport & City Search APIs
 # ------------------------------
 
+@app.get("/airports/search")
+def search_airports(q: str = Query(..., min_length=1, description="Start of an airport or city name"),
+                    limit: int = Query(10, ge=1, le=100)):
+    return reference_response(reference_data.search_airports(q, limit))
+
 @app.get("/airports/city")
-def get_airports_by_city():
-    token = get_amadeus_token()
-    url = f"{AMADEUS_API_URL}/v1/reference-data/locations/airports/by-city"
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Failed to fetch airports by city")
+async def get_airports_by_city(city: str = Query(..., min_length=2, description="City name or IATA city code")):
+    return reference_response(await amadeus_call(reference_data.airports_in_city(city), "Failed to fetch airports by city"))
 
 @app.get("/airports/route")
-def get_airport_routes():
-    token = get_amadeus_token()
-    url = f"{AMADEUS_API_URL}/v1/reference-data/locations/airports/routes"
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Failed to fetch airport routes")
+async def get_airport_routes(airport: str = Query(..., min_length=3, max_length=3, description="IATA airport code")):
+    destinations = await amadeus_call(reference_data.routes_from_airport(airport), "Failed to fetch airport routes")
+    return reference_response([reference_data.airport(code) or {"iata": code} for code in destinations or []])
 
 # ------------------------------
 # Airline APIs
 # ------------------------------
 
 @app.get("/airlines")
-def get_airlines():
-    token = get_amadeus_token()
-    url = f"{AMADEUS_API_URL}/v1/reference-data/locations/airlines"
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Failed to fetch airlines")
+def get_airlines(code: Optional[str] = Query(None, description="IATA or ICAO airline code"),
+                 q: Optional[str] = Query(None, description="Start of an airline name"),
+                 limit: int = Query(10, ge=1, le=100)):
+    if code:
+        airline = reference_data.airline(code)
+        if airline is None:
+            raise HTTPException(status_code=404, detail=f"Unknown airline: {code}")
+        return reference_response([airline])
+    if q:
+        return reference_response(reference_data.search_airlines(q, limit))
+    return reference_response(list(reference_data.airlines.values()))
 
 @app.get("/airlines/routes")
-def get_airline_routes():
-    token = get_amadeus_token()
-    url = f"{AMADEUS_API_URL}/v1/reference-data/locations/airlines/routes"
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Failed to fetch airline routes")
+async def get_airline_routes(airline: str = Query(..., min_length=2, max_length=3, description="IATA airline code")):
+    destinations = await amadeus_call(reference_data.routes_of_airline(airline), "Failed to fetch airline routes")
+    return reference_response([reference_data.airport(code) or {"iata": code} for code in destinations or []])
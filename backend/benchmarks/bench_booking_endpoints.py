@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Booking.com service calls against replayed upstream fixtures
+
+Runs the flights, hotels, attractions and taxi service functions with
+UPSTREAM_MODE=replay, so no network or API quota is used, and reports
+latency percentiles and throughput per call. Simulated upstream latency is
+set with UPSTREAM_REPLAY_LATENCY, e.g. UPSTREAM_REPLAY_LATENCY=lognormal:400,0.5.
+
+Usage: python benchmarks/bench_booking_endpoints.py [requests] [concurrency]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("UPSTREAM_MODE", "replay")
+logging.disable(logging.ERROR)
+
+from services import flights_service, hotels_service, attraction_service, taxi_service
+from services.upstream_fixtures import get_upstream_fixtures
+
+CALLS = {
+    "get_flights": lambda: flights_service.get_flights("BOM.AIRPORT", "DEL.AIRPORT", "2025-09-21"),
+    "get_flight_info": lambda: flights_service.get_flight_info("d6a1f_H4sIAAAAAAAA_0"),
+    "get_destination": lambda: hotels_service.get_destination("bangalore"),
+    "get_hotels_for_city": lambda: hotels_service.get_hotels_for_city("-2090174", "2025-09-22", "2025-09-24", "2", "1"),
+    "get_tourist_attractions": lambda: attraction_service.get_tourist_attractions("-2090174", "2025-09-22", "2025-09-24"),
+    "get_taxi_locations": lambda: taxi_service.get_taxi_locations("bangalore")
+}
+
+
+def percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+async def run_call(call, count: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await call()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(count)))
+    return latencies, time.perf_counter() - started
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    upstream_fixtures = get_upstream_fixtures()
+    print(f"📊 Booking endpoints benchmark ({count} requests, concurrency {concurrency}, "
+          f"upstream {upstream_fixtures.mode}, latency {upstream_fixtures.latency.spec})")
+    print("=" * 72)
+    print(f"{'call':<26}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>12}")
+
+    for name, call in CALLS.items():
+        latencies, elapsed = await run_call(call, count, concurrency)
+        print(f"{name:<26}{percentile(latencies, 0.5):>10.2f}{percentile(latencies, 0.95):>10.2f}"
+              f"{percentile(latencies, 0.99):>10.2f}{count / elapsed:>12.1f}")
+
+    metrics = upstream_fixtures.get_metrics()
+    print(f"\nfixtures loaded: {metrics['fixtures_loaded']} ({metrics['bytes_loaded']} bytes), "
+          f"default fixture served: {metrics['default_fixture_served']}, missing: {metrics['missing']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
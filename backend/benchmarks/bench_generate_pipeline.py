@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark the itinerary generation pipeline end to end against the local fake LLM backend
+
+Runs GeminiService.generate_itinerary (and the local planner for fast mode)
+for a set of distinct trip requests at a fixed concurrency and reports
+latency percentiles, throughput, estimated model cost, model routes and
+how each itinerary was produced. The fake backend is configured through the
+FAKE_LLM_* environment variables, e.g. FAKE_LLM_LATENCY=uniform:500,1500
+FAKE_LLM_ERROR_RATE=0.05.
+
+Usage: python benchmarks/bench_generate_pipeline.py [requests] [concurrency] [modes]
+       (modes is a comma-separated list of standard, parallel, structured and fast; default all four)
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+logging.disable(logging.ERROR)
+
+from models.trip_models import TripRequest, GenerationMode
+from services.gemini_service import GeminiService
+
+DESTINATIONS = [
+    {"name": "Jaipur", "city": "Jaipur", "state": "Rajasthan", "country": "India", "latitude": 26.9124, "longitude": 75.7873},
+    {"name": "Goa", "city": "Panaji", "state": "Goa", "country": "India", "latitude": 15.4909, "longitude": 73.8278},
+    {"name": "Kochi", "city": "Kochi", "state": "Kerala", "country": "India", "latitude": 9.9312, "longitude": 76.2673}
+]
+ORIGIN = {"name": "Delhi", "city": "New Delhi", "state": "Delhi", "country": "India", "latitude": 28.6139, "longitude": 77.2090}
+THEMES = [["cultural", "heritage"], ["adventure", "nightlife"], ["food", "relaxation"]]
+BUDGET_LEVELS = ["budget", "mid_range", "luxury"]
+
+
+def make_requests(count: int):
+    """Distinct requests, so the itinerary cache never short-circuits a run"""
+    requests = []
+    for i in range(count):
+        start = date.today() + timedelta(days=30 + i)
+        requests.append(TripRequest(
+            origin=ORIGIN,
+            destination=DESTINATIONS[i % len(DESTINATIONS)],
+            start_date=start,
+            end_date=start + timedelta(days=2 + i % 4),
+            travelers_count=1 + i % 4,
+            preferences={
+                "themes": THEMES[i % len(THEMES)],
+                "budget_level": BUDGET_LEVELS[i % len(BUDGET_LEVELS)],
+                "max_budget": 40000 + 5000 * (i % 5)
+            }
+        ))
+    return requests
+
+
+def percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+async def run_mode(service: GeminiService, mode: GenerationMode, requests, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    sources = Counter()
+
+    async def one(trip_request):
+        async with semaphore:
+            started = time.perf_counter()
+            if mode == GenerationMode.FAST:
+                itinerary = service.planner.plan(trip_request)
+            else:
+                itinerary = await service.generate_itinerary(trip_request, mode=mode)
+            latencies.append((time.perf_counter() - started) * 1000)
+            sources[itinerary.get("generated_by", "unknown")] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(trip_request) for trip_request in requests))
+    return latencies, sources, time.perf_counter() - started
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    modes = [GenerationMode(mode) for mode in (sys.argv[3] if len(sys.argv) > 3 else "standard,parallel,structured,fast").split(",")]
+
+    print(f"📊 Generation pipeline benchmark ({count} requests, concurrency {concurrency}, "
+          f"backend {os.environ['LLM_BACKEND']})")
+    print("=" * 86)
+    print(f"{'mode':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}{'cost $':>10}   generated_by")
+
+    for mode in modes:
+        # A fresh service per mode keeps caches and breaker state from leaking between runs
+        service = GeminiService()
+        latencies, sources, elapsed = await run_mode(service, mode, make_requests(count), concurrency)
+        routes = service.router.get_metrics()
+        print(f"{mode.value:<12}{percentile(latencies, 0.5):>10.1f}{percentile(latencies, 0.95):>10.1f}"
+              f"{percentile(latencies, 0.99):>10.1f}{count / elapsed:>9.2f}{routes['total_cost_usd']:>10.4f}   "
+              + ", ".join(f"{source}={n}" for source, n in sources.most_common()))
+        if routes["decisions"]:
+            print(f"{'':<12}routes: " + ", ".join(f"{route}={n}" for route, n in sorted(routes["decisions"].items()))
+                  + (f"; escalations: {routes['escalations']}" if routes["escalations"] else ""))
+        service.executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
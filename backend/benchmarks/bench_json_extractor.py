@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark the LLM JSON extractor against the recorded Gemini responses in mocks/gemini
+
+Usage: python benchmarks/bench_json_extractor.py [iterations]
+"""
+
+import sys
+import json
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from utils.json_extractor import JSONExtractionError, extract_itinerary, extract_json
+
+CORPUS_DIR = BACKEND_DIR / "mocks" / "gemini"
+
+
+def legacy_parse(text: str):
+    """The original find/rfind + json.loads approach"""
+    start_idx = text.find('{')
+    end_idx = text.rfind('}') + 1
+    if start_idx == -1 or end_idx == 0:
+        raise ValueError("No valid JSON found in response")
+    return json.loads(text[start_idx:end_idx])
+
+
+def extractor_parse(name: str, text: str):
+    if name.startswith("itinerary"):
+        return extract_itinerary(text)[0]
+    return extract_json(text)
+
+
+def time_parser(parse, iterations: int) -> float:
+    """Return mean microseconds per call"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        parse()
+    return (time.perf_counter() - started) * 1_000_000 / iterations
+
+
+def describe(result) -> str:
+    if isinstance(result, dict) and "days" in result:
+        return f"ok ({len(result['days'])} days)"
+    return "ok"
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    corpus = sorted(CORPUS_DIR.glob("*.txt"))
+
+    print(f"📊 JSON extraction benchmark ({len(corpus)} responses, {iterations} iterations each)")
+    print("=" * 86)
+    print(f"{'response':<32}{'legacy':<20}{'extractor':<20}{'legacy µs':>9}{'extractor µs':>14}")
+
+    legacy_ok = extractor_ok = 0
+    for path in corpus:
+        text = path.read_text(encoding="utf-8")
+
+        try:
+            legacy_status = describe(legacy_parse(text))
+            legacy_ok += 1
+            legacy_us = f"{time_parser(lambda: legacy_parse(text), iterations):.1f}"
+        except (ValueError, json.JSONDecodeError):
+            legacy_status, legacy_us = "failed", "-"
+
+        try:
+            extractor_status = describe(extractor_parse(path.stem, text))
+            extractor_ok += 1
+            extractor_us = f"{time_parser(lambda: extractor_parse(path.stem, text), iterations):.1f}"
+        except JSONExtractionError:
+            extractor_status, extractor_us = "failed", "-"
+
+        print(f"{path.stem:<32}{legacy_status:<20}{extractor_status:<20}{legacy_us:>9}{extractor_us:>14}")
+
+    print("=" * 86)
+    print(f"Parsed: legacy {legacy_ok}/{len(corpus)}, extractor {extractor_ok}/{len(corpus)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,76 +1,38 @@
-
-from fastapi import FastAPI
-from services.flights_service import get_flights, get_flight_info
-from services.hotels_service import get_destination
-from services.attraction_service import get_tourist_attractions
-from services.hotels_service import get_hotels_for_city
-from dotenv import load_dotenv
-
-app = FastAPI()
-load_dotenv()
-
-@app.get("/")
-def read_root():
-    return {"message": "Welcome to PlanSmith API"}
-
-@app.get("/health")
-def health_check():
-    return {"status": "healthy"}
-
-@app.get("/flights")
-def get_flights_endpoint(
-    from_id: str = "BOM.AIRPORT",
-    to_id: str = "BLR.AIRPORT",
-    depart_date: str = "2025-09-21",  # Use today's date as default
-    adults: str = "1",
-    children: str = "0,17"
-):
-    return get_flights(from_id, to_id, depart_date, adults, children)
-
-@app.get("/flights/{flight_id}")
-def get_flight_info_endpoint(flight_id: str):
-    return get_flight_info(flight_id)
-  
-@app.get("/destination")
-def get_destination_endpoint(location: str = "bangalore"):
-    return get_destination(location)
-
-@app.get("/destination/{destination_id}/hotels")
-def get_hotels_endpoint(destination_id: str = "-2090174",
-    arrival_date: str = "2025-09-22",
-    departure_date: str = "2025-09-24",
-    adults: str = "2",
-    room_qty: str = "1"):
-    return get_hotels_for_city(destination_id, arrival_date, departure_date, adults, room_qty)
-
-@app.get("/destination/{destination_id}/attractions")
-def get_attractions_endpoint(destination_id: str = "-2090174",
-    start_date: str = "2025-09-22",
-    end_date: str = "2025-09-24"):
-    return get_tourist_attractions(destination_id, start_date, end_date)
-
-@app.get("/destination/{destination_id}/taxi")
-def get_taxi_endpoint(destination_id: str = "-2090174"):
-    return get_taxi_locations(destination_id)
-=======
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from typing import Optional, List
 from contextlib import asynccontextmanager
-from datetime import datetime
+from datetime import date, datetime
 import os
+import copy
+import json
 from dotenv import load_dotenv
 import logging
 
 # Import our services
-from services.gemini_service import GeminiService
+from services.gemini_service import GeminiService, PROMPT_TEMPLATE_VERSION
 from services.google_maps_service import GoogleMapsService
 from services.firebase_service import FirebaseService
 from services.mock_data_service import MockDataService
+from services.trip_planner import TripPlanner
+from services.batch_generator import BatchItineraryGenerator
+from services.itinerary_patch import PatchError, apply_patch
+from services import flights_service, hotels_service, attraction_service, taxi_service
+from services.rapidapi_client import rapidapi_client, RapidAPIError
+from services.upstream_fixtures import get_upstream_fixtures
+from services.flight_offers import FlightOfferSet, parse_clock, parse_fields
+from services import paginated_search
+from services.fare_calendar import FareCalendar
+from services.reference_data import ReferenceDataStore
+from services.airport_locator import booking_airport_id
+from services.itinerary_cache import make_exact_request_key
+from utils.single_flight import SingleFlight
 from models.trip_models import (
     TripRequest, Itinerary, BookingRequest, BookingResponse,
-    ItineraryUpdate, WeatherAlert
+    ItineraryUpdate, WeatherAlert, GenerationMode
 )
 
 # Load environment variables
@@ -85,15 +47,26 @@ gemini_service = None
 maps_service = None
 firebase_service = None
 mock_data_service = None
+trip_planner = None
+batch_generator = None
+
+# Coalesces concurrent identical /api/trips/generate calls
+generation_flights = SingleFlight()
+
+# Cheapest fare per day, shared by every /flights/calendar request
+fare_calendar = FareCalendar(flights_service.get_flights)
+
+# Airports indexed by location, for filling flight search ids from coordinates
+reference_data = ReferenceDataStore()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    global gemini_service, maps_service, firebase_service, mock_data_service
+    global gemini_service, maps_service, firebase_service, mock_data_service, trip_planner, batch_generator
     try:
         # Initialize services with error handling for each
         try:
-            gemini_service = GeminiService()
+            gemini_service = GeminiService(reference_data)
             logger.info("Gemini service initialized successfully")
         except Exception as e:
             logger.warning(f"Failed to initialize Gemini service: {e}")
@@ -120,6 +93,21 @@ async def lifespan(app: FastAPI):
             logger.warning(f"Failed to initialize Mock data service: {e}")
             mock_data_service = None
         
+        try:
+            # Reuses destination tips Gemini has already written, without ever calling it
+            trip_planner = TripPlanner(mock_data_service, gemini_service.knowledge if gemini_service else None, reference_data)
+            logger.info("Trip planner initialized successfully")
+        except Exception as e:
+            logger.warning(f"Failed to initialize Trip planner: {e}")
+            trip_planner = None
+        
+        try:
+            reference_data.load()
+        except Exception as e:
+            logger.warning(f"Failed to load airport reference data: {e}")
+        
+        batch_generator = BatchItineraryGenerator(gemini_service, maps_service, firebase_service, trip_planner)
+        
         logger.info("Service initialization completed")
         
     except Exception as e:
@@ -130,6 +118,9 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down services")
+    if gemini_service:
+        gemini_service.executor.shutdown()
+    await rapidapi_client.aclose()
 
 # Initialize FastAPI app with lifespan
 app = FastAPI(
@@ -154,7 +145,9 @@ def get_services():
         "gemini": gemini_service,
         "maps": maps_service,
         "firebase": firebase_service,
-        "mock_data": mock_data_service
+        "mock_data": mock_data_service,
+        "planner": trip_planner,
+        "batch": batch_generator
     }
 
 # ================================
@@ -162,45 +155,187 @@ def get_services():
 # ================================
 
 @app.post("/api/trips/generate")
-async def generate_itinerary(trip_request: TripRequest, services: dict = Depends(get_services)):
-    """Generate a personalized AI-powered itinerary"""
+async def generate_itinerary(
+    trip_request: TripRequest,
+    mode: GenerationMode = GenerationMode.STANDARD,
+    services: dict = Depends(get_services)
+):
+    """Generate a personalized AI-powered itinerary
+    
+    `mode=parallel` plans the days locally and details them with concurrent Gemini calls,
+    so long trips take about as long as short ones. `mode=fast` skips Gemini, weather and
+    events entirely and returns the local planner's itinerary in milliseconds.
+    `mode=structured` asks Gemini for JSON constrained to the itinerary schema and validates
+    it against `ItineraryResponse` in one pass.
+    """
     try:
-        logger.info(f"Generating itinerary for {trip_request.destination.name}")
-        
-        # Get weather data and local events
-        weather_data = await services["maps"].get_weather_data(
-            trip_request.destination.city, 
-            trip_request.destination.state
+        _resolve_airports(trip_request)
+        # Identical requests arriving together share one generation; each caller saves its own record
+        key = f"{mode.value}:{make_exact_request_key(trip_request, PROMPT_TEMPLATE_VERSION)}"
+        itinerary_data = await generation_flights.do(
+            key, lambda: _generate_itinerary_data(trip_request, mode, services)
         )
-        
-        local_events = await services["maps"].get_local_events(
-            trip_request.destination.city,
-            trip_request.destination.state,
-            trip_request.start_date.isoformat(),
-            trip_request.end_date.isoformat()
-        )
-        
-        # Generate itinerary using Gemini AI
-        itinerary_data = await services["gemini"].generate_itinerary(
-            trip_request, weather_data, local_events
-        )
-        
-        # Save to Firebase
-        itinerary_id = await services["firebase"].save_itinerary(
-            itinerary_data, user_id="anonymous"  # In production, get from auth
-        )
-        
-        return {
-            "success": True,
-            "itinerary_id": itinerary_id,
-            "itinerary": itinerary_data,
-            "message": "Itinerary generated successfully"
-        }
+        return await _save_itinerary(copy.deepcopy(itinerary_data), services)
         
     except Exception as e:
         logger.error(f"Error generating itinerary: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _generate_itinerary_data(trip_request: TripRequest, mode: GenerationMode, services: dict) -> dict:
+    """Run the full generation pipeline for one trip request"""
+    logger.info(f"Generating itinerary for {trip_request.destination.name}")
+    
+    if mode == GenerationMode.FAST:
+        return services["planner"].plan(trip_request)
+    return await _generate_ai_itinerary(trip_request, mode, services)
+
+async def _save_itinerary(itinerary_data: dict, services: dict) -> dict:
+    """Save a generated itinerary as a new record"""
+    # Save to Firebase
+    itinerary_id = await services["firebase"].save_itinerary(
+        itinerary_data, user_id="anonymous"  # In production, get from auth
+    )
+    
+    return {
+        "success": True,
+        "itinerary_id": itinerary_id,
+        "itinerary": itinerary_data,
+        "message": "Itinerary generated successfully"
+    }
+
+async def _generate_ai_itinerary(trip_request: TripRequest, mode: GenerationMode, services: dict) -> dict:
+    """Gather weather and events, then have Gemini write the itinerary"""
+    # Get weather data and local events
+    weather_data = await services["maps"].get_weather_data(
+        trip_request.destination.city, 
+        trip_request.destination.state
+    )
+    
+    local_events = await services["maps"].get_local_events(
+        trip_request.destination.city,
+        trip_request.destination.state,
+        trip_request.start_date.isoformat(),
+        trip_request.end_date.isoformat()
+    )
+    
+    # Generate itinerary using Gemini AI
+    return await services["gemini"].generate_itinerary(
+        trip_request, weather_data, local_events, mode
+    )
+
+def _resolve_airports(trip_request: TripRequest) -> TripRequest:
+    """Fill in the origin's and destination's nearest airport ids from their coordinates"""
+    for location in (trip_request.origin, trip_request.destination):
+        if location.airport_id or location.latitude is None or location.longitude is None:
+            continue
+        nearest = reference_data.nearest_airports(location.latitude, location.longitude)
+        if nearest:
+            location.airport_id = booking_airport_id(nearest[0]["iata"])
+    return trip_request
+
+def _flight_search_id(location_id: str, latitude: Optional[float], longitude: Optional[float]) -> str:
+    """The nearest airport's search id when coordinates are given, else ``location_id``"""
+    if latitude is None or longitude is None:
+        return location_id
+    nearest = reference_data.nearest_airports(latitude, longitude)
+    if not nearest:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No airport within {reference_data.locator.max_km:g} km of {latitude}, {longitude}"
+        )
+    return booking_airport_id(nearest[0]["iata"])
+
+def _sse_event(event: str, data) -> str:
+    """Format a Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+@app.post("/api/trips/generate/stream")
+async def generate_itinerary_stream(trip_request: TripRequest, services: dict = Depends(get_services)):
+    """Generate an itinerary, streaming sections to the client as Server-Sent Events
+    
+    Events are emitted in the order Gemini produces them: `summary`, one `day` per day,
+    `budget` and the remaining sections, then `complete` with the saved itinerary.
+    """
+    _resolve_airports(trip_request)
+    
+    async def event_stream():
+        try:
+            logger.info(f"Streaming itinerary for {trip_request.destination.name}")
+            
+            weather_data = await services["maps"].get_weather_data(
+                trip_request.destination.city, 
+                trip_request.destination.state
+            )
+            
+            local_events = await services["maps"].get_local_events(
+                trip_request.destination.city,
+                trip_request.destination.state,
+                trip_request.start_date.isoformat(),
+                trip_request.end_date.isoformat()
+            )
+            
+            day_index = 0
+            async for name, value in services["gemini"].stream_itinerary(trip_request, weather_data, local_events):
+                if name == "itinerary":
+                    itinerary_id = await services["firebase"].save_itinerary(
+                        value, user_id="anonymous"  # In production, get from auth
+                    )
+                    yield _sse_event("complete", {
+                        "success": True,
+                        "itinerary_id": itinerary_id,
+                        "itinerary": value,
+                        "message": "Itinerary generated successfully"
+                    })
+                elif name == "day":
+                    yield _sse_event("day", {"index": day_index, "day": value})
+                    day_index += 1
+                else:
+                    yield _sse_event(name, value)
+                    
+        except Exception as e:
+            logger.error(f"Error streaming itinerary: {str(e)}")
+            yield _sse_event("error", {"success": False, "detail": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/trips/generate/batch")
+async def generate_itinerary_batch(
+    trip_requests: List[TripRequest],
+    mode: GenerationMode = GenerationMode.STANDARD,
+    services: dict = Depends(get_services)
+):
+    """Generate itineraries for a list of trip requests, streaming per-item status as Server-Sent Events
+    
+    Each `item` event carries the request's `index` and a `status` of `queued`, `duplicate`,
+    `generated`, `saved` or `failed`; a final `complete` event summarises the batch.
+    """
+    if len(trip_requests) > services["batch"].max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can hold at most {services['batch'].max_items} trip requests"
+        )
+    for trip_request in trip_requests:
+        _resolve_airports(trip_request)
+    
+    async def event_stream():
+        try:
+            logger.info(f"Generating batch of {len(trip_requests)} itineraries")
+            async for name, value in services["batch"].generate(trip_requests, mode):
+                yield _sse_event(name, value)
+        except Exception as e:
+            logger.error(f"Error generating batch: {str(e)}")
+            yield _sse_event("error", {"success": False, "detail": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/trips/{itinerary_id}")
 async def get_itinerary(itinerary_id: str, services: dict = Depends(get_services)):
     """Get a specific itinerary by ID"""
@@ -243,7 +378,10 @@ async def get_alternative_suggestions(
     feedback: dict,
     services: dict = Depends(get_services)
 ):
-    """Get alternative suggestions based on user feedback"""
+    """Get alternative suggestions based on user feedback
+    
+    Each suggestion carries a `patch` that can be sent to `/alternatives/apply` as is.
+    """
     try:
         itinerary = await services["firebase"].get_itinerary(itinerary_id)
         
@@ -265,6 +403,42 @@ async def get_alternative_suggestions(
         logger.error(f"Error generating alternatives: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/trips/{itinerary_id}/alternatives/apply")
+async def apply_alternative_suggestion(
+    itinerary_id: str,
+    suggestion: dict,
+    services: dict = Depends(get_services)
+):
+    """Apply an alternative's JSON patch to the stored itinerary"""
+    try:
+        itinerary = await services["firebase"].get_itinerary(itinerary_id)
+        
+        if not itinerary:
+            raise HTTPException(status_code=404, detail="Itinerary not found")
+        
+        # Re-validate against the itinerary as stored now, not as it was when suggested
+        activities, _, _, restaurants = services["planner"].get_itinerary_candidates(itinerary)
+        patched = apply_patch(itinerary, suggestion.get("patch"), activities, restaurants)
+        
+        await services["firebase"].update_itinerary(itinerary_id, {
+            "days": patched["days"],
+            "total_cost": patched["total_cost"],
+            "budget_breakdown": patched["budget_breakdown"]
+        })
+        
+        return {
+            "success": True,
+            "itinerary": patched
+        }
+        
+    except HTTPException:
+        raise
+    except PatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error applying alternative: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/trips/{itinerary_id}/updates")
 async def get_real_time_updates(
     itinerary_id: str,
@@ -480,6 +654,215 @@ async def get_restaurants(preferences: dict, services: dict = Depends(get_servic
         logger.error(f"Error getting restaurants: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# ================================
+# BOOKING.COM (RAPIDAPI) ENDPOINTS
+# ================================
+
+@app.get("/")
+def read_root():
+    return {"message": "Welcome to PlanSmith API"}
+
+@app.get("/health")
+def health():
+    return {"status": "healthy"}
+
+@app.exception_handler(RapidAPIError)
+async def rapidapi_error_handler(request, exc: RapidAPIError):
+    logger.error(f"RapidAPI request failed: {str(exc)}")
+    # Upstream 4xx responses are passed through; exhausted retries are a bad gateway
+    status_code = exc.status_code if exc.status_code and exc.status_code < 500 else 502
+    return JSONResponse(status_code=status_code, content={"detail": str(exc)})
+
+def _select_flight_offers(offers: FlightOfferSet, max_stops, min_price, max_price,
+                          depart_after, depart_before, airlines, sort) -> FlightOfferSet:
+    return offers.filter(
+        max_stops, min_price, max_price, depart_after, depart_before,
+        airlines.split(",") if airlines else None
+    ).sort(sort)
+
+@app.get("/flights")
+async def get_flights_endpoint(
+    from_id: str = "BOM.AIRPORT",
+    to_id: str = "BLR.AIRPORT",
+    depart_date: str = "2025-09-21",  # Use today's date as default
+    adults: str = "1",
+    children: str = "0,17",
+    from_latitude: Optional[float] = None,  # with from_longitude, overrides from_id with the nearest airport
+    from_longitude: Optional[float] = None,
+    to_latitude: Optional[float] = None,  # with to_longitude, overrides to_id with the nearest airport
+    to_longitude: Optional[float] = None,
+    max_stops: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    depart_after: Optional[str] = None,  # "HH:MM"
+    depart_before: Optional[str] = None,  # "HH:MM"
+    airlines: Optional[str] = None,  # comma-separated IATA codes
+    sort: Optional[str] = None,  # price, duration, departure, arrival or stops; "-" prefix reverses
+    fields: Optional[str] = None,  # comma-separated FlightOffer fields
+    layout: str = "rows",  # rows or columns
+    raw: bool = False,
+    pages: int = 1,  # result pages to fetch, capped by SEARCH_MAX_PAGES
+    stream: bool = False
+):
+    """Search flights; returns compact normalized offers unless raw=true
+    
+    With pages > 1 the remaining result pages are fetched concurrently and merged.
+    With stream=true each page's offers are sent as a `page` Server-Sent Event as it
+    arrives, followed by `complete`; it cannot be combined with raw=true. Coordinates,
+    when given, are resolved to the nearest airport in place of from_id / to_id.
+    """
+    if raw and stream:
+        raise HTTPException(status_code=400, detail="raw=true cannot be combined with stream=true")
+    try:
+        depart_window = (parse_clock(depart_after), parse_clock(depart_before))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    from_id = _flight_search_id(from_id, from_latitude, from_longitude)
+    to_id = _flight_search_id(to_id, to_latitude, to_longitude)
+    filters = (max_stops, min_price, max_price, *depart_window, airlines, sort)
+    try:
+        # Reject bad sorts, fields and layouts before any upstream call
+        _select_flight_offers(FlightOfferSet([], {}), *filters).to_response(parse_fields(fields), layout)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    search = flights_service.search_flights(
+        from_id, to_id, depart_date, adults, children, max_pages=max(pages, 1)
+    )
+    if stream:
+        async def event_stream():
+            try:
+                async for page, items in search.pages():
+                    offers = _select_flight_offers(FlightOfferSet.from_booking({"data": {"flightOffers": items}}), *filters)
+                    yield _sse_event("page", {"page": page, **offers.to_response(parse_fields(fields), layout)})
+                yield _sse_event("complete", {"success": True, **search.summary()})
+            except Exception as e:
+                logger.error(f"Error streaming flights: {str(e)}")
+                yield _sse_event("error", {"success": False, "detail": str(e)})
+        
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    payload = await search.collect()
+    if raw:
+        return payload
+    return _select_flight_offers(FlightOfferSet.from_booking(payload), *filters).to_response(parse_fields(fields), layout)
+
+@app.get("/flights/calendar")
+async def get_fare_calendar_endpoint(
+    from_id: str = "BOM.AIRPORT",
+    to_id: str = "BLR.AIRPORT",
+    start_date: str = "2025-09-21",
+    end_date: str = "2025-09-30",
+    adults: str = "1",
+    children: str = "0,17",
+    from_latitude: Optional[float] = None,
+    from_longitude: Optional[float] = None,
+    to_latitude: Optional[float] = None,
+    to_longitude: Optional[float] = None,
+    stream: bool = False
+):
+    """Cheapest fare per departure date between start_date and end_date
+    
+    With stream=true each date is sent as a `day` Server-Sent Event as soon as its
+    price is known, followed by `complete` with the whole grid. Coordinates are
+    resolved to the nearest airport as in /flights.
+    """
+    from_id = _flight_search_id(from_id, from_latitude, from_longitude)
+    to_id = _flight_search_id(to_id, to_latitude, to_longitude)
+    try:
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        fare_calendar.dates(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not stream:
+        return await fare_calendar.grid(from_id, to_id, start, end, adults, children)
+    
+    async def event_stream():
+        try:
+            cells = {}
+            async for day, cell in fare_calendar.cells(from_id, to_id, start, end, adults, children):
+                cells[day] = cell
+                yield _sse_event("day", {"date": day, **(cell or {"price": None})})
+            yield _sse_event("complete", fare_calendar.summarize(from_id, to_id, dict(sorted(cells.items()))))
+        except Exception as e:
+            logger.error(f"Error streaming fare calendar: {str(e)}")
+            yield _sse_event("error", {"success": False, "detail": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/flights/{flight_id}")
+async def get_flight_info_endpoint(flight_id: str):
+    return await flights_service.get_flight_info(flight_id)
+
+@app.get("/airports/nearest")
+async def get_nearest_airports_endpoint(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    k: int = Query(3, ge=1, le=20),
+    max_km: Optional[float] = Query(None, gt=0)  # defaults to AIRPORT_MAX_DISTANCE_KM
+):
+    """The k airports nearest a point, nearest first, with distances and flight search ids"""
+    airports = reference_data.nearest_airports(latitude, longitude, k, max_km)
+    return {"airports": [{**airport, "search_id": booking_airport_id(airport["iata"])} for airport in airports]}
+  
+@app.get("/destination")
+async def get_destination_endpoint(location: str = "bangalore"):
+    return await hotels_service.get_destination(location)
+
+@app.get("/destination/{destination_id}/hotels")
+async def get_hotels_endpoint(destination_id: str = "-2090174",
+    arrival_date: str = "2025-09-22",
+    departure_date: str = "2025-09-24",
+    adults: str = "2",
+    room_qty: str = "1",
+    pages: int = 1,  # result pages to fetch, capped by SEARCH_MAX_PAGES
+    stream: bool = False):
+    """Search hotels; pages > 1 fetches and merges further result pages concurrently,
+    stream=true sends each page's new hotels as a `page` Server-Sent Event"""
+    if pages <= 1 and not stream:
+        return await hotels_service.get_hotels_for_city(destination_id, arrival_date, departure_date, adults, room_qty)
+    
+    search = hotels_service.search_hotels_for_city(
+        destination_id, arrival_date, departure_date, adults, room_qty,
+        max_pages=max(pages, 1)
+    )
+    if not stream:
+        return await search.collect()
+    
+    async def event_stream():
+        try:
+            async for page, hotels in search.pages():
+                yield _sse_event("page", {"page": page, "hotels": hotels})
+            yield _sse_event("complete", {"success": True, **search.summary()})
+        except Exception as e:
+            logger.error(f"Error streaming hotels: {str(e)}")
+            yield _sse_event("error", {"success": False, "detail": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/destination/{destination_id}/attractions")
+async def get_attractions_endpoint(destination_id: str = "-2090174",
+    start_date: str = "2025-09-22",
+    end_date: str = "2025-09-24"):
+    return await attraction_service.get_tourist_attractions(destination_id, start_date, end_date)
+
+@app.get("/destination/{destination_id}/taxi")
+async def get_taxi_endpoint(destination_id: str = "-2090174"):
+    return await taxi_service.get_taxi_locations(destination_id)
+
 # ================================
 # ANALYTICS & INSIGHTS ENDPOINTS
 # ================================
@@ -508,6 +891,27 @@ async def health_check():
         "version": "2.0.0"
     }
 
+@app.get("/api/metrics")
+async def get_metrics(services: dict = Depends(get_services)):
+    """Runtime metrics for the AI generation pipeline"""
+    return {
+        "gemini_executor": services["gemini"].executor.get_metrics() if services["gemini"] else None,
+        "itinerary_cache": services["gemini"].cache.get_metrics() if services["gemini"] else None,
+        "context_builder": services["gemini"].context_builder.get_metrics() if services["gemini"] else None,
+        "gemini_calls": services["gemini"].telemetry.get_metrics() if services["gemini"] else None,
+        "circuit_breakers": services["gemini"].breakers.get_metrics() if services["gemini"] else None,
+        "hedging": services["gemini"].hedging.get_metrics() if services["gemini"] else None,
+        "model_routes": services["gemini"].router.get_metrics() if services["gemini"] else None,
+        "destination_knowledge": services["gemini"].knowledge.get_metrics() if services["gemini"] else None,
+        "request_coalescing": generation_flights.get_metrics(),
+        "rapidapi_http": rapidapi_client.get_metrics(),
+        "upstream_fixtures": get_upstream_fixtures().get_metrics(),
+        "paginated_search": paginated_search.get_metrics(),
+        "fare_calendar": fare_calendar.get_metrics(),
+        "reference_data": reference_data.get_metrics(),
+        "batch_generation": services["batch"].get_metrics() if services["batch"] else None
+    }
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -0,0 +1,84 @@
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
+from datetime import date
+from enum import Enum
+
+class TravelClass(str, Enum):
+    ECONOMY = "ECONOMY"
+    PREMIUM_ECONOMY = "PREMIUM_ECONOMY"
+    BUSINESS = "BUSINESS"
+    FIRST = "FIRST"
+
+class LocationSubType(str, Enum):
+    AIRPORT = "AIRPORT"
+    CITY = "CITY"
+
+class AmadeusQuery(BaseModel):
+    """Query parameters for one Amadeus endpoint; field names are snake_case versions of the API's"""
+
+    def to_params(self) -> Dict[str, str]:
+        params = {}
+        for name, value in self.model_dump(exclude_none=True).items():
+            head, *rest = name.split("_")
+            key = head + "".join(part.title() for part in rest)
+            if isinstance(value, bool):
+                value = "true" if value else "false"
+            elif isinstance(value, date):
+                value = value.isoformat()
+            elif isinstance(value, Enum):
+                value = value.value
+            params[key] = str(value)
+        return params
+
+class FlightOffersQuery(AmadeusQuery):
+    origin_location_code: str = Field(..., min_length=3, max_length=3, description="IATA code, e.g. BOM")
+    destination_location_code: str = Field(..., min_length=3, max_length=3, description="IATA code, e.g. DEL")
+    departure_date: date
+    return_date: Optional[date] = None
+    adults: int = Field(1, ge=1, le=9)
+    children: Optional[int] = Field(None, ge=0, le=9)
+    infants: Optional[int] = Field(None, ge=0, le=9)
+    travel_class: Optional[TravelClass] = None
+    included_airline_codes: Optional[str] = Field(None, description="Comma-separated IATA airline codes")
+    non_stop: Optional[bool] = None
+    currency_code: str = "INR"
+    max_price: Optional[int] = Field(None, ge=1)
+    max: int = Field(20, ge=1, le=250)
+
+class HotelOffersQuery(AmadeusQuery):
+    hotel_ids: str = Field(..., description="Comma-separated Amadeus hotel ids")
+    adults: int = Field(1, ge=1, le=9)
+    check_in_date: Optional[date] = None
+    check_out_date: Optional[date] = None
+    room_quantity: int = Field(1, ge=1, le=9)
+    currency: str = "INR"
+    best_rate_only: bool = True
+
+class CitySearchQuery(AmadeusQuery):
+    keyword: str = Field(..., min_length=2)
+    country_code: Optional[str] = Field(None, min_length=2, max_length=2)
+    max: int = Field(10, ge=1, le=100)
+
+class AirportSearchQuery(AmadeusQuery):
+    keyword: str = Field(..., min_length=1, description="Airport or city name, or IATA code")
+    sub_type: LocationSubType = LocationSubType.AIRPORT
+    country_code: Optional[str] = Field(None, min_length=2, max_length=2)
+
+class NearbyQuery(AmadeusQuery):
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    radius: int = Field(20, ge=0, le=500, description="Kilometres")
+
+class ActivitiesQuery(NearbyQuery):
+    radius: int = Field(1, ge=0, le=20, description="Kilometres")
+
+class AirlineQuery(AmadeusQuery):
+    airline_codes: Optional[str] = Field(None, description="Comma-separated IATA or ICAO codes; all airlines when empty")
+
+class AirportRoutesQuery(AmadeusQuery):
+    departure_airport_code: str = Field(..., min_length=3, max_length=3)
+    max: Optional[int] = Field(None, ge=1)
+
+class AirlineRoutesQuery(AmadeusQuery):
+    airline_code: str = Field(..., min_length=2, max_length=3)
+    max: Optional[int] = Field(None, ge=1)
@@ -35,6 +35,12 @@ class AccommodationType(str, Enum):
     HOMESTAY = "homestay"
     VACATION_RENTAL = "vacation_rental"
 
+class GenerationMode(str, Enum):
+    STANDARD = "standard"      # one Gemini call for the whole trip
+    PARALLEL = "parallel"      # one Gemini call per chunk of days, run concurrently
+    FAST = "fast"              # local deterministic planner, no Gemini call
+    STRUCTURED = "structured"  # one schema-constrained Gemini call returning typed JSON
+
 class Location(BaseModel):
     name: str
     city: str
@@ -43,6 +49,7 @@ class Location(BaseModel):
     latitude: Optional[float] = None
     longitude: Optional[float] = None
     place_id: Optional[str] = None
+    airport_id: Optional[str] = None  # Booking.com flight search id, e.g. BOM.AIRPORT; filled from the coordinates when missing
 
 class UserPreferences(BaseModel):
     themes: List[TravelTheme]
@@ -0,0 +1,103 @@
+import os
+import heapq
+import itertools
+import logging
+from math import asin, cos, pi, radians, sin, sqrt
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _unit_vector(latitude: float, longitude: float) -> Tuple[float, float, float]:
+    phi, lam = radians(latitude), radians(longitude)
+    return cos(phi) * cos(lam), cos(phi) * sin(lam), sin(phi)
+
+
+def _chord_to_km(chord_squared: float) -> float:
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(chord_squared) / 2))
+
+
+def _km_to_chord(km: float) -> float:
+    return (2 * sin(min(km, pi * EARTH_RADIUS_KM) / (2 * EARTH_RADIUS_KM))) ** 2
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometres"""
+    dlat, dlon = radians(lat2 - lat1), radians(lon2 - lon1)
+    h = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(h)))
+
+
+def booking_airport_id(iata: str) -> str:
+    """Booking.com flight search id for an airport, e.g. ``BOM.AIRPORT``"""
+    return f"{iata.strip().upper()}.AIRPORT"
+
+
+def airport_iata(search_id: Optional[str]) -> Optional[str]:
+    """IATA code of a Booking.com airport search id, or None for city and other ids"""
+    code, _, kind = (search_id or "").strip().upper().partition(".")
+    return code if kind == "AIRPORT" and code else None
+
+
+class AirportLocator:
+    """k-d tree over airport coordinates for nearest-airport lookups.
+
+    Airports are stored as points on the unit sphere, so straight-line
+    (chord) distance orders them exactly like great-circle distance and
+    there is no seam at the antimeridian. A lookup visits O(log n) nodes;
+    for a few thousand airports that is microseconds, with no API call.
+    """
+
+    def __init__(self, airports: Iterable[Dict[str, Any]], max_km: Optional[float] = None):
+        self.max_km = max_km or float(os.getenv("AIRPORT_MAX_DISTANCE_KM", "250"))
+        points = [
+            (_unit_vector(airport["latitude"], airport["longitude"]), airport) for airport in airports
+            if airport.get("latitude") is not None and airport.get("longitude") is not None
+        ]
+        self.size = len(points)
+        self._root = self._build(points, 0)
+
+    def _build(self, points: List[tuple], axis: int) -> Optional[tuple]:
+        if not points:
+            return None
+        points.sort(key=lambda point: point[0][axis])
+        middle = len(points) // 2
+        point, airport = points[middle]
+        next_axis = (axis + 1) % 3
+        return point, airport, axis, self._build(points[:middle], next_axis), self._build(points[middle + 1:], next_axis)
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1,
+                max_km: Optional[float] = None) -> List[Tuple[Dict[str, Any], float]]:
+        """Up to ``k`` ``(airport, distance_km)`` pairs within ``max_km``, nearest first"""
+        target = _unit_vector(latitude, longitude)
+        limit = _km_to_chord(max_km or self.max_km)
+        best: List[tuple] = []  # max-heap of (-chord², sequence, airport)
+        sequence = itertools.count()
+
+        def bound() -> float:
+            return -best[0][0] if len(best) == k else limit
+
+        def visit(node: Optional[tuple]):
+            if node is None:
+                return
+            point, airport, axis, left, right = node
+            distance = (target[0] - point[0]) ** 2 + (target[1] - point[1]) ** 2 + (target[2] - point[2]) ** 2
+            if distance < bound():
+                entry = (-distance, next(sequence), airport)
+                if len(best) == k:
+                    heapq.heapreplace(best, entry)
+                else:
+                    heapq.heappush(best, entry)
+            offset = target[axis] - point[axis]
+            visit(left if offset < 0 else right)
+            # The other side can only help if the splitting plane is closer than the current bound
+            if offset * offset < bound():
+                visit(right if offset < 0 else left)
+
+        if k > 0:
+            visit(self._root)
+        return [(airport, _chord_to_km(-distance)) for distance, _, airport in sorted(best, reverse=True)]
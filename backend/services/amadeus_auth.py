@@ -0,0 +1,157 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = "https://test.api.amadeus.com"  # Sandbox environment
+
+
+class AmadeusAuthError(Exception):
+    """Raised when an access token cannot be obtained"""
+
+    def __init__(self, message: str, status_code: int = 502):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class AmadeusTokenManager:
+    """Caches the Amadeus OAuth access token and refreshes it ahead of expiry.
+
+    A token is used until ``expiry_margin`` seconds before its
+    ``expires_in``. Within ``refresh_ahead`` seconds of that point, callers
+    still get the current token while a new one is fetched in the
+    background. At most one token request is in flight at a time; every
+    thread or task that needs a token meanwhile waits for that request.
+    """
+
+    def __init__(self, client_id: Optional[str] = None, client_secret: Optional[str] = None,
+                 api_url: Optional[str] = None, expiry_margin: Optional[float] = None,
+                 refresh_ahead: Optional[float] = None, timeout: Optional[float] = None,
+                 fetch: Optional[Callable[[], Tuple[str, float]]] = None):
+        self.client_id = client_id or os.getenv("AMADEUS_CLIENT_ID")
+        self.client_secret = client_secret or os.getenv("AMADEUS_CLIENT_SECRET")
+        self.api_url = api_url or os.getenv("AMADEUS_API_URL", DEFAULT_API_URL)
+        self.expiry_margin = expiry_margin if expiry_margin is not None else float(os.getenv("AMADEUS_TOKEN_EXPIRY_MARGIN", "30"))
+        self.refresh_ahead = refresh_ahead if refresh_ahead is not None else float(os.getenv("AMADEUS_TOKEN_REFRESH_AHEAD", "300"))
+        self.timeout = timeout or float(os.getenv("AMADEUS_TOKEN_TIMEOUT", "10"))
+        self.fetch = fetch or self._request_token
+
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh: Optional[Future] = None
+        # One worker: token requests never run in parallel
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="amadeus-token")
+        self._stats = {
+            "hits": 0,
+            "waits": 0,
+            "token_requests": 0,
+            "background_refreshes": 0,
+            "failures": 0,
+            "invalidations": 0
+        }
+
+    def _request_token(self) -> Tuple[str, float]:
+        """POST client credentials; returns the token and its lifetime in seconds"""
+        response = requests.post(
+            f"{self.api_url}/v1/security/oauth2/token",
+            data={
+                "grant_type": "client_credentials",
+                "client_id": self.client_id,
+                "client_secret": self.client_secret
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            timeout=self.timeout
+        )
+        if response.status_code != 200:
+            raise AmadeusAuthError("Failed to obtain access token", response.status_code)
+        body = response.json()
+        return body["access_token"], float(body.get("expires_in", 1799))
+
+    def _fetch_token(self) -> str:
+        self._stats["token_requests"] += 1
+        try:
+            token, expires_in = self.fetch()
+        except Exception as e:
+            self._stats["failures"] += 1
+            logger.warning(f"Amadeus token request failed: {str(e)}")
+            with self._lock:
+                # Let the next caller try again rather than reusing this failure
+                self._refresh = None
+            if isinstance(e, AmadeusAuthError):
+                raise
+            raise AmadeusAuthError(f"Failed to obtain access token: {str(e)}") from e
+        with self._lock:
+            self._token = token
+            self._expires_at = time.monotonic() + expires_in - self.expiry_margin
+            self._refresh = None
+        return token
+
+    def _current(self) -> Tuple[Optional[str], Optional[Future]]:
+        """The usable cached token, or the refresh to wait for"""
+        with self._lock:
+            remaining = self._expires_at - time.monotonic()
+            if self._token and remaining > 0:
+                if remaining <= self.refresh_ahead and self._refresh is None:
+                    self._stats["background_refreshes"] += 1
+                    self._start_refresh()
+                self._stats["hits"] += 1
+                return self._token, None
+            self._stats["waits"] += 1
+            return None, self._refresh or self._start_refresh()
+
+    def _start_refresh(self) -> Future:
+        # Called with the lock held
+        self._refresh = self._executor.submit(self._fetch_token)
+        return self._refresh
+
+    def get_token(self) -> str:
+        """Return a valid token, blocking only when there is none"""
+        token, refresh = self._current()
+        if token:
+            return token
+        try:
+            return refresh.result(timeout=self.timeout * 2)
+        except FutureTimeoutError as e:
+            raise AmadeusAuthError("Timed out waiting for an access token", 504) from e
+
+    async def get_token_async(self) -> str:
+        """Return a valid token without blocking the event loop"""
+        token, refresh = self._current()
+        if token:
+            return token
+        try:
+            # Shielded so a caller that times out or is cancelled does not cancel the shared request
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(refresh)), self.timeout * 2)
+        except asyncio.TimeoutError as e:
+            raise AmadeusAuthError("Timed out waiting for an access token", 504) from e
+
+    def invalidate(self, token: str):
+        """Drop a token the API rejected, unless it has already been replaced"""
+        with self._lock:
+            if self._token == token:
+                self._token = None
+                self._expires_at = 0.0
+                self._stats["invalidations"] += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            remaining = self._expires_at - time.monotonic() if self._token else 0.0
+            refreshing = self._refresh is not None
+        return {
+            **self._stats,
+            "token_valid_seconds": round(max(remaining, 0.0), 1),
+            "refreshing": refreshing
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,286 @@
+import os
+import time
+import heapq
+import random
+import asyncio
+import logging
+import itertools
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from models.amadeus_models import (
+    ActivitiesQuery, AirlineQuery, AirlineRoutesQuery, AirportRoutesQuery, AirportSearchQuery,
+    CitySearchQuery, FlightOffersQuery, HotelOffersQuery, NearbyQuery
+)
+from services.amadeus_auth import AmadeusAuthError, AmadeusTokenManager
+from services.metrics import LATENCY_BUCKETS_MS, Histogram
+from services.rapidapi_client import RETRY_STATUSES, MAX_RETRY_AFTER_SECONDS, retry_after_seconds
+from services.rate_limiter import TokenBucket
+from services.upstream_fixtures import UpstreamFixtures, UpstreamFixtureMissing, fixture_name, get_upstream_fixtures
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Request priorities; lower is served first
+INTERACTIVE = 0
+NORMAL = 1
+BACKGROUND = 2
+
+
+class AmadeusError(Exception):
+    """Raised when an Amadeus call fails or cannot be scheduled"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class RequestScheduler:
+    """Releases queued requests at the account's TPS quota, highest priority first.
+
+    Callers ``await acquire(priority)`` before each request. A dispatcher
+    task waits for a token from the bucket and only then picks the waiter,
+    so an interactive request queued behind background ones goes next. A
+    caller cancelled while queued leaves the queue at once; it neither
+    counts towards ``max_queue`` nor uses up a token. ``pause(seconds)``
+    holds every request back after a 429.
+    """
+
+    def __init__(self, tps: float, burst: Optional[int] = None, max_queue: int = 256):
+        self.bucket = TokenBucket(tps, burst)
+        self.max_queue = max_queue
+        self._queue: List[tuple] = []
+        self._sequence = itertools.count()
+        self._ready: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._paused_until = 0.0
+        self._stats = {
+            "dispatched": {INTERACTIVE: 0, NORMAL: 0, BACKGROUND: 0},
+            "rejected": 0,
+            "cancelled": 0,
+            "pauses": 0
+        }
+
+    async def acquire(self, priority: int = NORMAL):
+        if len(self._queue) >= self.max_queue:
+            self._stats["rejected"] += 1
+            raise AmadeusError("Amadeus request queue is full", 503)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._ready = asyncio.Event()
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        entry = (priority, next(self._sequence), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, entry)
+        self._ready.set()
+        try:
+            await entry[2]
+        except asyncio.CancelledError:
+            if entry in self._queue:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._stats["cancelled"] += 1
+            raise
+
+    def pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._stats["pauses"] += 1
+
+    async def _dispatch(self):
+        holding = False
+        while True:
+            if not self._queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            if not holding:
+                await self.bucket.acquire()
+                holding = True
+                # Everyone queued may have been cancelled meanwhile; the token waits for the next caller
+                continue
+            priority, _, waiter = heapq.heappop(self._queue)
+            if not waiter.done():
+                waiter.set_result(None)
+                self._stats["dispatched"][priority] += 1
+                holding = False
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "paused_seconds": round(max(self._paused_until - time.monotonic(), 0.0), 2),
+            **self._stats,
+            "dispatched": dict(self._stats["dispatched"]),
+            "rate_limit": self.bucket.get_metrics()
+        }
+
+    async def close(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+
+
+class AmadeusClient:
+    """Async client for the Amadeus self-service APIs.
+
+    Requests share one pooled ``httpx.AsyncClient`` and a cached OAuth
+    token, and every request passes through a ``RequestScheduler`` sized to
+    the account's quota (``AMADEUS_TPS``; the test environment allows 10
+    per second). A 429 pauses the scheduler for its ``Retry-After``; 429s,
+    5xx and transport errors are retried with jittered backoff, and a 401
+    is retried once with a new token. In record and replay upstream modes
+    responses are saved to or served from ``fixtures``.
+    """
+
+    def __init__(self, token_manager: Optional[AmadeusTokenManager] = None, api_url: Optional[str] = None,
+                 tps: Optional[float] = None, max_connections: Optional[int] = None,
+                 retries: Optional[int] = None, timeout: Optional[float] = None,
+                 fixtures: Optional[UpstreamFixtures] = None):
+        self.token_manager = token_manager or AmadeusTokenManager()
+        self.api_url = api_url or self.token_manager.api_url
+        self.tps = tps or float(os.getenv("AMADEUS_TPS", "10"))
+        self.max_connections = max_connections or int(os.getenv("AMADEUS_MAX_CONNECTIONS", "10"))
+        self.retries = retries if retries is not None else int(os.getenv("AMADEUS_RETRIES", "2"))
+        self.backoff = float(os.getenv("AMADEUS_RETRY_BACKOFF", "0.25"))
+        self.timeout = timeout or float(os.getenv("AMADEUS_TIMEOUT", "20"))
+        self._fixtures = fixtures
+        self.scheduler = RequestScheduler(self.tps, max_queue=int(os.getenv("AMADEUS_MAX_QUEUE", "256")))
+        self._client: Optional[httpx.AsyncClient] = None
+
+        self._latency: Dict[str, Histogram] = {}
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "throttled": 0,
+            "status_codes": {}
+        }
+
+    @property
+    def fixtures(self) -> UpstreamFixtures:
+        return self._fixtures or get_upstream_fixtures()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.api_url,
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+                timeout=self.timeout
+            )
+        return self._client
+
+    async def get(self, path: str, params: Optional[Dict[str, str]] = None, priority: int = NORMAL) -> Any:
+        """GET an Amadeus endpoint and return its JSON body"""
+        if self.fixtures.replaying:
+            try:
+                return await self.fixtures.replay(fixture_name(path, "amadeus"), params)
+            except UpstreamFixtureMissing as e:
+                raise AmadeusError(str(e), 404) from e
+
+        attempt = 0
+        reauthenticated = False
+        while True:
+            await self.scheduler.acquire(priority)
+            try:
+                token = await self.token_manager.get_token_async()
+            except AmadeusAuthError as e:
+                raise AmadeusError(str(e), e.status_code) from e
+
+            self._stats["requests"] += 1
+            started = time.monotonic()
+            retry_after = None
+            try:
+                response = await self.client.get(path, params=params, headers={"Authorization": f"Bearer {token}"})
+            except httpx.TransportError as e:
+                error = AmadeusError(f"Amadeus {path} failed: {type(e).__name__}: {str(e)}")
+            else:
+                codes = self._stats["status_codes"]
+                codes[response.status_code] = codes.get(response.status_code, 0) + 1
+                if response.status_code < 400:
+                    self._observe(path, started)
+                    body = response.json()
+                    if self.fixtures.recording:
+                        await self.fixtures.record_async(fixture_name(path, "amadeus"), params, body)
+                    return body
+                if response.status_code == 401 and not reauthenticated:
+                    self.token_manager.invalidate(token)
+                    reauthenticated = True
+                    continue
+                error = AmadeusError(f"Amadeus {path} returned {response.status_code}: {response.text[:200]}",
+                                     response.status_code)
+                if response.status_code not in RETRY_STATUSES:
+                    self._stats["failures"] += 1
+                    raise error
+                if response.status_code == 429:
+                    self._stats["throttled"] += 1
+                    retry_after = min(retry_after_seconds(response) or self.backoff * 2 ** attempt, MAX_RETRY_AFTER_SECONDS)
+                    # The quota is per account, so every queued request has to wait too
+                    self.scheduler.pause(retry_after)
+
+            if attempt >= self.retries:
+                self._stats["failures"] += 1
+                raise error
+            attempt += 1
+            self._stats["retries"] += 1
+            delay = retry_after if retry_after is not None else random.uniform(0, self.backoff * 2 ** attempt)
+            logger.warning(f"Retrying Amadeus {path} in {delay:.2f}s (attempt {attempt + 1}): {str(error)}")
+            await asyncio.sleep(delay)
+
+    def _observe(self, path: str, started: float):
+        if path not in self._latency:
+            self._latency[path] = Histogram(LATENCY_BUCKETS_MS)
+        self._latency[path].observe((time.monotonic() - started) * 1000)
+
+    async def flight_offers(self, query: FlightOffersQuery, priority: int = INTERACTIVE) -> Any:
+        return await self.get("/v2/shopping/flight-offers", query.to_params(), priority)
+
+    async def hotel_offers(self, query: HotelOffersQuery, priority: int = INTERACTIVE) -> Any:
+        return await self.get("/v3/shopping/hotel-offers", query.to_params(), priority)
+
+    async def cities(self, query: CitySearchQuery, priority: int = NORMAL) -> Any:
+        return await self.get("/v1/reference-data/locations/cities", query.to_params(), priority)
+
+    async def airports(self, query: AirportSearchQuery, priority: int = NORMAL) -> Any:
+        return await self.get("/v1/reference-data/locations", query.to_params(), priority)
+
+    async def nearby_airports(self, query: NearbyQuery, priority: int = NORMAL) -> Any:
+        return await self.get("/v1/reference-data/locations/airports", query.to_params(), priority)
+
+    async def activities(self, query: ActivitiesQuery, priority: int = NORMAL) -> Any:
+        return await self.get("/v1/shopping/activities", query.to_params(), priority)
+
+    async def airlines(self, query: AirlineQuery, priority: int = BACKGROUND) -> Any:
+        return await self.get("/v1/reference-data/airlines", query.to_params(), priority)
+
+    async def airport_routes(self, query: AirportRoutesQuery, priority: int = NORMAL) -> Any:
+        return await self.get("/v1/airport/direct-destinations", query.to_params(), priority)
+
+    async def airline_routes(self, query: AirlineRoutesQuery, priority: int = NORMAL) -> Any:
+        return await self.get("/v1/airline/destinations", query.to_params(), priority)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        pool = {"max_connections": self.max_connections}
+        connections = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = getattr(connections, "connections", None)
+        if connections is not None:
+            pool["connections"] = len(connections)
+            pool["idle_connections"] = sum(1 for connection in connections if connection.is_idle())
+        return {
+            **self._stats,
+            "status_codes": dict(self._stats["status_codes"]),
+            "latency_ms": {path: histogram.snapshot() for path, histogram in self._latency.items()},
+            "scheduler": self.scheduler.get_metrics(),
+            "token": self.token_manager.get_metrics(),
+            "pool": pool
+        }
+
+    async def aclose(self):
+        await self.scheduler.close()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self.token_manager.close()
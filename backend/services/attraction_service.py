@@ -1,14 +1,6 @@
-import os
-import requests
-from dotenv import load_dotenv
-
-load_dotenv()
-
-host = os.getenv("RAPIDAPI_HOST")
-
-def get_tourist_attractions(attraction_id, start_date, end_date):
-  url = f"https://{host}/api/v1/attraction/searchAttractions"
+from services.rapidapi_client import rapidapi_client
 
+async def get_tourist_attractions(attraction_id, start_date, end_date):
   querystring = {
     "id":attraction_id,
     "startDate":start_date,
@@ -19,11 +11,4 @@ def get_tourist_attractions(attraction_id, start_date, end_date):
     "languagecode": "en-us"
   }
 
-  headers = {
-    "x-rapidapi-key": os.getenv("RAPIDAPI_KEY"),
-    "x-rapidapi-host": os.getenv("RAPIDAPI_HOST")
-  }
-
-  response = requests.get(url, headers=headers, params=querystring)
-
-  return response.json()
\ No newline at end of file
+  return await rapidapi_client.get("/api/v1/attraction/searchAttractions", querystring)
@@ -0,0 +1,214 @@
+import os
+import json
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from models.trip_models import TripRequest, GenerationMode
+from services.gemini_service import PROMPT_TEMPLATE_VERSION
+from services.itinerary_cache import make_exact_request_key
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class BatchItineraryGenerator:
+    """Generates many itineraries in one call for partner integrations and pre-generation jobs.
+
+    Identical requests are generated once. Weather, events and candidate
+    lookups are shared by every request for the same destination, Gemini
+    work from all batches runs under one ``max_concurrency`` limit, and
+    results are written to Firestore ``write_batch_size`` at a time.
+    """
+
+    def __init__(self, gemini_service, maps_service, firebase_service, trip_planner,
+                 max_concurrency: Optional[int] = None, write_batch_size: Optional[int] = None,
+                 max_items: Optional[int] = None):
+        self.gemini_service = gemini_service
+        self.maps_service = maps_service
+        self.firebase_service = firebase_service
+        self.trip_planner = trip_planner
+
+        self.max_concurrency = max_concurrency or int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+        self.write_batch_size = write_batch_size or int(os.getenv("BATCH_WRITE_SIZE", "20"))
+        self.max_items = max_items or int(os.getenv("BATCH_MAX_ITEMS", "100"))
+
+        # Shared by every batch so concurrent batches cannot multiply the load on Gemini
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        self._stats = {
+            "batches": 0,
+            "items": 0,
+            "duplicates": 0,
+            "generated": 0,
+            "failed": 0,
+            "saved": 0,
+            "lookups": 0,
+            "shared_lookups": 0,
+            "write_batches": 0
+        }
+
+    async def generate(self, trip_requests: List[TripRequest],
+                       mode: GenerationMode = GenerationMode.STANDARD) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Generate and save every request, yielding ("item", status) updates and a final ("complete", summary).
+
+        Each item moves through ``queued`` (or ``duplicate``), ``generated``
+        and ``saved``, or ends as ``failed``. Duplicates are saved under the
+        same itinerary ID as the request they repeat.
+        """
+        self._stats["batches"] += 1
+        self._stats["items"] += len(trip_requests)
+
+        first_index: Dict[str, int] = {}
+        duplicates: Dict[int, List[int]] = {}
+        for index, trip_request in enumerate(trip_requests):
+            key = make_exact_request_key(trip_request, PROMPT_TEMPLATE_VERSION)
+            if key in first_index:
+                self._stats["duplicates"] += 1
+                duplicates.setdefault(first_index[key], []).append(index)
+                yield "item", {"index": index, "status": "duplicate", "duplicate_of": first_index[key]}
+            else:
+                first_index[key] = index
+                yield "item", {"index": index, "status": "queued"}
+
+        lookups: Dict[Any, asyncio.Task] = {}
+        tasks = [
+            asyncio.ensure_future(self._generate_one(index, trip_requests[index], mode, lookups))
+            for index in first_index.values()
+        ]
+
+        saved = 0
+        failed = 0
+        pending: List[Tuple[int, Dict[str, Any]]] = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, itinerary_data, error = await next_done
+                if error is not None:
+                    failed += 1 + len(duplicates.get(index, []))
+                    self._stats["failed"] += 1
+                    for item_index in [index] + duplicates.get(index, []):
+                        yield "item", {"index": item_index, "status": "failed", "detail": error}
+                    continue
+
+                self._stats["generated"] += 1
+                yield "item", {"index": index, "status": "generated", "generated_by": itinerary_data.get("generated_by")}
+                pending.append((index, itinerary_data))
+
+                if len(pending) >= self.write_batch_size:
+                    async for event in self._flush(pending, duplicates):
+                        saved, failed = self._tally(event, saved, failed)
+                        yield event
+                    pending = []
+
+            if pending:
+                async for event in self._flush(pending, duplicates):
+                    saved, failed = self._tally(event, saved, failed)
+                    yield event
+        finally:
+            # The client may disconnect mid-batch; don't leave generations running for nobody
+            for task in tasks:
+                task.cancel()
+            for task in lookups.values():
+                task.cancel()
+
+        yield "complete", {
+            "success": failed == 0,
+            "total": len(trip_requests),
+            "unique": len(first_index),
+            "duplicates": len(trip_requests) - len(first_index),
+            "saved": saved,
+            "failed": failed
+        }
+
+    async def _generate_one(self, index: int, trip_request: TripRequest, mode: GenerationMode,
+                            lookups: Dict[Any, asyncio.Task]) -> Tuple[int, Optional[Dict[str, Any]], Optional[str]]:
+        """Generate one itinerary, reusing the batch's lookups for its destination"""
+        try:
+            destination = trip_request.destination
+            place = (destination.city, destination.state)
+            preferences = trip_request.preferences.dict()
+
+            # Flights depend on the origin and on either end's airport, not just the destination
+            route = (
+                trip_request.origin.city, trip_request.origin.state, trip_request.origin.airport_id,
+                destination.city, destination.state, destination.airport_id
+            )
+            candidates = await self._shared(
+                lookups, ("candidates", route, json.dumps(preferences, sort_keys=True, default=str)),
+                lambda: self._get_candidates(trip_request)
+            )
+
+            if mode == GenerationMode.FAST:
+                return index, self.trip_planner.plan(trip_request, candidates), None
+
+            weather_data = await self._shared(
+                lookups, ("weather", place),
+                lambda: self.maps_service.get_weather_data(destination.city, destination.state)
+            )
+            local_events = await self._shared(
+                lookups, ("events", place, trip_request.start_date, trip_request.end_date),
+                lambda: self.maps_service.get_local_events(
+                    destination.city, destination.state,
+                    trip_request.start_date.isoformat(), trip_request.end_date.isoformat()
+                )
+            )
+
+            async with self._semaphore:
+                itinerary_data = await self.gemini_service.generate_itinerary(
+                    trip_request, weather_data, local_events, mode, candidates=candidates
+                )
+            return index, itinerary_data, None
+
+        except Exception as e:
+            logger.error(f"Error generating batch item {index}: {str(e)}")
+            return index, None, str(e)
+
+    async def _get_candidates(self, trip_request: TripRequest) -> Tuple[List[Dict], ...]:
+        return self.trip_planner.get_candidates(trip_request)
+
+    async def _shared(self, lookups: Dict[Any, asyncio.Task], key: Any,
+                      fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fetch`` once per key within a batch; later callers await the same result"""
+        self._stats["lookups"] += 1
+        task = lookups.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            lookups[key] = task
+        else:
+            self._stats["shared_lookups"] += 1
+        return await asyncio.shield(task)
+
+    async def _flush(self, pending: List[Tuple[int, Dict[str, Any]]],
+                     duplicates: Dict[int, List[int]]) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Write a group of generated itineraries in one Firestore batch"""
+        try:
+            itinerary_ids = await self.firebase_service.save_itineraries(
+                [itinerary_data for _, itinerary_data in pending], user_id="anonymous"  # In production, get from auth
+            )
+        except Exception as e:
+            logger.error(f"Error saving batch: {str(e)}")
+            for index, _ in pending:
+                self._stats["failed"] += 1
+                for item_index in [index] + duplicates.get(index, []):
+                    yield "item", {"index": item_index, "status": "failed", "detail": str(e)}
+            return
+
+        self._stats["write_batches"] += 1
+        self._stats["saved"] += len(itinerary_ids)
+        for (index, _), itinerary_id in zip(pending, itinerary_ids):
+            for item_index in [index] + duplicates.get(index, []):
+                yield "item", {"index": item_index, "status": "saved", "itinerary_id": itinerary_id}
+
+    @staticmethod
+    def _tally(event: Tuple[str, Dict[str, Any]], saved: int, failed: int) -> Tuple[int, int]:
+        status = event[1]["status"]
+        return saved + (status == "saved"), failed + (status == "failed")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return batch throughput and lookup sharing statistics"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "write_batch_size": self.write_batch_size,
+            **self._stats
+        }
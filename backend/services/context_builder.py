@@ -0,0 +1,247 @@
+import os
+import json
+import math
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rough average for English/JSON text with Gemini's tokenizer
+CHARS_PER_TOKEN = 4
+
+# Fields the model needs to choose and schedule each kind of candidate
+CANDIDATE_FIELDS = {
+    "activities": ["name", "category", "duration_hours", "cost_per_person", "rating", "themes"],
+    "restaurants": ["name", "cuisine", "price_range", "rating", "specialties"],
+    "accommodations": ["name", "type", "cost_per_night", "rating", "budget_level"],
+    "flights": ["airline", "departure_time", "arrival_time", "duration", "price", "type"]
+}
+
+# How many rows the old prompt embedded for each kind (with indent=2 JSON)
+LEGACY_LIMITS = {"activities": 5, "accommodations": 3, "flights": 3, "restaurants": 5}
+
+# Fields kept when an existing itinerary is sent back to the model
+ITINERARY_ITEM_FIELDS = ["name", "time_slot", "meal", "cost_per_person", "price_range", "category", "cuisine"]
+
+BUDGET_LEVEL_PRICE_RANGES = {"budget": 2, "mid_range": 3, "luxury": 4}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the Gemini token count of a piece of text"""
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN)) if text else 0
+
+
+def compact_json(value: Any) -> str:
+    """Minified JSON rendering used inside prompts"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _preference_terms(preferences: Dict[str, Any]) -> set:
+    terms = [getattr(theme, "value", theme) for theme in preferences.get("themes", [])]
+    terms += preferences.get("interests", [])
+    return {str(term).lower() for term in terms}
+
+
+def score_candidate(kind: str, item: Dict[str, Any], preferences: Dict[str, Any]) -> float:
+    """Score how well a candidate fits the traveller's preferences (higher is better)"""
+    terms = _preference_terms(preferences)
+    budget_level = getattr(preferences.get("budget_level"), "value", preferences.get("budget_level"))
+    rating = (item.get("rating") or 0) / 5
+
+    if kind in ("activities", "restaurants"):
+        tags = {str(tag).lower() for tag in item.get("themes", []) + item.get("interests", [])}
+        tags.add(str(item.get("category") or item.get("cuisine") or "").lower())
+        score = 2 * len(tags & terms) + rating
+        if kind == "restaurants":
+            price_level = len(item.get("price_range") or "")
+            if price_level > BUDGET_LEVEL_PRICE_RANGES.get(budget_level, 3):
+                score -= 1
+        return score
+
+    score = rating
+    if item.get("budget_level") == budget_level:
+        score += 1
+    if kind == "flights":
+        # Cheaper flights first within the same budget level
+        score -= (item.get("price") or 0) / 100000
+    return score
+
+
+def rank_candidates(kind: str, items: List[Dict[str, Any]], preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Order candidates from best to worst fit"""
+    return sorted(items, key=lambda item: score_candidate(kind, item, preferences), reverse=True)
+
+
+class ContextBuilder:
+    """Builds the compact, token-budgeted data sections embedded in Gemini prompts.
+
+    Candidates are projected to the fields in ``CANDIDATE_FIELDS``, ranked
+    against the traveller's preferences and rendered as pipe-separated
+    tables. Rows are added best-first, round-robin across kinds, until the
+    token budget is spent. The model refers to items by name and
+    ``hydrate_itinerary`` reattaches the full records afterwards.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None):
+        self.token_budget = token_budget or int(os.getenv("GEMINI_CONTEXT_TOKEN_BUDGET", "1500"))
+        self._requests = 0
+        self._tokens_sent = 0
+        self._tokens_saved = 0
+        self._items_dropped = 0
+
+    def build_candidate_context(self, context: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Render the available activities, restaurants, stays and flights within the token budget"""
+        preferences = context.get("preferences", {})
+        duration_days = max(context.get("trip_details", {}).get("duration_days", 1), 1)
+        limits = {
+            "activities": max(5, 3 * duration_days),
+            "restaurants": max(5, 2 * duration_days),
+            "accommodations": 3,
+            "flights": 3
+        }
+        ranked = {
+            kind: rank_candidates(kind, context.get(f"available_{kind}", []) or [], preferences)[:limits[kind]]
+            for kind in CANDIDATE_FIELDS
+        }
+
+        rows = {kind: [] for kind in CANDIDATE_FIELDS}
+        used = sum(estimate_tokens(self._table_header(kind)) for kind in CANDIDATE_FIELDS)
+        position = 0
+        while any(position < len(items) for items in ranked.values()):
+            for kind, items in ranked.items():
+                if position >= len(items):
+                    continue
+                row = self._table_row(kind, items[position])
+                cost = estimate_tokens(row)
+                if used + cost > self.token_budget and rows[kind]:
+                    continue
+                rows[kind].append(row)
+                used += cost
+            position += 1
+
+        text = "\n".join(
+            "\n".join([self._table_header(kind)] + rows[kind])
+            for kind in CANDIDATE_FIELDS if rows[kind]
+        )
+
+        legacy_text = "\n".join(
+            json.dumps((context.get(f"available_{kind}", []) or [])[:limit], indent=2)
+            for kind, limit in LEGACY_LIMITS.items()
+        )
+        considered = sum(len(items) for items in ranked.values())
+        included = sum(len(kind_rows) for kind_rows in rows.values())
+        stats = self._record(text, legacy_text, considered - included)
+        stats["items_included"] = included
+        return text, stats
+
+    def build_itinerary_context(self, itinerary: Dict[str, Any],
+                                days: Optional[List[int]] = None) -> Tuple[str, Dict[str, Any]]:
+        """Render a stored itinerary without request metadata, images or descriptions"""
+        all_days = itinerary.get("days", [])
+        indexes = range(len(all_days)) if days is None else [i for i in days if 0 <= i < len(all_days)]
+
+        projected = {
+            "summary": itinerary.get("summary"),
+            "total_cost": itinerary.get("total_cost"),
+            "day_count": len(all_days),
+            "days": [
+                {
+                    "index": i,
+                    "date": all_days[i].get("date"),
+                    "activities": [self._project(item, ITINERARY_ITEM_FIELDS) for item in all_days[i].get("activities", [])],
+                    "meals": [self._project(item, ITINERARY_ITEM_FIELDS) for item in all_days[i].get("meals", [])],
+                    "total_daily_cost": all_days[i].get("total_daily_cost")
+                }
+                for i in indexes
+            ],
+            "accommodation": [item.get("name") for item in itinerary.get("accommodation", [])],
+            "transportation": [item.get("airline") or item.get("mode") for item in itinerary.get("transportation", [])]
+        }
+        text = compact_json(projected)
+        legacy_text = json.dumps(itinerary, indent=2, default=str)
+        return text, self._record(text, legacy_text, 0)
+
+    def render_table(self, kind: str, items: List[Dict[str, Any]]) -> str:
+        """Render candidates of one kind as a compact table"""
+        return "\n".join([self._table_header(kind)] + [self._table_row(kind, item) for item in items])
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return cumulative token savings"""
+        return {
+            "token_budget": self.token_budget,
+            "requests": self._requests,
+            "tokens_sent": self._tokens_sent,
+            "tokens_saved": self._tokens_saved,
+            "avg_tokens_saved": round(self._tokens_saved / self._requests, 1) if self._requests else 0.0,
+            "items_dropped": self._items_dropped
+        }
+
+    def _record(self, text: str, legacy_text: str, items_dropped: int) -> Dict[str, Any]:
+        tokens = estimate_tokens(text)
+        legacy_tokens = estimate_tokens(legacy_text)
+        saved = max(legacy_tokens - tokens, 0)
+
+        self._requests += 1
+        self._tokens_sent += tokens
+        self._tokens_saved += saved
+        self._items_dropped += items_dropped
+
+        logger.info(f"Prompt context: ~{tokens} tokens (legacy ~{legacy_tokens}, saved ~{saved})")
+        return {
+            "tokens_estimated": tokens,
+            "tokens_legacy": legacy_tokens,
+            "tokens_saved": saved,
+            "items_dropped": items_dropped
+        }
+
+    def _table_header(self, kind: str) -> str:
+        return f"{kind.capitalize()} ({'|'.join(CANDIDATE_FIELDS[kind])}):"
+
+    def _table_row(self, kind: str, item: Dict[str, Any]) -> str:
+        return "|".join(self._cell(item.get(field)) for field in CANDIDATE_FIELDS[kind])
+
+    @staticmethod
+    def _cell(value: Any) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, (list, tuple)):
+            value = ",".join(str(v) for v in value)
+        elif isinstance(value, float):
+            value = round(value, 2)
+        return str(value).replace("|", "/").replace("\n", " ")
+
+    @staticmethod
+    def _project(item: Any, fields: List[str]) -> Any:
+        if not isinstance(item, dict):
+            return item
+        return {field: item[field] for field in fields if item.get(field) not in (None, "", [])}
+
+
+def hydrate_itinerary(itinerary: Dict[str, Any], activities: List[Dict] = None,
+                      accommodations: List[Dict] = None, flights: List[Dict] = None,
+                      restaurants: List[Dict] = None) -> Dict[str, Any]:
+    """Reattach full candidate records to items the model referenced by name"""
+    def index(items, key="name"):
+        return {str(item.get(key, "")).strip().lower(): item for item in items or []}
+
+    def merge(item, lookup, key="name"):
+        if not isinstance(item, dict):
+            item = {key: item}
+        match = lookup.get(str(item.get(key, "")).strip().lower())
+        return {**match, **item} if match else item
+
+    activity_index = index(activities)
+    restaurant_index = index(restaurants)
+    for day in itinerary.get("days", []):
+        day["activities"] = [merge(item, activity_index) for item in day.get("activities", [])]
+        day["meals"] = [merge(item, restaurant_index) for item in day.get("meals", [])]
+
+    if "accommodation" in itinerary:
+        accommodation_index = index(accommodations)
+        itinerary["accommodation"] = [merge(item, accommodation_index) for item in itinerary["accommodation"]]
+    if "transportation" in itinerary:
+        flight_index = index(flights, "airline")
+        itinerary["transportation"] = [merge(item, flight_index, "airline") for item in itinerary["transportation"]]
+    return itinerary
@@ -0,0 +1,118 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from models.trip_models import Location
+from services.ttl_cache import TTLCache
+from services.trip_planner import GENERAL_CULTURAL_INSIGHTS, GENERAL_LOCAL_RECOMMENDATIONS, GENERAL_SAFETY_TIPS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Itinerary sections that depend only on the destination and the time of year
+KNOWLEDGE_SECTIONS = ("cultural_insights", "safety_tips", "local_recommendations")
+
+GENERAL_KNOWLEDGE = {
+    "cultural_insights": GENERAL_CULTURAL_INSIGHTS,
+    "safety_tips": GENERAL_SAFETY_TIPS,
+    "local_recommendations": GENERAL_LOCAL_RECOMMENDATIONS
+}
+
+
+def knowledge_key(destination: Location, month: int) -> str:
+    """Cache key for a destination in a given month"""
+    place = "|".join((part or "").strip().lower() for part in (destination.city, destination.state, destination.country))
+    return f"{place}|{month:02d}"
+
+
+def general_knowledge() -> Dict[str, List[str]]:
+    return {section: list(tips) for section, tips in GENERAL_KNOWLEDGE.items()}
+
+
+class DestinationKnowledgeStore:
+    """Cultural insights, safety tips and local recommendations per destination and month.
+
+    Entries are generated once by ``generate`` and shared by every trip to
+    the same place in the same month. After ``refresh_seconds`` an entry is
+    still served but regenerated in the background; after
+    ``max_age_seconds`` it is dropped. Concurrent misses for one key share a
+    single generation, and a failed generation serves the general tips
+    without caching them.
+    """
+
+    def __init__(self, generate: Callable[[Location, int], Awaitable[Dict[str, List[str]]]],
+                 refresh_seconds: Optional[float] = None, max_age_seconds: Optional[float] = None,
+                 max_entries: Optional[int] = None, disk_dir: Optional[str] = None):
+        self.generate = generate
+        self.refresh_seconds = refresh_seconds or float(os.getenv("KNOWLEDGE_REFRESH_SECONDS", str(30 * 86400)))
+        self.max_age_seconds = max_age_seconds or float(os.getenv("KNOWLEDGE_MAX_AGE_SECONDS", str(90 * 86400)))
+        self.cache = TTLCache(
+            max_entries=max_entries or int(os.getenv("KNOWLEDGE_CACHE_SIZE", "512")),
+            ttl_seconds=self.max_age_seconds,
+            disk_dir=disk_dir or os.getenv("KNOWLEDGE_CACHE_DIR")
+        )
+
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "shared_misses": 0,
+            "stale_served": 0,
+            "generated": 0,
+            "refreshed": 0,
+            "failures": 0
+        }
+
+    async def get(self, destination: Location, month: int) -> Dict[str, List[str]]:
+        """Return the sections for a destination and month, generating them on a miss"""
+        key = knowledge_key(destination, month)
+        entry = self.cache.get(key)
+        if entry is not None:
+            self._stats["hits"] += 1
+            if time.time() - entry["generated_at"] >= self.refresh_seconds and key not in self._inflight:
+                self._stats["stale_served"] += 1
+                self._load(key, destination, month, refresh=True)
+            return entry["sections"]
+
+        self._stats["misses"] += 1
+        future = self._inflight.get(key)
+        if future is None:
+            future = self._load(key, destination, month)
+        else:
+            self._stats["shared_misses"] += 1
+        # Shielded so a cancelled request does not abort the generation other requests wait on
+        return await asyncio.shield(future)
+
+    def peek(self, destination: Location, month: int) -> Optional[Dict[str, List[str]]]:
+        """Return cached sections without ever generating them"""
+        entry = self.cache.get(knowledge_key(destination, month))
+        return entry["sections"] if entry is not None else None
+
+    def _load(self, key: str, destination: Location, month: int, refresh: bool = False) -> asyncio.Future:
+        future = asyncio.ensure_future(self._generate(key, destination, month, refresh))
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return future
+
+    async def _generate(self, key: str, destination: Location, month: int, refresh: bool) -> Dict[str, List[str]]:
+        try:
+            sections = await self.generate(destination, month)
+        except Exception as e:
+            logger.warning(f"Destination knowledge for {key} unavailable: {str(e)}")
+            self._stats["failures"] += 1
+            return general_knowledge()
+
+        self.cache.set(key, {"generated_at": time.time(), "sections": sections})
+        self._stats["refreshed" if refresh else "generated"] += 1
+        return sections
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "refresh_seconds": self.refresh_seconds,
+            "inflight": len(self._inflight),
+            "cache": self.cache.get_metrics()
+        }
@@ -0,0 +1,274 @@
+import os
+import re
+import json
+import math
+import time
+import random
+import logging
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+
+from services.context_builder import CHARS_PER_TOKEN, estimate_tokens
+from services.llm_backend import LLMBackend
+from services.metrics import LatencyDistribution
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPLAY_DIR = Path(__file__).resolve().parent.parent / "mocks" / "gemini"
+
+_TABLE_HEADER = re.compile(r"^\s*(Activities|Restaurants|Accommodations|Flights) \(([^)]*)\):\s*$")
+_DAY_HEADER = re.compile(r"^\s*Day (\d+) \((\d{4}-\d{2}-\d{2})\):\s*$")
+
+TIME_SLOTS = ["09:00-11:30", "12:30-15:00", "16:00-18:30", "19:00-21:00"]
+MEALS = ["lunch", "dinner", "breakfast"]
+
+
+class FakeLLMError(Exception):
+    """Injected failure from the fake backend"""
+
+
+def classify_prompt(prompt: str) -> str:
+    """Tell which GeminiService prompt this is"""
+    if "JSON Patch" in prompt or '"suggestions"' in prompt:
+        return "alternatives"
+    if "destination briefing" in prompt:
+        return "knowledge"
+    if "real-time conditions" in prompt:
+        return "updates"
+    if "trip-level overview" in prompt:
+        return "overview"
+    if "Plan only the days below" in prompt:
+        return "days"
+    return "itinerary"
+
+
+def parse_tables(text: str) -> Dict[str, List[Dict[str, str]]]:
+    """Read the pipe-separated candidate tables rendered by ContextBuilder"""
+    tables: Dict[str, List[Dict[str, str]]] = {}
+    fields: Optional[List[str]] = None
+    rows: Optional[List[Dict[str, str]]] = None
+    for line in text.splitlines():
+        header = _TABLE_HEADER.match(line)
+        if header:
+            fields = header.group(2).split("|")
+            rows = tables.setdefault(header.group(1).lower(), [])
+        elif rows is not None and "|" in line and len(line.split("|")) == len(fields):
+            rows.append(dict(zip(fields, (cell.strip() for cell in line.split("|")))))
+        else:
+            rows = None
+    return tables
+
+
+class PromptSynthesizer:
+    """Builds plausible, schema-valid Gemini answers from the data embedded in a prompt"""
+
+    def respond(self, prompt: str, rng: random.Random, structured: bool = False) -> str:
+        kind = classify_prompt(prompt)
+        data = getattr(self, f"_{kind}")(prompt, rng)
+        if structured:
+            # JSON-typed output comes back bare, like Gemini's response_mime_type="application/json"
+            return json.dumps(data, ensure_ascii=False)
+        return "```json\n" + json.dumps(data, indent=2, ensure_ascii=False) + "\n```"
+
+    def _itinerary(self, prompt: str, rng: random.Random) -> Dict[str, Any]:
+        tables = parse_tables(prompt)
+        duration = int(self._search(r"Duration: (\d+) days", prompt, "1"))
+        start = self._search(r"Dates: (\d{4}-\d{2}-\d{2})", prompt, date.today().isoformat())
+        activities = tables.get("activities", [])
+        restaurants = tables.get("restaurants", [])
+
+        days = []
+        for i in range(duration):
+            day_activities = activities[2 * i:2 * i + 2] or activities[:1]
+            day_meals = [restaurants[(2 * i + j) % len(restaurants)] for j in range(min(2, len(restaurants)))]
+            days.append(self._day((date.fromisoformat(start) + timedelta(days=i)).isoformat(), day_activities, day_meals))
+
+        itinerary = self._overview_sections(tables, f"A {duration}-day trip")
+        itinerary["days"] = days
+        itinerary["total_cost"] = 0
+        itinerary["budget_breakdown"] = {"accommodation": 0, "transportation": 0, "activities": 0, "meals": 0}
+        return {key: itinerary[key] for key in
+                ("summary", "days", "accommodation", "transportation", "total_cost", "budget_breakdown")}
+
+    def _days(self, prompt: str, rng: random.Random) -> Dict[str, Any]:
+        sections = []
+        current: Optional[List[str]] = None
+        for line in prompt.splitlines():
+            header = _DAY_HEADER.match(line)
+            if header:
+                current = []
+                sections.append((header.group(2), current))
+            elif current is not None:
+                current.append(line)
+        days = []
+        for day_date, lines in sections:
+            tables = parse_tables("\n".join(lines))
+            days.append(self._day(day_date, tables.get("activities", []), tables.get("restaurants", [])))
+        return {"days": days}
+
+    def _overview(self, prompt: str, rng: random.Random) -> Dict[str, Any]:
+        return self._overview_sections(parse_tables(prompt), "A well-paced trip")
+
+    def _alternatives(self, prompt: str, rng: random.Random) -> Dict[str, Any]:
+        tables = parse_tables(prompt)
+        indexes = [int(index) for index in re.findall(r'"index":(\d+)', prompt)]
+        options = tables.get("activities", [])
+        suggestions = []
+        for index, option in zip(indexes, options):
+            suggestions.append({
+                "title": f"Try {option['name']} instead",
+                "description": f"Swap the first activity of day {index + 1} for {option['name']}.",
+                "patch": [{"op": "replace", "path": f"/days/{index}/activities/0",
+                           "value": {"name": option["name"], "time_slot": TIME_SLOTS[0]}}],
+                "reasoning": "Keeps the day's pace while addressing the feedback."
+            })
+        return {"suggestions": suggestions[:3]}
+
+    def _updates(self, prompt: str, rng: random.Random) -> Dict[str, Any]:
+        return {
+            "updates": [{
+                "type": "weather",
+                "affected_date": date.today().isoformat(),
+                "original_activity": "Outdoor sightseeing",
+                "suggested_alternative": "Museum visit",
+                "reason": "Rain expected in the afternoon",
+                "cost_impact": 0,
+                "booking_required": False
+            }],
+            "general_recommendations": ["Carry an umbrella", "Start early to avoid traffic"]
+        }
+
+    def _day(self, day_date: str, activities: List[Dict[str, str]], restaurants: List[Dict[str, str]]) -> Dict[str, Any]:
+        return {
+            "date": day_date,
+            "activities": [{"name": item["name"], "time_slot": TIME_SLOTS[i % len(TIME_SLOTS)]}
+                           for i, item in enumerate(activities)],
+            "meals": [{"name": item["name"], "meal": MEALS[i % len(MEALS)]} for i, item in enumerate(restaurants)],
+            "transportation": []
+        }
+
+    def _overview_sections(self, tables: Dict[str, List[Dict[str, str]]], summary: str) -> Dict[str, Any]:
+        return {
+            "summary": f"{summary} built from the available options.",
+            "accommodation": [{"name": item["name"]} for item in tables.get("accommodations", [])[:1]],
+            "transportation": [{"airline": item["airline"]} for item in tables.get("flights", [])[:1]]
+        }
+
+    def _knowledge(self, prompt: str, rng: random.Random) -> Dict[str, Any]:
+        place = self._search(r"visiting (.+?) in \w+\.", prompt, "the destination")
+        return {
+            "cultural_insights": [f"Greet elders first in {place}", "Remove shoes before entering temples", "Ask before taking photos"],
+            "safety_tips": ["Use registered taxis", "Keep valuables in the hotel safe", "Drink bottled water"],
+            "local_recommendations": [f"Visit {place}'s markets in the evening", "Try the local breakfast", "Book popular sights early"]
+        }
+
+    @staticmethod
+    def _search(pattern: str, text: str, default: str) -> str:
+        match = re.search(pattern, text)
+        return match.group(1) if match else default
+
+
+class FakeGeminiBackend(LLMBackend):
+    """Offline stand-in for Gemini used for load tests, benchmarks and local development.
+
+    In ``synthesize`` mode answers are built from the candidates embedded in
+    each prompt, so they hydrate like real ones; in ``replay`` mode the
+    recorded responses in ``FAKE_LLM_REPLAY_DIR`` are returned, picked by
+    prompt kind. Time to first chunk follows ``FAKE_LLM_LATENCY``, chunks of
+    ``FAKE_LLM_CHUNK_SIZE`` characters follow every
+    ``FAKE_LLM_CHUNK_DELAY_MS``, and failures or truncated answers are
+    injected at ``FAKE_LLM_ERROR_RATE`` and ``FAKE_LLM_TRUNCATE_RATE``.
+    """
+
+    def __init__(self, mode: Optional[str] = None, latency: Optional[str] = None,
+                 chunk_size: Optional[int] = None, chunk_delay_ms: Optional[float] = None,
+                 error_rate: Optional[float] = None, truncate_rate: Optional[float] = None,
+                 replay_dir: Optional[str] = None, seed: Optional[int] = None, model_name: Optional[str] = None):
+        self.model_name = f"fake:{model_name}" if model_name else "fake-gemini"
+        self.mode = (mode or os.getenv("FAKE_LLM_MODE", "synthesize")).lower()
+        self.latency = LatencyDistribution(latency or os.getenv("FAKE_LLM_LATENCY", "lognormal:800,0.4"))
+        self.chunk_size = chunk_size or int(os.getenv("FAKE_LLM_CHUNK_SIZE", "256"))
+        self.chunk_delay = (chunk_delay_ms if chunk_delay_ms is not None
+                            else float(os.getenv("FAKE_LLM_CHUNK_DELAY_MS", "20"))) / 1000
+        self.error_rate = error_rate if error_rate is not None else float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+        self.truncate_rate = truncate_rate if truncate_rate is not None else float(os.getenv("FAKE_LLM_TRUNCATE_RATE", "0"))
+        if self.mode not in ("synthesize", "replay"):
+            raise ValueError(f"Unknown FAKE_LLM_MODE: {self.mode}")
+
+        seed = seed if seed is not None else os.getenv("FAKE_LLM_SEED")
+        self._rng = random.Random(None if seed is None else int(seed))
+        self._lock = threading.Lock()
+        self._synthesizer = PromptSynthesizer()
+        self._recordings = self._load_recordings(Path(replay_dir or os.getenv("FAKE_LLM_REPLAY_DIR") or DEFAULT_REPLAY_DIR))
+        self._replayed: Dict[str, int] = {}
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs) -> Any:
+        with self._lock:
+            # Draw everything up front so concurrent calls stay reproducible under a seed
+            ttft = self.latency.sample(self._rng)
+            fail = self._rng.random() < self.error_rate
+            truncate = self._rng.random() < self.truncate_rate
+            cut = self._rng.uniform(0.3, 0.9)
+            fail_at = self._rng.random()
+            text = self._respond(prompt, kwargs.get("generation_config") or {})
+
+        if truncate:
+            text = text[:int(len(text) * cut)]
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)] or [""]
+        usage = SimpleNamespace(
+            prompt_token_count=estimate_tokens(prompt),
+            candidates_token_count=math.ceil(len(text) / CHARS_PER_TOKEN)
+        )
+
+        # Like the SDK, give up once request_options' timeout has passed
+        timeout = (kwargs.get("request_options") or {}).get("timeout")
+        if stream:
+            return self._stream(chunks, ttft, usage, int(fail_at * len(chunks)) if fail else None, timeout)
+
+        if timeout is not None and ttft > timeout:
+            time.sleep(timeout)
+            raise FakeLLMError("504 Deadline Exceeded (request timeout in the fake LLM backend)")
+        time.sleep(ttft + self.chunk_delay * (len(chunks) - 1))
+        if fail:
+            raise FakeLLMError("503 Service Unavailable (injected by the fake LLM backend)")
+        return SimpleNamespace(text=text, usage_metadata=usage)
+
+    def _stream(self, chunks: List[str], ttft: float, usage: Any, fail_at: Optional[int],
+                timeout: Optional[float] = None) -> Iterator[Any]:
+        if timeout is not None and ttft > timeout:
+            time.sleep(timeout)
+            raise FakeLLMError("504 Deadline Exceeded (request timeout in the fake LLM backend)")
+        time.sleep(ttft)
+        for i, chunk in enumerate(chunks):
+            if i == fail_at:
+                raise FakeLLMError("503 Service Unavailable (injected mid-stream by the fake LLM backend)")
+            if i:
+                time.sleep(self.chunk_delay)
+            yield SimpleNamespace(text=chunk, usage_metadata=usage if i == len(chunks) - 1 else None)
+
+    def _respond(self, prompt: str, generation_config: Dict[str, Any]) -> str:
+        structured = generation_config.get("response_mime_type") == "application/json"
+        # Recordings are free-text answers, so schema-constrained calls are always synthesized
+        if self.mode == "replay" and not structured:
+            kind = classify_prompt(prompt)
+            # Days and overview prompts can be answered by a full itinerary recording
+            recordings = self._recordings.get("itinerary" if kind in ("days", "overview") else kind)
+            if recordings:
+                index = self._replayed.get(kind, 0)
+                self._replayed[kind] = index + 1
+                return recordings[index % len(recordings)]
+        return self._synthesizer.respond(prompt, self._rng, structured)
+
+    @staticmethod
+    def _load_recordings(directory: Path) -> Dict[str, List[str]]:
+        recordings: Dict[str, List[str]] = {}
+        if directory.is_dir():
+            for path in sorted(directory.glob("*.txt")):
+                kind = path.stem.split("_")[0]
+                recordings.setdefault(kind, []).append(path.read_text(encoding="utf-8"))
+        return recordings
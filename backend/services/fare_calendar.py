@@ -0,0 +1,163 @@
+import os
+import time
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.flight_offers import money
+from services.ttl_cache import TTLCache
+from services.rate_limiter import TokenBucket
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def fare_cell(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The cheapest fares for one date from a ``searchFlights`` aggregation block"""
+    aggregation = (payload.get("data") or {}).get("aggregation") or {}
+    if not aggregation.get("minPrice"):
+        return None
+    direct = [stop for stop in aggregation.get("stops") or [] if stop.get("numberOfStops") == 0]
+    return {
+        "price": money(aggregation["minPrice"]),
+        "direct_price": money(direct[0].get("minPrice")) if direct else None,
+        "currency": aggregation["minPrice"].get("currencyCode"),
+        "offers": aggregation.get("totalCount", 0)
+    }
+
+
+class FareCalendar:
+    """Cheapest fare per day for a route over a date range.
+
+    Each date is one ``get_flights`` call. Dates are fetched concurrently,
+    up to ``concurrency`` at a time and at most ``rate`` calls per second.
+    Only the ``aggregation`` block of each response is kept. Cells are
+    cached per route, date and party for ``ttl_seconds``; a date with no
+    fare is remembered for the shorter ``empty_ttl_seconds``. Concurrent
+    requests for the same cell share one call, and failed cells are not
+    cached.
+    """
+
+    def __init__(self, fetch: Callable[..., Awaitable[Dict[str, Any]]], max_days: Optional[int] = None,
+                 concurrency: Optional[int] = None, rate: Optional[float] = None,
+                 ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None,
+                 empty_ttl_seconds: Optional[float] = None, disk_dir: Optional[str] = None):
+        self.fetch = fetch
+        self.max_days = max_days or int(os.getenv("FARE_CALENDAR_MAX_DAYS", "62"))
+        self.semaphore = asyncio.Semaphore(concurrency or int(os.getenv("FARE_CALENDAR_CONCURRENCY", "4")))
+        self.bucket = TokenBucket(rate or float(os.getenv("FARE_CALENDAR_RATE", "5")))
+        self.cache = TTLCache(
+            max_entries=max_entries or int(os.getenv("FARE_CALENDAR_CACHE_SIZE", "4096")),
+            ttl_seconds=ttl_seconds or float(os.getenv("FARE_CALENDAR_TTL", "3600")),
+            disk_dir=disk_dir or os.getenv("FARE_CALENDAR_CACHE_DIR")
+        )
+        self.empty_ttl_seconds = empty_ttl_seconds or float(os.getenv("FARE_CALENDAR_EMPTY_TTL", "300"))
+
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {
+            "calendars": 0,
+            "cells_cached": 0,
+            "cells_fetched": 0,
+            "cells_shared": 0,
+            "cells_empty": 0,
+            "cells_failed": 0
+        }
+
+    def dates(self, start: date, end: date) -> List[date]:
+        """Every date in the range, or ValueError if it is empty or too long"""
+        days = (end - start).days + 1
+        if days < 1:
+            raise ValueError("end_date must not be before start_date")
+        if days > self.max_days:
+            raise ValueError(f"A fare calendar can span at most {self.max_days} days")
+        return [start + timedelta(days=offset) for offset in range(days)]
+
+    async def cells(self, from_id: str, to_id: str, start: date, end: date,
+                    adults: str = "1", children: str = "0,17") -> AsyncIterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Yield ``(date, cell)`` as cells fill in, cached ones first; a failed cell is None"""
+        self._stats["calendars"] += 1
+        pending = []
+        for day in self.dates(start, end):
+            key = f"{from_id}|{to_id}|{day.isoformat()}|{adults}|{children}".upper()
+            cell = self._cached(key)
+            if cell is not None:
+                self._stats["cells_cached"] += 1
+                yield day.isoformat(), cell or None
+                continue
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._load(key, from_id, to_id, day, adults, children)
+            else:
+                self._stats["cells_shared"] += 1
+            pending.append(self._labelled(day, future))
+
+        for next_cell in asyncio.as_completed(pending):
+            yield await next_cell
+
+    async def grid(self, from_id: str, to_id: str, start: date, end: date,
+                   adults: str = "1", children: str = "0,17") -> Dict[str, Any]:
+        """The whole calendar as a compact date -> price grid"""
+        cells = {}
+        async for day, cell in self.cells(from_id, to_id, start, end, adults, children):
+            cells[day] = cell
+        return self.summarize(from_id, to_id, dict(sorted(cells.items())))
+
+    def summarize(self, from_id: str, to_id: str, cells: Dict[str, Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+        priced = {day: cell for day, cell in cells.items() if cell}
+        cheapest = min(priced, key=lambda day: priced[day]["price"]) if priced else None
+        return {
+            "from_id": from_id,
+            "to_id": to_id,
+            "currency": next((cell["currency"] for cell in priced.values()), None),
+            "prices": {day: cell["price"] if cell else None for day, cell in cells.items()},
+            "direct_prices": {day: cell["direct_price"] if cell else None for day, cell in cells.items()},
+            "cheapest": {"date": cheapest, "price": priced[cheapest]["price"]} if cheapest else None,
+            "missing": [day for day, cell in cells.items() if cell is None]
+        }
+
+    def _cached(self, key: str) -> Optional[Dict[str, Any]]:
+        """The cached cell, ``{}`` for a date known to have no fare, or None on a miss"""
+        cell = self.cache.get(key)
+        if cell is not None and "no_fare_until" in cell:
+            return {} if time.time() < cell["no_fare_until"] else None
+        return cell
+
+    async def _labelled(self, day: date, future: asyncio.Future) -> Tuple[str, Optional[Dict[str, Any]]]:
+        # Shielded so a client that disconnects does not cancel a cell other requests share
+        return day.isoformat(), await asyncio.shield(future)
+
+    def _load(self, key: str, from_id: str, to_id: str, day: date, adults: str, children: str) -> asyncio.Future:
+        future = asyncio.ensure_future(self._fetch_cell(key, from_id, to_id, day, adults, children))
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return future
+
+    async def _fetch_cell(self, key: str, from_id: str, to_id: str, day: date,
+                          adults: str, children: str) -> Optional[Dict[str, Any]]:
+        async with self.semaphore:
+            await self.bucket.acquire()
+            try:
+                payload = await self.fetch(from_id, to_id, day.isoformat(), adults, children)
+            except Exception as e:
+                logger.warning(f"Fare calendar cell {key} failed: {str(e)}")
+                self._stats["cells_failed"] += 1
+                return None
+        cell = fare_cell(payload)
+        if cell is None:
+            self._stats["cells_empty"] += 1
+            self.cache.set(key, {"no_fare_until": time.time() + self.empty_ttl_seconds})
+            return None
+        self._stats["cells_fetched"] += 1
+        self.cache.set(key, cell)
+        return cell
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "inflight": len(self._inflight),
+            "empty_ttl_seconds": self.empty_ttl_seconds,
+            "rate_limit": self.bucket.get_metrics(),
+            "cache": self.cache.get_metrics()
+        }
@@ -43,6 +43,31 @@ class FirebaseService:
             logger.error(f"Error saving itinerary: {str(e)}")
             raise Exception(f"Failed to save itinerary: {str(e)}")
     
+    async def save_itineraries(self, itineraries: List[Dict[str, Any]], user_id: str) -> List[str]:
+        """Save several itineraries with batched writes, returning their IDs in order"""
+        try:
+            itinerary_ids = []
+            # Firestore caps a write batch at 500 operations
+            for start in range(0, len(itineraries), 500):
+                batch = self.db.batch()
+                for itinerary_data in itineraries[start:start + 500]:
+                    itinerary_id = str(uuid.uuid4())
+                    itinerary_data["id"] = itinerary_id
+                    itinerary_data["user_id"] = user_id
+                    itinerary_data["created_at"] = datetime.now()
+                    itinerary_data["updated_at"] = datetime.now()
+                    
+                    batch.set(self.db.collection("itineraries").document(itinerary_id), itinerary_data)
+                    itinerary_ids.append(itinerary_id)
+                batch.commit()
+            
+            logger.info(f"Saved {len(itinerary_ids)} itineraries in batched writes")
+            return itinerary_ids
+        
+        except Exception as e:
+            logger.error(f"Error saving itineraries: {str(e)}")
+            raise Exception(f"Failed to save itineraries: {str(e)}")
+    
     async def get_itinerary(self, itinerary_id: str) -> Optional[Dict[str, Any]]:
         """Get itinerary by ID"""
         try:
@@ -0,0 +1,189 @@
+import logging
+from datetime import datetime, time
+from typing import Any, Dict, Iterable, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SORT_KEYS = {
+    "price": lambda offer: offer.price,
+    "duration": lambda offer: offer.duration_minutes,
+    "departure": lambda offer: offer.departure,
+    "arrival": lambda offer: offer.arrival,
+    "stops": lambda offer: (offer.stops, offer.price)
+}
+
+
+def money(value: Optional[Dict[str, Any]]) -> float:
+    """Booking.com ``{"units": 13861, "nanos": 190000000}`` as 13861.19"""
+    if not value:
+        return 0.0
+    return round(value.get("units", 0) + value.get("nanos", 0) / 1e9, 2)
+
+
+def offer_key(offer: Dict[str, Any]) -> str:
+    """Identity of a raw offer across result pages: its flights and cabin, not its per-page token"""
+    legs = [leg for segment in offer.get("segments") or [] for leg in segment.get("legs") or []]
+    if not legs:
+        return offer.get("token") or ""
+    return "|".join(
+        f"{((leg.get('flightInfo') or {}).get('carrierInfo') or {}).get('marketingCarrier')}"
+        f"{(leg.get('flightInfo') or {}).get('flightNumber')}@{leg.get('departureTime')}/{leg.get('cabinClass')}"
+        for leg in legs
+    )
+
+
+class FlightOffer:
+    """One flight offer, reduced to the fields the app shows.
+
+    Airline names and logos are not repeated on each offer; they are
+    collected once per response in ``FlightOfferSet.airlines``.
+    """
+
+    __slots__ = (
+        "token", "price", "currency", "base_fare", "tax", "airline", "flight_numbers",
+        "origin", "destination", "departure", "arrival", "duration_minutes", "stops",
+        "cabin_class", "checked_bags", "cabin_bags", "trip_type"
+    )
+
+    FIELDS = __slots__
+
+    def __init__(self, **values):
+        for field in self.__slots__:
+            setattr(self, field, values.get(field))
+
+    @classmethod
+    def from_booking(cls, offer: Dict[str, Any], airlines: Dict[str, Dict[str, str]]) -> "FlightOffer":
+        """Normalize a ``flightOffers`` item, registering its carriers in ``airlines``"""
+        segments = offer.get("segments") or [{}]
+        outbound = segments[0]
+        legs = outbound.get("legs") or [{}]
+        flight_numbers = []
+        for leg in legs:
+            info = leg.get("flightInfo") or {}
+            carrier = (info.get("carrierInfo") or {}).get("marketingCarrier") or ""
+            flight_numbers.append(f"{carrier}{info.get('flightNumber', '')}")
+            for data in leg.get("carriersData") or []:
+                airlines.setdefault(data.get("code"), {"name": data.get("name"), "logo": data.get("logo")})
+
+        carriers = legs[0].get("carriersData") or [{}]
+        price = offer.get("priceBreakdown") or {}
+        checked = outbound.get("travellerCheckedLuggage") or [{}]
+        cabin = outbound.get("travellerCabinLuggage") or [{}]
+        return cls(
+            token=offer.get("token"),
+            price=money(price.get("total")),
+            currency=(price.get("total") or {}).get("currencyCode"),
+            base_fare=money(price.get("baseFare")),
+            tax=money(price.get("tax")),
+            airline=carriers[0].get("code"),
+            flight_numbers=flight_numbers,
+            origin=(outbound.get("departureAirport") or {}).get("code"),
+            destination=(outbound.get("arrivalAirport") or {}).get("code"),
+            departure=outbound.get("departureTime"),
+            arrival=outbound.get("arrivalTime"),
+            duration_minutes=(outbound.get("totalTime") or 0) // 60,
+            stops=max(len(segment.get("legs") or [{}]) - 1 for segment in segments),
+            cabin_class=legs[0].get("cabinClass"),
+            checked_bags=(checked[0].get("luggageAllowance") or {}).get("maxPiece", 0),
+            cabin_bags=(cabin[0].get("luggageAllowance") or {}).get("maxPiece", 0),
+            trip_type=offer.get("tripType")
+        )
+
+    def to_dict(self, fields: Iterable[str] = FIELDS) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in fields}
+
+
+class FlightOfferSet:
+    """The normalized offers from one ``searchFlights`` response"""
+
+    def __init__(self, offers: List[FlightOffer], airlines: Dict[str, Dict[str, str]],
+                 total: int = 0, status: bool = True, message: Optional[str] = None):
+        self.offers = offers
+        self.airlines = airlines
+        self.total = total
+        self.status = status
+        self.message = message
+
+    @classmethod
+    def from_booking(cls, payload: Dict[str, Any]) -> "FlightOfferSet":
+        data = payload.get("data") or {}
+        airlines: Dict[str, Dict[str, str]] = {}
+        offers = []
+        for offer in data.get("flightOffers") or []:
+            try:
+                offers.append(FlightOffer.from_booking(offer, airlines))
+            except (AttributeError, IndexError, TypeError) as e:
+                logger.warning(f"Skipping malformed flight offer: {str(e)}")
+        total = (data.get("aggregation") or {}).get("totalCount", len(offers))
+        return cls(offers, airlines, total, bool(payload.get("status", True)), payload.get("message"))
+
+    def filter(self, max_stops: Optional[int] = None, min_price: Optional[float] = None,
+               max_price: Optional[float] = None, depart_after: Optional[time] = None,
+               depart_before: Optional[time] = None, airlines: Optional[Iterable[str]] = None) -> "FlightOfferSet":
+        """Keep offers matching every given condition; departure bounds are local times"""
+        codes = {code.strip().upper() for code in airlines if code.strip()} if airlines else None
+        # Departures are ISO local date-times, so their "HH:MM" compares correctly as text
+        depart_after = depart_after.strftime("%H:%M") if depart_after else None
+        depart_before = depart_before.strftime("%H:%M") if depart_before else None
+        offers = [
+            offer for offer in self.offers
+            if (max_stops is None or offer.stops <= max_stops)
+            and (min_price is None or offer.price >= min_price)
+            and (max_price is None or offer.price <= max_price)
+            and (depart_after is None or (offer.departure or "")[11:16] >= depart_after)
+            and (depart_before is None or (offer.departure or "")[11:16] <= depart_before)
+            and (not codes or offer.airline in codes)
+        ]
+        return FlightOfferSet(offers, self.airlines, self.total, self.status, self.message)
+
+    def sort(self, sort: Optional[str] = None) -> "FlightOfferSet":
+        """Sort by ``price``, ``duration``, ``departure``, ``arrival`` or ``stops``; prefix with ``-`` to reverse.
+        Without a sort the upstream order (Booking.com's "best") is kept."""
+        if not sort:
+            return self
+        key = SORT_KEYS.get(sort.lstrip("-"))
+        if key is None:
+            raise ValueError(f"Unknown sort '{sort}'; use one of {', '.join(SORT_KEYS)}")
+        offers = sorted(self.offers, key=key, reverse=sort.startswith("-"))
+        return FlightOfferSet(offers, self.airlines, self.total, self.status, self.message)
+
+    def to_response(self, fields: Optional[List[str]] = None, layout: str = "rows") -> Dict[str, Any]:
+        """Serialize the offers, projected to ``fields``, as a list of objects (``rows``)
+        or as one column list per field (``columns``)"""
+        fields = fields or list(FlightOffer.FIELDS)
+        unknown = [field for field in fields if field not in FlightOffer.FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        if layout not in ("rows", "columns"):
+            raise ValueError(f"Unknown layout '{layout}'; use rows or columns")
+
+        response: Dict[str, Any] = {"status": self.status, "total": self.total, "count": len(self.offers)}
+        if self.message and not self.status:
+            response["message"] = self.message
+        if "airline" in fields:
+            used = {offer.airline for offer in self.offers}
+            response["airlines"] = {code: info for code, info in self.airlines.items() if code in used}
+        if layout == "columns":
+            response["offers"] = {field: [getattr(offer, field) for offer in self.offers] for field in fields}
+        else:
+            response["offers"] = [offer.to_dict(fields) for offer in self.offers]
+        return response
+
+
+def parse_clock(value: Optional[str]) -> Optional[time]:
+    """Parse an ``HH:MM`` query value such as ``9:00`` or ``21:30``"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value.strip(), "%H:%M").time()
+    except ValueError:
+        raise ValueError(f"Invalid time '{value}'; use HH:MM, e.g. 09:00") from None
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split a ``fields=price,airline`` query value"""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
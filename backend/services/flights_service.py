@@ -1,41 +1,36 @@
-import requests
-import os
-from dotenv import load_dotenv
+from services.rapidapi_client import rapidapi_client
+from services.paginated_search import PaginatedSearch
+from services.flight_offers import offer_key
 
-load_dotenv()
-
-host = os.getenv("RAPIDAPI_HOST")
-
-def get_flights(from_id="BOM.AIRPORT", to_id="DEL.AIRPORT", depart_date="2025-09-21", adults="1", children="0,17"):
-    url = f"https://{host}/api/v1/flights/searchFlights"
-    headers = {
-        'x-rapidapi-key': os.getenv("RAPIDAPI_KEY"),
-        'x-rapidapi-host': host
-    }
+async def get_flights(from_id="BOM.AIRPORT", to_id="DEL.AIRPORT", depart_date="2025-09-21", adults="1", children="0,17", page_no="1"):
     params = {
         "fromId": from_id,
         "toId": to_id,
         "departDate": depart_date,
         "stops": "none",
-        "pageNo": "1",
+        "pageNo": page_no,
         "adults": adults,
         "children": children,
         "sort": "BEST",
         "cabinClass": "ECONOMY",
         "currency_code": "INR"
     }
-    response = requests.get(url, headers=headers, params=params)
-    return response.json()
+    return await rapidapi_client.get("/api/v1/flights/searchFlights", params)
+
+def search_flights(from_id="BOM.AIRPORT", to_id="DEL.AIRPORT", depart_date="2025-09-21", adults="1", children="0,17", max_pages=None):
+    """All result pages of a flight search, fetched concurrently"""
+    return PaginatedSearch(
+        "rapidapi",
+        lambda page: get_flights(from_id, to_id, depart_date, adults, children, str(page)),
+        items_path=("data", "flightOffers"),
+        total=lambda payload: payload["data"]["aggregation"]["totalCount"],
+        key=offer_key,
+        max_pages=max_pages
+    )
   
-def get_flight_info(flight_id: str):
-    url = "https://booking-com15.p.rapidapi.com/api/v1/flights/getFlightDetails"
-    headers = {
-        'x-rapidapi-key': os.getenv("RAPIDAPI_KEY"),
-        'x-rapidapi-host': os.getenv("RAPIDAPI_HOST")
-    }
+async def get_flight_info(flight_id: str):
     params = {
         "token": flight_id,
         "currency_code": "INR"
     }
-    response = requests.get(url, headers=headers, params=params)
-    return response.json()
+    return await rapidapi_client.get("/api/v1/flights/getFlightDetails", params)
@@ -0,0 +1,203 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Marks the end of a streamed call on the hand-off queue
+_STREAM_END = object()
+
+
+class GeminiQueueFullError(Exception):
+    """Raised when the wait queue is already at capacity"""
+
+
+class GeminiDeadlineExceededError(Exception):
+    """Raised when a call cannot finish before its deadline"""
+
+
+class GeminiExecutor:
+    """Runs blocking Gemini SDK calls off the event loop with a concurrency cap.
+
+    Calls beyond ``max_concurrency`` wait in a bounded queue. Every call carries
+    a deadline covering both the time spent waiting for a slot and the call
+    itself; a slot is only handed back once the worker thread has actually
+    finished, so ``in_flight`` never under-reports SDK load. With
+    ``request_timeout=True`` the time left when the worker starts is passed
+    to the SDK as ``request_options={"timeout": ...}``, so a hung request
+    ends on its own instead of holding its slot forever.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, max_queue_size: Optional[int] = None,
+                 default_timeout: Optional[float] = None):
+        self.max_concurrency = max_concurrency or int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+        self.max_queue_size = max_queue_size if max_queue_size is not None else int(os.getenv("GEMINI_MAX_QUEUE_SIZE", "64"))
+        self.default_timeout = default_timeout or float(os.getenv("GEMINI_CALL_TIMEOUT", "90"))
+
+        self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="gemini")
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        self._queue_depth = 0
+        self._in_flight = 0
+        self._peak_queue_depth = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._deadline_exceeded = 0
+        self._total_wait_seconds = 0.0
+        self._wait_count = 0
+
+    async def run(self, fn: Callable[..., Any], *args, timeout: Optional[float] = None,
+                  request_timeout: bool = False, **kwargs) -> Any:
+        """Run ``fn(*args, **kwargs)`` in the worker pool, waiting at most ``timeout`` seconds overall"""
+        timeout = timeout or self.default_timeout
+        deadline = time.monotonic() + timeout
+        future = await self._submit(partial(self._call, fn, args, kwargs, deadline, request_timeout), deadline)
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            self._deadline_exceeded += 1
+            raise GeminiDeadlineExceededError(f"Gemini call did not finish within {timeout:.1f}s")
+        except Exception:
+            self._failed += 1
+            raise
+
+        self._completed += 1
+        return result
+
+    async def stream(self, fn: Callable[..., Any], *args, timeout: Optional[float] = None,
+                     request_timeout: bool = False, **kwargs) -> AsyncIterator[Any]:
+        """Run a call that returns a blocking iterator and yield its items as they arrive.
+
+        The iterator is drained on a worker thread; the deadline covers the
+        whole stream. If the consumer stops early the worker stops pulling
+        further items.
+        """
+        timeout = timeout or self.default_timeout
+        deadline = time.monotonic() + timeout
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def hand_off(item: Any, error: Optional[BaseException] = None):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+            except RuntimeError:
+                # The event loop is gone; nobody is listening any more
+                stop.set()
+
+        def produce():
+            try:
+                for item in self._call(fn, args, kwargs, deadline, request_timeout):
+                    if stop.is_set():
+                        break
+                    hand_off(item)
+            except Exception as e:
+                hand_off(_STREAM_END, e)
+                return
+            hand_off(_STREAM_END)
+
+        await self._submit(produce, deadline)
+
+        try:
+            while True:
+                try:
+                    item, error = await asyncio.wait_for(queue.get(), max(deadline - time.monotonic(), 0))
+                except asyncio.TimeoutError:
+                    self._deadline_exceeded += 1
+                    raise GeminiDeadlineExceededError(f"Gemini stream did not finish within {timeout:.1f}s")
+                if item is _STREAM_END:
+                    if error is not None:
+                        self._failed += 1
+                        raise error
+                    break
+                yield item
+            self._completed += 1
+        finally:
+            stop.set()
+
+    @staticmethod
+    def _call(fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any], deadline: float,
+              request_timeout: bool) -> Any:
+        """Call ``fn`` on the worker thread, passing it the time left before the deadline if asked"""
+        if request_timeout:
+            options = dict(kwargs.get("request_options") or {})
+            options["timeout"] = max(deadline - time.monotonic(), 0.001)
+            kwargs = {**kwargs, "request_options": options}
+        return fn(*args, **kwargs)
+
+    async def _submit(self, work: Callable[[], Any], deadline: float):
+        """Admit a unit of work through the queue and start it on the pool"""
+        if self._semaphore.locked() and self._queue_depth >= self.max_queue_size:
+            self._rejected += 1
+            raise GeminiQueueFullError(f"Gemini wait queue is full ({self.max_queue_size} pending calls)")
+
+        await self._acquire_slot(deadline)
+
+        loop = asyncio.get_running_loop()
+        self._in_flight += 1
+        try:
+            future = self._pool.submit(work)
+        except Exception:
+            self._release_slot()
+            raise
+        # Hand the slot back from the loop thread once the worker is really done
+        future.add_done_callback(lambda _: self._release_from_worker(loop))
+        return future
+
+    async def _acquire_slot(self, deadline: float):
+        """Wait in the queue for a free slot until the deadline passes"""
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            return
+
+        started = time.monotonic()
+        self._queue_depth += 1
+        self._peak_queue_depth = max(self._peak_queue_depth, self._queue_depth)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), max(deadline - started, 0))
+        except asyncio.TimeoutError:
+            self._deadline_exceeded += 1
+            raise GeminiDeadlineExceededError("Deadline passed while waiting for a free Gemini slot")
+        finally:
+            self._queue_depth -= 1
+            self._total_wait_seconds += time.monotonic() - started
+            self._wait_count += 1
+
+    def _release_from_worker(self, loop: asyncio.AbstractEventLoop):
+        try:
+            loop.call_soon_threadsafe(self._release_slot)
+        except RuntimeError:
+            # An abandoned call (e.g. a losing hedge) outlived the event loop
+            pass
+
+    def _release_slot(self):
+        self._in_flight -= 1
+        self._semaphore.release()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return a snapshot of queue and in-flight statistics"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue_size": self.max_queue_size,
+            "in_flight": self._in_flight,
+            "queue_depth": self._queue_depth,
+            "peak_queue_depth": self._peak_queue_depth,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "deadline_exceeded": self._deadline_exceeded,
+            "avg_queue_wait_ms": round(self._total_wait_seconds * 1000 / self._wait_count, 2) if self._wait_count else 0.0
+        }
+
+    def shutdown(self):
+        """Stop accepting work and release the worker threads"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
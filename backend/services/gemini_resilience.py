@@ -0,0 +1,198 @@
+import os
+import time
+import math
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Gemini while a circuit is open"""
+
+
+class CircuitBreaker:
+    """Sliding-window circuit breaker for one model and call type.
+
+    The last ``window_size`` calls are kept. Once at least ``min_calls`` are
+    recorded, the circuit opens when the share of failed calls reaches
+    ``failure_rate`` or the share of calls slower than ``slow_call_seconds``
+    reaches ``slow_rate``. After ``open_seconds`` it lets ``half_open_calls``
+    probes through: if they all succeed it closes, otherwise it opens again.
+    """
+
+    def __init__(self, name: str, window_size: Optional[int] = None, min_calls: Optional[int] = None,
+                 failure_rate: Optional[float] = None, slow_call_seconds: Optional[float] = None,
+                 slow_rate: Optional[float] = None, open_seconds: Optional[float] = None,
+                 half_open_calls: Optional[int] = None):
+        self.name = name
+        self.window_size = window_size if window_size is not None else int(os.getenv("GEMINI_BREAKER_WINDOW", "20"))
+        self.min_calls = min_calls if min_calls is not None else int(os.getenv("GEMINI_BREAKER_MIN_CALLS", "10"))
+        self.failure_rate = failure_rate if failure_rate is not None else float(os.getenv("GEMINI_BREAKER_FAILURE_RATE", "0.5"))
+        self.slow_call_seconds = slow_call_seconds if slow_call_seconds is not None else float(os.getenv("GEMINI_BREAKER_SLOW_CALL_SECONDS", "30"))
+        self.slow_rate = slow_rate if slow_rate is not None else float(os.getenv("GEMINI_BREAKER_SLOW_RATE", "0.8"))
+        self.open_seconds = open_seconds if open_seconds is not None else float(os.getenv("GEMINI_BREAKER_OPEN_SECONDS", "30"))
+        self.half_open_calls = half_open_calls if half_open_calls is not None else int(os.getenv("GEMINI_BREAKER_HALF_OPEN_CALLS", "2"))
+
+        self.state = CLOSED
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=self.window_size)
+        self._opened_at = 0.0
+        self._probes_started = 0
+        self._probes_succeeded = 0
+        self._times_opened = 0
+        self._rejected = 0
+        self._last_trip_reason: Optional[str] = None
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError"""
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                self._rejected += 1
+                raise CircuitOpenError(f"Circuit {self.name} is open")
+            self.state = HALF_OPEN
+            self._probes_started = 0
+            self._probes_succeeded = 0
+            logger.info(f"Circuit {self.name} half-open, probing Gemini")
+
+        if self.state == HALF_OPEN:
+            if self._probes_started >= self.half_open_calls:
+                self._rejected += 1
+                raise CircuitOpenError(f"Circuit {self.name} is half-open and already probing")
+            self._probes_started += 1
+
+    def record(self, success: bool, duration: float):
+        """Record the outcome of an admitted call"""
+        slow = duration >= self.slow_call_seconds
+
+        if self.state == HALF_OPEN:
+            if not success or slow:
+                self._trip("probe failed" if not success else "probe too slow")
+                return
+            self._probes_succeeded += 1
+            if self._probes_succeeded >= self.half_open_calls:
+                self.state = CLOSED
+                self._window.clear()
+                logger.info(f"Circuit {self.name} closed")
+            return
+
+        self._window.append((not success, slow))
+        if self.state == CLOSED and len(self._window) >= self.min_calls:
+            failures = sum(failed for failed, _ in self._window) / len(self._window)
+            slow_calls = sum(was_slow for _, was_slow in self._window) / len(self._window)
+            if failures >= self.failure_rate:
+                self._trip(f"failure rate {failures:.0%}")
+            elif slow_calls >= self.slow_rate:
+                self._trip(f"slow call rate {slow_calls:.0%}")
+
+    def cancel(self):
+        """Give back an admitted call that ended without a verdict on Gemini's health"""
+        if self.state == HALF_OPEN and self._probes_started > 0:
+            self._probes_started -= 1
+
+    def _trip(self, reason: str):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._times_opened += 1
+        self._last_trip_reason = reason
+        logger.warning(f"Circuit {self.name} opened: {reason}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        calls = len(self._window)
+        return {
+            "state": self.state,
+            "window_calls": calls,
+            "failure_rate": round(sum(failed for failed, _ in self._window) / calls, 3) if calls else 0.0,
+            "slow_rate": round(sum(slow for _, slow in self._window) / calls, 3) if calls else 0.0,
+            "times_opened": self._times_opened,
+            "rejected": self._rejected,
+            "last_trip_reason": self._last_trip_reason,
+            "open_for_seconds": round(max(self.open_seconds - (time.monotonic() - self._opened_at), 0), 1)
+            if self.state == OPEN else 0.0
+        }
+
+
+class CircuitBreakerRegistry:
+    """One circuit breaker per (model, call type)"""
+
+    def __init__(self):
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+    def get(self, model: str, caller: str) -> CircuitBreaker:
+        key = (model, caller)
+        if key not in self._breakers:
+            self._breakers[key] = CircuitBreaker(f"{model}/{caller}")
+        return self._breakers[key]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {breaker.name: breaker.snapshot() for breaker in self._breakers.values()}
+
+
+class HedgePolicy:
+    """Decides when to send a second, hedged copy of a slow Gemini call.
+
+    The hedge goes out once the first call has run for the caller's recent
+    p95 latency (or a fixed ``GEMINI_HEDGE_DELAY``), as long as hedges stay
+    within ``budget`` of all calls. Disabled unless ``GEMINI_HEDGE_ENABLED``
+    is set.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, fixed_delay: Optional[float] = None,
+                 budget: Optional[float] = None, min_samples: Optional[int] = None, sample_size: int = 200):
+        self.enabled = enabled if enabled is not None else os.getenv("GEMINI_HEDGE_ENABLED", "false").lower() == "true"
+        delay = os.getenv("GEMINI_HEDGE_DELAY")
+        self.fixed_delay = fixed_delay if fixed_delay is not None else (float(delay) if delay else None)
+        self.budget = budget if budget is not None else float(os.getenv("GEMINI_HEDGE_BUDGET", "0.1"))
+        self.min_samples = min_samples if min_samples is not None else int(os.getenv("GEMINI_HEDGE_MIN_SAMPLES", "20"))
+
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._sample_size = sample_size
+        self._calls = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+
+    def observe(self, caller: str, duration: float):
+        """Record the latency of a successful call"""
+        self._latencies.setdefault(caller, deque(maxlen=self._sample_size)).append(duration)
+
+    def delay(self, caller: str) -> Optional[float]:
+        """Seconds to wait before hedging a new call, or None to not hedge it"""
+        self._calls += 1
+        if not self.enabled:
+            return None
+        if self.fixed_delay is not None:
+            return self.fixed_delay
+        if len(self._latencies.get(caller, ())) < self.min_samples:
+            return None
+        return self._p95(caller)
+
+    def try_acquire(self) -> bool:
+        """Spend budget on a hedge if there is any left"""
+        if self._hedged + 1 > self.budget * self._calls:
+            return False
+        self._hedged += 1
+        return True
+
+    def record_win(self):
+        self._hedge_wins += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "budget": self.budget,
+            "fixed_delay": self.fixed_delay,
+            "p95_delay": {caller: round(self._p95(caller), 3) for caller in self._latencies if self._latencies[caller]},
+            "calls": self._calls,
+            "hedged": self._hedged,
+            "hedge_wins": self._hedge_wins
+        }
+
+    def _p95(self, caller: str) -> float:
+        samples = sorted(self._latencies[caller])
+        return samples[max(math.ceil(0.95 * len(samples)) - 1, 0)]
@@ -1,59 +1,439 @@
 import os
-import json
-import google.generativeai as genai
-from typing import Dict, List, Any
+import copy
+import calendar
+import time
+import asyncio
+from typing import Dict, List, Any, AsyncIterator, Callable, Optional, Tuple
 from datetime import datetime, timedelta
-from models.trip_models import TripRequest, Itinerary, DayPlan, Activity, Location
+from models.trip_models import TripRequest, Itinerary, DayPlan, Activity, Location, GenerationMode
 from services.mock_data_service import MockDataService
+from services.gemini_executor import GeminiExecutor
+from services.model_router import ModelRoute, ModelRouter
+from services.gemini_telemetry import GeminiTelemetry, failure_reason
+from services.gemini_resilience import CircuitBreakerRegistry, HedgePolicy
+from services.itinerary_cache import ItineraryCache, make_request_key
+from services.context_builder import CHARS_PER_TOKEN, ContextBuilder, compact_json, estimate_tokens, hydrate_itinerary, rank_candidates
+from services.trip_planner import TripPlanner, allocate_days, compute_budget
+from services.destination_knowledge import KNOWLEDGE_SECTIONS, DestinationKnowledgeStore
+from services.response_schema import ITINERARY_GENERATION_CONFIG, SchemaMismatchError, load_structured, validate_itinerary
+from services.itinerary_patch import PatchError, apply_patch, classify_feedback, recompute_budget, suggestion_result
+from utils.json_stream import ItineraryStreamParser
+from utils.json_extractor import JSONExtractionError, extract_itinerary, extract_json
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bump whenever _create_itinerary_prompt changes so cached itineraries are not reused
+PROMPT_TEMPLATE_VERSION = "3"
+
+# Replacement candidates offered with each alternatives prompt
+ALTERNATIVE_ACTIVITY_OPTIONS = 8
+ALTERNATIVE_RESTAURANT_OPTIONS = 6
+
+# Most tips kept per destination knowledge section
+KNOWLEDGE_TIPS_PER_SECTION = 5
+
+# Set by the itinerary parsers on output that fell back, until the caller decides whether to escalate
+FALLBACK_REASON = "fallback_reason"
+
+# Keys stamped onto an itinerary by _validate_and_enhance_itinerary rather than generated
+ITINERARY_METADATA_FIELDS = ("trip_request", "generated_by", "created_at")
+
 class GeminiService:
-    def __init__(self):
-        """Initialize Gemini AI service"""
-        self.api_key = os.getenv("GEMINI_API_KEY")
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY environment variable is required")
-        
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+    def __init__(self, reference_data=None):
+        """Initialize Gemini AI service; ``reference_data`` maps trip airports to flight cities"""
+        # Small and large Gemini models (or local fakes with LLM_BACKEND=fake)
+        self.router = ModelRouter()
         self.mock_data_service = MockDataService()
+        self.knowledge = DestinationKnowledgeStore(self._generate_destination_knowledge)
+        self.planner = TripPlanner(self.mock_data_service, self.knowledge, reference_data)
+        self.executor = GeminiExecutor()
+        self.cache = ItineraryCache()
+        self.context_builder = ContextBuilder()
+        self.telemetry = GeminiTelemetry()
+        self.breakers = CircuitBreakerRegistry()
+        self.hedging = HedgePolicy()
+        self.days_per_call = max(int(os.getenv("GEMINI_DAYS_PER_CALL", "2")), 1)
+        # Executor slots claimed by itinerary generations in progress, for sizing parallel fan-out
+        self._reserved_calls = 0
         
     async def generate_itinerary(self, trip_request: TripRequest, weather_data: Dict = None, 
-                               local_events: List[Dict] = None) -> Dict[str, Any]:
+                               local_events: List[Dict] = None,
+                               mode: GenerationMode = GenerationMode.STANDARD,
+                               candidates: Tuple[List[Dict], ...] = None) -> Dict[str, Any]:
         """
         Generate a personalized itinerary using Gemini AI and mock data
+        
+        ``candidates`` lets callers that plan several trips share one get_candidates() lookup.
+        Cultural insights, safety tips and local recommendations come from the destination
+        knowledge store, looked up while the itinerary is generated.
         """
+        knowledge = asyncio.ensure_future(self.get_destination_knowledge(trip_request))
+        itinerary_data = await self._generate_itinerary(trip_request, weather_data, local_events, mode, candidates)
+        return await self._attach_knowledge(itinerary_data, knowledge)
+    
+    async def _generate_itinerary(self, trip_request: TripRequest, weather_data: Dict = None,
+                                  local_events: List[Dict] = None,
+                                  mode: GenerationMode = GenerationMode.STANDARD,
+                                  candidates: Tuple[List[Dict], ...] = None) -> Dict[str, Any]:
+        cache_key = make_request_key(trip_request, PROMPT_TEMPLATE_VERSION)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Serving cached itinerary for {trip_request.destination.name}")
+            return self._validate_and_enhance_itinerary(cached, trip_request)
+        
         try:
-            # Get mock data based on preferences
-            preferences = trip_request.preferences.dict()
-            
             # Get activities, accommodations, flights, and restaurants
-            activities = self.mock_data_service.get_activities(preferences)
-            accommodations = self.mock_data_service.get_accommodations(preferences)
-            flights = self.mock_data_service.get_flights(preferences)
-            restaurants = self.mock_data_service.get_restaurants(preferences)
+            activities, accommodations, flights, restaurants = candidates or self.get_candidates(trip_request)
             
             # Use Gemini to create a structured itinerary
             context = self._build_context(trip_request, weather_data, local_events, activities, accommodations, flights, restaurants)
-            prompt = self._create_itinerary_prompt(context)
             
-            # Generate response from Gemini
-            response = await self._generate_response(prompt)
+            day_calls = self._parallel_day_calls(context["trip_details"]["duration_days"]) if mode == GenerationMode.PARALLEL else 0
+            calls = day_calls + 1
+            self._reserved_calls += calls
+            try:
+                itinerary_data = await self._generate_with(
+                    mode, day_calls, trip_request, context, activities, accommodations, flights, restaurants
+                )
+            finally:
+                self._reserved_calls -= calls
             
-            # Parse and structure the response
-            itinerary_data = self._parse_itinerary_response(response, trip_request, activities, accommodations, flights, restaurants)
+            self._cache_itinerary(cache_key, itinerary_data)
             
             return itinerary_data
             
         except Exception as e:
             logger.error(f"Error generating itinerary: {str(e)}")
+            self.telemetry.record_fallback("itinerary", failure_reason(e))
             # Fallback to mock data only
             return self._generate_fallback_itinerary(trip_request)
     
+    def _parallel_day_calls(self, duration_days: int) -> int:
+        """Day calls for a parallel generation, 0 to generate in one call instead
+        
+        The overview and day calls share the executor's slots with every other generation, so the
+        fan-out only uses the slots other generations have not claimed. Without two free slots the
+        calls would queue behind each other and end up slower than a single call.
+        """
+        free = self.executor.max_concurrency - self._reserved_calls - 1
+        return max(min(-(-duration_days // self.days_per_call), free), 0)
+    
+    async def _generate_with(self, mode: GenerationMode, day_calls: int, trip_request: TripRequest,
+                             context: Dict[str, Any], activities: List[Dict], accommodations: List[Dict],
+                             flights: List[Dict], restaurants: List[Dict]) -> Dict[str, Any]:
+        """Generate an itinerary in the given mode; parallel mode with no ``day_calls`` uses one call"""
+        if mode == GenerationMode.PARALLEL and day_calls:
+            return await self._generate_parallel_itinerary(
+                trip_request, context, activities, accommodations, flights, restaurants, day_calls
+            )
+        if mode == GenerationMode.STRUCTURED:
+            prompt = self._create_itinerary_prompt(context, structured=True)
+            return await self._generate_routed(
+                prompt, "itinerary",
+                lambda response: self._parse_structured_response(
+                    response, trip_request, activities, accommodations, flights, restaurants
+                ),
+                accept=self._is_complete_generation,
+                duration_days=context["trip_details"]["duration_days"],
+                generation_config=ITINERARY_GENERATION_CONFIG
+            )
+        
+        prompt = self._create_itinerary_prompt(context)
+        
+        # Generate and parse the response, escalating to the large model if it is unusable
+        return await self._generate_routed(
+            prompt, "itinerary",
+            lambda response: self._parse_itinerary_response(
+                response, trip_request, activities, accommodations, flights, restaurants
+            ),
+            accept=self._is_complete_generation,
+            duration_days=context["trip_details"]["duration_days"]
+        )
+    
+    async def stream_itinerary(self, trip_request: TripRequest, weather_data: Dict = None,
+                               local_events: List[Dict] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Generate an itinerary from Gemini's streaming output, yielding sections as they complete.
+        
+        Yields ("summary", text), one ("day", day) per entry of days[], ("budget", ...) and the
+        remaining top-level sections by name, then always ends with ("itinerary", data) carrying
+        the complete validated itinerary. If generation fails part-way the final itinerary is the
+        fallback and supersedes anything streamed before it.
+        """
+        knowledge = asyncio.ensure_future(self.get_destination_knowledge(trip_request))
+        cache_key = make_request_key(trip_request, PROMPT_TEMPLATE_VERSION)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Serving cached itinerary for {trip_request.destination.name}")
+            itinerary_data = self._validate_and_enhance_itinerary(cached, trip_request)
+            itinerary_data = await self._attach_knowledge(itinerary_data, knowledge)
+            for name, value in self._itinerary_sections(itinerary_data):
+                yield name, value
+            yield "itinerary", itinerary_data
+            return
+        
+        try:
+            activities, accommodations, flights, restaurants = self.get_candidates(trip_request)
+            context = self._build_context(trip_request, weather_data, local_events, activities, accommodations, flights, restaurants)
+            prompt = self._create_itinerary_prompt(context)
+            route = self.router.route("itinerary", prompt, context["trip_details"]["duration_days"])
+            
+            parser = ItineraryStreamParser()
+            total_cost = None
+            async for text in self._stream_response(prompt, "itinerary", route=route):
+                for name, value in parser.feed(text):
+                    if name == "days":
+                        continue  # already streamed entry by entry
+                    if name == "day":
+                        value = hydrate_itinerary({"days": [value]}, activities, restaurants=restaurants)["days"][0]
+                    elif name in ("accommodation", "transportation"):
+                        value = hydrate_itinerary({name: value}, accommodations=accommodations, flights=flights)[name]
+                    
+                    if name == "total_cost":
+                        total_cost = value
+                    elif name == "budget_breakdown":
+                        yield "budget", {"total_cost": total_cost, "budget_breakdown": value}
+                    else:
+                        yield name, value
+            
+            itinerary_data = self._parse_itinerary_response(parser.buffer, trip_request, activities, accommodations, flights, restaurants)
+            self._record_fallback("itinerary", itinerary_data)
+            self._cache_itinerary(cache_key, itinerary_data)
+            
+        except Exception as e:
+            logger.error(f"Error streaming itinerary: {str(e)}")
+            self.telemetry.record_fallback("itinerary", failure_reason(e))
+            itinerary_data = self._generate_fallback_itinerary(trip_request)
+        
+        itinerary_data = await self._attach_knowledge(itinerary_data, knowledge)
+        for name in KNOWLEDGE_SECTIONS:
+            yield name, itinerary_data[name]
+        yield "itinerary", itinerary_data
+    
+    async def _generate_parallel_itinerary(self, trip_request: TripRequest, context: Dict[str, Any],
+                                           activities: List[Dict], accommodations: List[Dict],
+                                           flights: List[Dict], restaurants: List[Dict],
+                                           day_calls: int) -> Dict[str, Any]:
+        """Allocate candidates to days locally, then detail the days in ``day_calls`` concurrent Gemini calls"""
+        duration_days = context["trip_details"]["duration_days"]
+        allocation = allocate_days(activities, restaurants, duration_days, context["preferences"])
+        days_per_call = max(self.days_per_call, -(-duration_days // day_calls))
+        chunks = [
+            list(range(start, min(start + days_per_call, duration_days)))
+            for start in range(0, duration_days, days_per_call)
+        ]
+        
+        prompts = [self._create_overview_prompt(context, allocation)]
+        prompts += [self._create_days_prompt(context, allocation, chunk) for chunk in chunks]
+        responses = await asyncio.gather(
+            *(self._generate_response(prompt, caller="itinerary") for prompt in prompts), return_exceptions=True
+        )
+        
+        failures = [response for response in responses if isinstance(response, Exception)]
+        if len(failures) == len(responses):
+            raise failures[0]
+        
+        overview = {}
+        if not isinstance(responses[0], Exception):
+            try:
+                parsed = extract_json(responses[0])
+                overview = parsed if isinstance(parsed, dict) else {}
+                self.telemetry.record_parse("itinerary")
+            except JSONExtractionError as e:
+                logger.warning(f"Discarding unparseable overview: {str(e)}")
+                self.telemetry.record_parse("itinerary", "parse_error")
+        
+        days = []
+        complete = not failures
+        for chunk, response in zip(chunks, responses[1:]):
+            chunk_days, chunk_complete = self._merge_chunk_days(trip_request, chunk, allocation, response)
+            days.extend(chunk_days)
+            complete = complete and chunk_complete
+        
+        itinerary_data = {**overview, "days": days}
+        itinerary_data = hydrate_itinerary(itinerary_data, activities, accommodations, flights, restaurants)
+        preferences = context["preferences"]
+        if not itinerary_data.get("accommodation"):
+            itinerary_data["accommodation"] = rank_candidates("accommodations", accommodations or [], preferences)[:1]
+        if not itinerary_data.get("transportation"):
+            itinerary_data["transportation"] = rank_candidates("flights", flights or [], preferences)[:1]
+        itinerary_data.setdefault("summary", f"Personalized {duration_days}-day trip to {trip_request.destination.name}")
+        compute_budget(itinerary_data, trip_request.travelers_count, duration_days)
+        
+        itinerary_data = self._validate_and_enhance_itinerary(itinerary_data, trip_request)
+        if not complete:
+            itinerary_data["salvaged"] = True
+            self.telemetry.record_fallback("itinerary", "partial_days")
+        return itinerary_data
+    
+    def _merge_chunk_days(self, trip_request: TripRequest, chunk: List[int],
+                          allocation: List[Dict[str, List[Dict]]], response: Any) -> Tuple[List[Dict], bool]:
+        """Take the days Gemini produced for a chunk, filling any it missed from the local allocation"""
+        generated = []
+        if not isinstance(response, Exception):
+            try:
+                data, truncated = extract_itinerary(response)
+                generated = data.get("days") or []
+                self.telemetry.record_parse("itinerary", "truncated" if truncated else None)
+            except JSONExtractionError as e:
+                logger.warning(f"Discarding unparseable days {chunk[0] + 1}-{chunk[-1] + 1}: {str(e)}")
+                self.telemetry.record_parse("itinerary", "parse_error")
+        
+        days = []
+        for position, day_index in enumerate(chunk):
+            if position < len(generated) and isinstance(generated[position], dict):
+                day = generated[position]
+            else:
+                day = {**allocation[day_index], "transportation": []}
+            day["date"] = (trip_request.start_date + timedelta(days=day_index)).isoformat()
+            days.append(day)
+        return days, len(generated) >= len(chunk)
+    
+    def _create_days_prompt(self, context: Dict[str, Any], allocation: List[Dict[str, List[Dict]]],
+                            chunk: List[int]) -> str:
+        """Create a prompt that details only the given days from their pre-assigned options"""
+        trip_details = context["trip_details"]
+        start_date = datetime.fromisoformat(trip_details["start_date"]).date()
+        
+        day_sections = []
+        for day_index in chunk:
+            day_date = (start_date + timedelta(days=day_index)).isoformat()
+            day_sections.append(
+                f"Day {day_index + 1} ({day_date}):\n"
+                f"{self.context_builder.render_table('activities', allocation[day_index]['activities'])}\n"
+                f"{self.context_builder.render_table('restaurants', allocation[day_index]['meals'])}"
+            )
+        days_text = "\n\n".join(day_sections)
+        
+        prompt = f"""
+        You are an expert AI travel planner detailing part of a {trip_details['duration_days']}-day trip to {trip_details['destination']['name']}, {trip_details['destination']['state']} for {trip_details['travelers_count']} people.
+
+        Plan only the days below, using the options assigned to each day (columns as listed in each header):
+{days_text}
+
+        Give every activity a realistic time slot and pair each restaurant with a meal. Refer to options by their exact names.
+
+        Return ONLY a JSON response in this format:
+        {{
+            "days": [
+                {{
+                    "date": "YYYY-MM-DD",
+                    "activities": [{{"name": "activity name", "time_slot": "HH:MM-HH:MM"}}],
+                    "meals": [{{"name": "restaurant name", "meal": "breakfast/lunch/dinner"}}],
+                    "transportation": []
+                }}
+            ]
+        }}
+        """
+        
+        return prompt
+    
+    def _create_overview_prompt(self, context: Dict[str, Any], allocation: List[Dict[str, List[Dict]]]) -> str:
+        """Create a prompt for the trip-level sections of a parallel itinerary"""
+        trip_details = context["trip_details"]
+        preferences = context["preferences"]
+        plan = "; ".join(
+            f"Day {i + 1}: " + ", ".join(item.get("name", "") for item in day["activities"])
+            for i, day in enumerate(allocation)
+        )
+        stays = self.context_builder.render_table(
+            "accommodations", rank_candidates("accommodations", context.get("available_accommodations", []) or [], preferences)[:3]
+        )
+        flights = self.context_builder.render_table(
+            "flights", rank_candidates("flights", context.get("available_flights", []) or [], preferences)[:3]
+        )
+        
+        prompt = f"""
+        You are an expert AI travel planner. Write the trip-level overview for a {trip_details['duration_days']}-day trip to {trip_details['destination']['name']}, {trip_details['destination']['state']} for {trip_details['travelers_count']} people ({trip_details['start_date']} to {trip_details['end_date']}).
+        Themes: {', '.join(preferences['themes'])}. Max Budget: ₹{preferences['max_budget']}.
+        Planned activities: {plan}
+
+        Choose the best accommodation and flight (refer to them by exact name / airline):
+{stays}
+{flights}
+
+        Return ONLY a JSON response in this format:
+        {{
+            "summary": "Brief trip overview",
+            "accommodation": [{{"name": "accommodation name"}}],
+            "transportation": [{{"airline": "airline name"}}]
+        }}
+        """
+        
+        return prompt
+    
+    def _itinerary_sections(self, itinerary_data: Dict[str, Any]) -> List[Tuple[str, Any]]:
+        """Split a finished itinerary into the same events stream_itinerary produces"""
+        sections = [("summary", itinerary_data.get("summary", ""))]
+        sections += [("day", day) for day in itinerary_data.get("days", [])]
+        sections.append(("budget", {
+            "total_cost": itinerary_data.get("total_cost"),
+            "budget_breakdown": itinerary_data.get("budget_breakdown", {})
+        }))
+        for name in ("accommodation", "transportation", "cultural_insights", "safety_tips", "local_recommendations"):
+            if name in itinerary_data:
+                sections.append((name, itinerary_data[name]))
+        return sections
+    
+    def get_candidates(self, trip_request: TripRequest) -> Tuple[List[Dict], List[Dict], List[Dict], List[Dict]]:
+        """Get activities, accommodations, flights and restaurants matching the trip preferences"""
+        return self.planner.get_candidates(trip_request)
+    
+    async def get_destination_knowledge(self, trip_request: TripRequest) -> Dict[str, List[str]]:
+        """Cultural insights, safety tips and local recommendations for the trip's destination and month"""
+        return await self.knowledge.get(trip_request.destination, trip_request.start_date.month)
+    
+    async def _attach_knowledge(self, itinerary_data: Dict[str, Any], knowledge: asyncio.Future) -> Dict[str, Any]:
+        """Fill an itinerary's destination sections from a pending knowledge lookup"""
+        sections = await knowledge
+        for name in KNOWLEDGE_SECTIONS:
+            itinerary_data[name] = list(sections.get(name) or [])
+        return itinerary_data
+    
+    async def _generate_destination_knowledge(self, destination: Location, month: int) -> Dict[str, List[str]]:
+        """Have Gemini write the destination sections once for a place and month"""
+        prompt = self._create_knowledge_prompt(destination, month)
+        return await self._generate_routed(prompt, "knowledge", self._parse_knowledge_response)
+    
+    def _create_knowledge_prompt(self, destination: Location, month: int) -> str:
+        """Prompt for the destination sections shared by every trip to a place in a month"""
+        return f"""
+        Write a destination briefing for travellers visiting {destination.name}, {destination.state}, {destination.country} in {calendar.month_name[month]}.
+        Make every tip specific to this place and season; avoid advice that would apply anywhere.
+
+        Return ONLY a JSON response in this format:
+        {{
+            "cultural_insights": ["insight1", "insight2", "insight3"],
+            "safety_tips": ["tip1", "tip2", "tip3"],
+            "local_recommendations": ["recommendation1", "recommendation2", "recommendation3"]
+        }}
+        """
+    
+    def _parse_knowledge_response(self, response: str) -> Dict[str, List[str]]:
+        """Extract the destination sections, requiring at least one tip in each"""
+        parsed = self._parse_json_response(response, "knowledge")
+        sections = {}
+        for name in KNOWLEDGE_SECTIONS:
+            tips = parsed.get(name) if isinstance(parsed, dict) else None
+            tips = [tip.strip() for tip in tips or [] if isinstance(tip, str) and tip.strip()]
+            if not tips:
+                raise ValueError(f"Destination knowledge response has no {name}")
+            sections[name] = tips[:KNOWLEDGE_TIPS_PER_SECTION]
+        return sections
+    
+    def _cache_itinerary(self, cache_key: str, itinerary_data: Dict[str, Any]):
+        """Cache a generated itinerary without its per-request metadata or destination sections"""
+        # Only cache complete generations, never the fallback or a salvaged one
+        if itinerary_data.get("generated_by") != "gemini_ai" or itinerary_data.get("salvaged"):
+            return
+        self.cache.set(cache_key, {
+            key: value for key, value in itinerary_data.items()
+            if key not in ITINERARY_METADATA_FIELDS and key not in KNOWLEDGE_SECTIONS
+        })
+    
     def _build_context(self, trip_request: TripRequest, weather_data: Dict = None, 
                       local_events: List[Dict] = None, activities: List[Dict] = None,
                       accommodations: List[Dict] = None, flights: List[Dict] = None,
@@ -80,74 +460,43 @@ class GeminiService:
         return context
     
     def _generate_fallback_itinerary(self, trip_request: TripRequest) -> Dict[str, Any]:
-        """Generate a fallback itinerary using only mock data"""
-        preferences = trip_request.preferences.dict()
-        duration_days = (trip_request.end_date - trip_request.start_date).days
-        
-        activities = self.mock_data_service.get_activities(preferences)
-        accommodations = self.mock_data_service.get_accommodations(preferences)
-        flights = self.mock_data_service.get_flights(preferences)
-        restaurants = self.mock_data_service.get_restaurants(preferences)
-        
-        # Create a simple daily plan
-        days = []
-        for i in range(duration_days):
-            day_activities = activities[i*2:(i+1)*2] if i*2 < len(activities) else activities[:2]
-            day_restaurants = restaurants[i:i+2] if i < len(restaurants) else restaurants[:2]
-            
-            day_plan = {
-                "date": (trip_request.start_date + timedelta(days=i)).isoformat(),
-                "activities": day_activities,
-                "meals": day_restaurants,
-                "transportation": [],
-                "total_daily_cost": sum(act.get('cost_per_person', 0) for act in day_activities) + 
-                                 sum(rest.get('cost_per_person', 0) for rest in day_restaurants)
-            }
-            days.append(day_plan)
+        """Generate a fallback itinerary with the local planner"""
+        return self.planner.plan(trip_request)
+    
+    def _create_itinerary_prompt(self, context: Dict[str, Any], structured: bool = False) -> str:
+        """Create a simplified prompt for itinerary generation using available data
         
-        total_cost = sum(day['total_daily_cost'] for day in days)
-        if accommodations:
-            total_cost += accommodations[0]['cost_per_night'] * duration_days
-        if flights:
-            total_cost += flights[0]['price']
+        With ``structured`` the output format is left to the response schema sent alongside.
+        """
+        trip_details = context["trip_details"]
+        preferences = context["preferences"]
+        candidates, _ = self.context_builder.build_candidate_context(context)
         
-        return {
-            "summary": f"Personalized {duration_days}-day trip to {trip_request.destination.name}",
-            "days": days,
-            "accommodation": accommodations[:2],
-            "transportation": flights[:2],
+        if structured:
+            output_format = """Give every activity a time slot (HH:MM-HH:MM) and every restaurant a meal (breakfast/lunch/dinner), with one day per date. Costs are calculated afterwards."""
+        else:
+            output_format = """Return ONLY a JSON response in this format:
+        {
+            "summary": "Brief trip overview",
+            "days": [
+                {
+                    "date": "YYYY-MM-DD",
+                    "activities": [{"name": "activity name", "time_slot": "HH:MM-HH:MM"}],
+                    "meals": [{"name": "restaurant name", "meal": "breakfast/lunch/dinner"}],
+                    "transportation": [],
+                    "total_daily_cost": calculated_cost
+                }
+            ],
+            "accommodation": [{"name": "accommodation name"}],
+            "transportation": [{"airline": "airline name"}],
             "total_cost": total_cost,
             "budget_breakdown": {
-                "accommodation": accommodations[0]['cost_per_night'] * duration_days if accommodations else 0,
-                "transportation": flights[0]['price'] if flights else 0,
-                "activities": sum(day['total_daily_cost'] for day in days),
-                "meals": 0
-            },
-            "cultural_insights": [
-                "Respect local customs and traditions",
-                "Dress modestly when visiting religious sites",
-                "Try local cuisine and street food"
-            ],
-            "safety_tips": [
-                "Keep emergency contacts handy",
-                "Stay hydrated and use sunscreen",
-                "Be cautious with street food if you have a sensitive stomach"
-            ],
-            "local_recommendations": [
-                "Visit during early morning or late evening for better weather",
-                "Bargain at local markets",
-                "Try authentic Rajasthani thali"
-            ]
-        }
-    
-    def _create_itinerary_prompt(self, context: Dict[str, Any]) -> str:
-        """Create a simplified prompt for itinerary generation using available data"""
-        trip_details = context["trip_details"]
-        preferences = context["preferences"]
-        available_activities = context.get("available_activities", [])
-        available_accommodations = context.get("available_accommodations", [])
-        available_flights = context.get("available_flights", [])
-        available_restaurants = context.get("available_restaurants", [])
+                "accommodation": cost,
+                "transportation": cost,
+                "activities": cost,
+                "meals": cost
+            }
+        }"""
         
         prompt = f"""
         You are an expert AI travel planner. Create a personalized itinerary using the provided data.
@@ -163,81 +512,221 @@ class GeminiService:
         - Budget Level: {preferences['budget_level']}
         - Max Budget: ₹{preferences['max_budget']}
 
-        AVAILABLE DATA:
-        Activities: {json.dumps(available_activities[:5], indent=2)}
-        Accommodations: {json.dumps(available_accommodations[:3], indent=2)}
-        Flights: {json.dumps(available_flights[:3], indent=2)}
-        Restaurants: {json.dumps(available_restaurants[:5], indent=2)}
+        AVAILABLE DATA (one row per option, columns as listed in each header):
+{candidates}
 
         Create a {trip_details['duration_days']}-day itinerary by selecting and organizing the available activities, restaurants, and accommodations. 
         Distribute activities across days, suggest appropriate restaurants for meals, and include the best accommodation and flight options.
+        Refer to every option by its exact name (airline for flights); full details are attached afterwards, so do not repeat descriptions.
 
-        Return ONLY a JSON response in this format:
-        {{
-            "summary": "Brief trip overview",
-            "days": [
-                {{
-                    "date": "YYYY-MM-DD",
-                    "activities": [selected activities with time slots],
-                    "meals": [selected restaurants],
-                    "transportation": [],
-                    "total_daily_cost": calculated_cost
-                }}
-            ],
-            "accommodation": [selected accommodations],
-            "transportation": [selected flights],
-            "total_cost": total_cost,
-            "budget_breakdown": {{
-                "accommodation": cost,
-                "transportation": cost,
-                "activities": cost,
-                "meals": cost
-            }},
-            "cultural_insights": ["tip1", "tip2", "tip3"],
-            "safety_tips": ["tip1", "tip2", "tip3"],
-            "local_recommendations": ["tip1", "tip2", "tip3"]
-        }}
+        {output_format}
         """
         
         return prompt
     
-    async def _generate_response(self, prompt: str) -> str:
-        """Generate response from Gemini"""
+    async def _generate_routed(self, prompt: str, caller: str, handle: Callable[[str], Any],
+                               accept: Callable[[Any], bool] = None, duration_days: int = None,
+                               generation_config: Dict[str, Any] = None) -> Any:
+        """Generate on the routed model and return ``handle(response)``
+        
+        If the small model's output cannot be handled (``handle`` raises or ``accept`` rejects
+        its result), the call is repeated once on the large model. That is recorded as an
+        escalation; a fallback is recorded only if the result finally returned is one.
+        """
+        route = self.router.route(caller, prompt, duration_days)
+        while True:
+            response = await self._generate_response(prompt, caller=caller, generation_config=generation_config, route=route)
+            try:
+                result = handle(response)
+            except Exception as e:
+                route = self.router.escalate(caller, route)
+                if route is None:
+                    raise
+                self.telemetry.record_escalation(caller, failure_reason(e))
+                continue
+            if accept is not None and not accept(result):
+                escalation = self.router.escalate(caller, route)
+                if escalation is not None:
+                    self.telemetry.record_escalation(caller, result.pop(FALLBACK_REASON, "rejected"))
+                    route = escalation
+                    continue
+            self._record_fallback(caller, result)
+            return result
+    
+    def _record_fallback(self, caller: str, result: Any):
+        """Record the fallback a parser marked on its result, if any"""
+        if isinstance(result, dict) and FALLBACK_REASON in result:
+            self.telemetry.record_fallback(caller, result.pop(FALLBACK_REASON))
+    
+    def _fallback_itinerary(self, trip_request: TripRequest, reason: str) -> Dict[str, Any]:
+        """The fallback itinerary, marked with why Gemini's output could not be used"""
+        return {**self._generate_fallback_itinerary(trip_request), FALLBACK_REASON: reason}
+    
+    @staticmethod
+    def _is_complete_generation(itinerary_data: Dict[str, Any]) -> bool:
+        return itinerary_data.get("generated_by") == "gemini_ai" and not itinerary_data.get("salvaged")
+    
+    async def _generate_response(self, prompt: str, timeout: float = None, caller: str = "itinerary",
+                                 generation_config: Dict[str, Any] = None, route: Optional[ModelRoute] = None) -> str:
+        """Generate response from Gemini without blocking the event loop
+        
+        ``route`` defaults to the router's choice for the caller and prompt size. With hedging
+        enabled, a second identical call is sent if the first is still running after the
+        caller's recent p95 latency, and whichever succeeds first is used.
+        """
+        route = route or self.router.route(caller, prompt)
+        
+        async def collect() -> str:
+            return "".join([text async for text in self._stream_response(prompt, caller, timeout, generation_config, route)])
+        
+        tasks = [asyncio.ensure_future(collect())]
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            delay = self.hedging.delay(caller)
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and self.hedging.try_acquire():
+                    logger.info(f"Hedging slow Gemini {caller} call after {delay:.2f}s")
+                    tasks.append(asyncio.ensure_future(collect()))
+            
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self.hedging.record_win()
+                        return task.result()
+                if not pending:
+                    raise tasks[0].exception()
         except Exception as e:
             logger.error(f"Error generating Gemini response: {str(e)}")
-            raise Exception(f"Gemini API error: {str(e)}")
+            raise Exception(f"Gemini API error: {str(e)}") from e
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _stream_response(self, prompt: str, caller: str, timeout: float = None,
+                               generation_config: Dict[str, Any] = None,
+                               route: Optional[ModelRoute] = None) -> AsyncIterator[str]:
+        """Stream response text from Gemini, recording tokens, wall time and time-to-first-token
+        
+        Raises CircuitOpenError straight away while the model's circuit for this caller is open.
+        """
+        route = route or self.router.route(caller, prompt)
+        breaker = self.breakers.get(route.model_name, caller)
+        breaker.before_call()
+        
+        started = time.monotonic()
+        ttft = None
+        usage = None
+        response_chars = 0
+        # Stays "cancelled" if the consumer stops early, e.g. a hedged call that lost
+        error = "cancelled"
+        options = {"generation_config": generation_config} if generation_config else {}
+        try:
+            async for chunk in self.executor.stream(route.backend.generate_content, prompt, timeout=timeout,
+                                                    request_timeout=True, stream=True, **options):
+                text = chunk.text
+                if ttft is None:
+                    ttft = time.monotonic() - started
+                response_chars += len(text)
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                yield text
+            error = None
+        except Exception as e:
+            error = failure_reason(e)
+            raise
+        finally:
+            duration = time.monotonic() - started
+            # Local backpressure and abandoned calls say nothing about Gemini's health
+            if error in ("cancelled", "queue_full"):
+                breaker.cancel()
+            else:
+                breaker.record(error is None, duration)
+            if error is None:
+                self.hedging.observe(caller, duration)
+            prompt_tokens = getattr(usage, "prompt_token_count", 0) or estimate_tokens(prompt)
+            response_tokens = getattr(usage, "candidates_token_count", 0) or -(-response_chars // CHARS_PER_TOKEN)
+            self.telemetry.record_call(caller, route.model_name, prompt_tokens, response_tokens, duration, ttft, error)
+            self.router.record(caller, route, prompt_tokens, response_tokens, duration, error)
     
     def _parse_itinerary_response(self, response: str, trip_request: TripRequest, 
                                  activities: List[Dict] = None, accommodations: List[Dict] = None,
                                  flights: List[Dict] = None, restaurants: List[Dict] = None) -> Dict[str, Any]:
         """Parse and validate the Gemini response"""
         try:
-            # Extract JSON from response (in case there's additional text)
-            start_idx = response.find('{')
-            end_idx = response.rfind('}') + 1
-            
-            if start_idx == -1 or end_idx == 0:
-                raise ValueError("No valid JSON found in response")
+            itinerary_data, truncated = extract_itinerary(response)
+            self.telemetry.record_parse("itinerary", "truncated" if truncated else None)
+            itinerary_data = hydrate_itinerary(itinerary_data, activities, accommodations, flights, restaurants)
             
-            json_str = response[start_idx:end_idx]
-            itinerary_data = json.loads(json_str)
+            if truncated:
+                # Keep the days Gemini finished and fill the rest from the fallback plan
+                days = itinerary_data.get("days") or []
+                if not days:
+                    raise ValueError("Truncated response contained no complete days")
+                logger.warning(f"Salvaged {len(days)} complete days from a truncated Gemini response")
+                fallback = self._generate_fallback_itinerary(trip_request)
+                itinerary_data = {**fallback, **itinerary_data, "days": days + fallback["days"][len(days):]}
             
             # Validate and enhance the data
             itinerary_data = self._validate_and_enhance_itinerary(itinerary_data, trip_request)
+            if truncated:
+                itinerary_data["salvaged"] = True
+                itinerary_data[FALLBACK_REASON] = "truncated"
             
             return itinerary_data
             
-        except json.JSONDecodeError as e:
+        except JSONExtractionError as e:
             logger.error(f"JSON parsing error: {str(e)}")
+            self.telemetry.record_parse("itinerary", "parse_error")
             # Return fallback itinerary if parsing fails
-            return self._generate_fallback_itinerary(trip_request)
+            return self._fallback_itinerary(trip_request, "parse_error")
         except Exception as e:
             logger.error(f"Error parsing itinerary: {str(e)}")
             # Return fallback itinerary if parsing fails
-            return self._generate_fallback_itinerary(trip_request)
+            return self._fallback_itinerary(trip_request, "invalid_itinerary")
+    
+    def _parse_structured_response(self, response: str, trip_request: TripRequest,
+                                   activities: List[Dict] = None, accommodations: List[Dict] = None,
+                                   flights: List[Dict] = None, restaurants: List[Dict] = None) -> Dict[str, Any]:
+        """Hydrate a schema-constrained response, cost it and validate it against ItineraryResponse"""
+        try:
+            itinerary_data = load_structured(response)
+            self.telemetry.record_parse("itinerary")
+        except SchemaMismatchError as e:
+            logger.error(f"Structured response did not decode: {str(e)}")
+            self.telemetry.record_parse("itinerary", "parse_error")
+            self.telemetry.record_schema("itinerary", e.fields)
+            return self._fallback_itinerary(trip_request, "schema_mismatch")
+        
+        itinerary_data = hydrate_itinerary(itinerary_data, activities, accommodations, flights, restaurants)
+        for day in itinerary_data.get("days") or []:
+            if isinstance(day, dict):
+                day.setdefault("transportation", [])
+        # Attached from the knowledge store afterwards
+        for name in KNOWLEDGE_SECTIONS:
+            itinerary_data.setdefault(name, [])
+        compute_budget(itinerary_data, trip_request.travelers_count, (trip_request.end_date - trip_request.start_date).days)
+        
+        try:
+            validate_itinerary(itinerary_data)
+        except SchemaMismatchError as e:
+            logger.error(str(e))
+            self.telemetry.record_schema("itinerary", e.fields)
+            return self._fallback_itinerary(trip_request, "schema_mismatch")
+        
+        self.telemetry.record_schema("itinerary")
+        return self._validate_and_enhance_itinerary(itinerary_data, trip_request)
+    
+    def _parse_json_response(self, response: str, caller: str) -> Any:
+        """Extract the JSON body of a response, recording whether it parsed"""
+        try:
+            data = extract_json(response)
+        except JSONExtractionError:
+            self.telemetry.record_parse(caller, "parse_error")
+            raise
+        self.telemetry.record_parse(caller)
+        return data
     
     def _validate_and_enhance_itinerary(self, data: Dict[str, Any], trip_request: TripRequest) -> Dict[str, Any]:
         """Validate and enhance the itinerary data"""
@@ -257,58 +746,120 @@ class GeminiService:
     async def generate_alternative_suggestions(self, itinerary_id: str, 
                                              original_itinerary: Dict[str, Any],
                                              user_feedback: str) -> Dict[str, Any]:
-        """Generate alternative suggestions based on user feedback"""
+        """Generate alternative suggestions based on user feedback
+        
+        Only the days the feedback is about are sent to Gemini, which answers with JSON
+        patches. Each patch is applied to the stored itinerary and validated here; the
+        suggestions that survive carry just the days they change and their cost impact.
+        """
         try:
-            prompt = f"""
-            The user has provided feedback on their itinerary: "{user_feedback}"
-            
-            Original itinerary: {json.dumps(original_itinerary, indent=2)}
-            
-            Please suggest 3 alternative modifications to the itinerary that address the user's feedback while maintaining the overall trip structure and budget.
-            
-            Return suggestions in JSON format:
-            {{
-                "suggestions": [
-                    {{
-                        "title": "Suggestion title",
-                        "description": "Detailed description",
-                        "changes": {{
-                            "modified_days": [1, 3],
-                            "new_activities": [...],
-                            "removed_activities": [...],
-                            "cost_impact": 500
-                        }},
-                        "reasoning": "Why this suggestion addresses the feedback"
-                    }}
-                ]
-            }}
-            """
+            affected_days = classify_feedback(original_itinerary, user_feedback)
+            activities, _, _, restaurants = self.planner.get_itinerary_candidates(original_itinerary)
+            prompt = self._create_alternatives_prompt(original_itinerary, user_feedback, affected_days, activities, restaurants)
+            baseline_cost = recompute_budget(copy.deepcopy(original_itinerary)).get("total_cost") or 0
             
-            response = await self._generate_response(prompt)
-            return json.loads(response)
+            # Escalate when every suggested patch was invalid
+            return await self._generate_routed(
+                prompt, "alternatives",
+                lambda response: self._apply_suggestions(
+                    itinerary_id, self._parse_json_response(response, "alternatives"), original_itinerary,
+                    activities, restaurants, affected_days, baseline_cost
+                ),
+                accept=lambda result: bool(result["suggestions"]) or not result["rejected"]
+            )
             
         except Exception as e:
             logger.error(f"Error generating alternatives: {str(e)}")
             raise Exception(f"Failed to generate alternatives: {str(e)}")
     
+    def _apply_suggestions(self, itinerary_id: str, parsed: Any, itinerary: Dict[str, Any],
+                           activities: List[Dict], restaurants: List[Dict], affected_days: List[int],
+                           baseline_cost: float) -> Dict[str, Any]:
+        """Apply each suggested patch, keeping the valid ones and reporting why the others were rejected"""
+        suggestions = []
+        rejected = []
+        for suggestion in (parsed.get("suggestions") or []) if isinstance(parsed, dict) else []:
+            patch = suggestion.get("patch") if isinstance(suggestion, dict) else None
+            try:
+                patched = apply_patch(itinerary, patch, activities, restaurants, affected_days)
+            except PatchError as e:
+                logger.warning(f"Rejected alternative for {itinerary_id}: {str(e)}")
+                rejected.append({"title": suggestion.get("title", "") if isinstance(suggestion, dict) else "",
+                                 "reason": str(e)})
+                continue
+            suggestions.append(suggestion_result(baseline_cost, patched, suggestion, patch))
+        
+        if rejected:
+            self.telemetry.record_parse("alternatives", "invalid_patch")
+        
+        return {
+            "affected_days": [i + 1 for i in affected_days],
+            "suggestions": suggestions,
+            "rejected": rejected
+        }
+    
+    def _create_alternatives_prompt(self, itinerary: Dict[str, Any], user_feedback: str, affected_days: List[int],
+                                    activities: List[Dict], restaurants: List[Dict]) -> str:
+        """Prompt for patches to the affected days, with a fixed number of replacement options"""
+        itinerary_context, _ = self.context_builder.build_itinerary_context(itinerary, affected_days)
+        preferences = (itinerary.get("trip_request") or {}).get("preferences") or {}
+        planned = {
+            str(item.get("name", "")).lower()
+            for day in itinerary.get("days", []) for item in day.get("activities", []) if isinstance(item, dict)
+        }
+        options = "\n".join([
+            self.context_builder.render_table("activities", [
+                item for item in rank_candidates("activities", activities, preferences)
+                if str(item.get("name", "")).lower() not in planned
+            ][:ALTERNATIVE_ACTIVITY_OPTIONS]),
+            self.context_builder.render_table(
+                "restaurants", rank_candidates("restaurants", restaurants, preferences)[:ALTERNATIVE_RESTAURANT_OPTIONS]
+            )
+        ])
+        
+        return f"""
+        The user has provided feedback on their itinerary: "{user_feedback}"
+        
+        Itinerary (only the days the feedback is about are listed; "index" is the day's position in the trip):
+        {itinerary_context}
+        
+        Replacement options (one row per option, columns as listed in each header):
+{options}
+        
+        Please suggest up to 3 alternative modifications that address the user's feedback while keeping the rest of the trip and the budget intact.
+        Express each one as a JSON Patch on the itinerary using only these operations:
+        - {{"op": "replace", "path": "/days/<index>/activities/<n>", "value": {{"name": "Option name", "time_slot": "morning"}}}}
+        - {{"op": "add", "path": "/days/<index>/meals/-", "value": {{"name": "Restaurant name", "meal": "dinner"}}}}
+        - {{"op": "remove", "path": "/days/<index>/activities/<n>"}}
+        Only use the day indexes listed above, and only name activities and restaurants from the replacement options or the itinerary itself.
+        
+        Return suggestions in JSON format:
+        {{
+            "suggestions": [
+                {{
+                    "title": "Suggestion title",
+                    "description": "Detailed description",
+                    "patch": [{{"op": "replace", "path": "/days/0/activities/1", "value": {{"name": "Option name"}}}}],
+                    "reasoning": "Why this suggestion addresses the feedback"
+                }}
+            ]
+        }}
+        """
+    
     async def generate_real_time_updates(self, itinerary_id: str, 
                                        current_itinerary: Dict[str, Any],
                                        weather_alerts: List[Dict] = None,
                                        traffic_updates: List[Dict] = None) -> Dict[str, Any]:
         """Generate real-time updates for the itinerary"""
         try:
-            context = {
-                "current_itinerary": current_itinerary,
-                "weather_alerts": weather_alerts or [],
-                "traffic_updates": traffic_updates or []
-            }
+            itinerary_context, _ = self.context_builder.build_itinerary_context(current_itinerary)
             
             prompt = f"""
             Based on real-time conditions, suggest updates to this itinerary:
             
-            Current itinerary: {json.dumps(current_itinerary, indent=2)}
-            Weather alerts: {json.dumps(weather_alerts or [], indent=2)}
-            Traffic updates: {json.dumps(traffic_updates or [], indent=2)}
+            Current itinerary: {itinerary_context}
+            Weather alerts: {compact_json(weather_alerts or [])}
+            Traffic updates: {compact_json(traffic_updates or [])}
             
             Provide smart adjustments including:
             - Alternative indoor activities for bad weather
@@ -335,8 +886,9 @@ class GeminiService:
             }}
             """
             
-            response = await self._generate_response(prompt)
-            return json.loads(response)
+            return await self._generate_routed(
+                prompt, "updates", lambda response: self._parse_json_response(response, "updates")
+            )
             
         except Exception as e:
             logger.error(f"Error generating real-time updates: {str(e)}")
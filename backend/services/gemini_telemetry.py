@@ -0,0 +1,144 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+from services.gemini_executor import GeminiDeadlineExceededError, GeminiQueueFullError
+from services.gemini_resilience import CircuitOpenError
+from services.metrics import LATENCY_BUCKETS_MS, Histogram
+from utils.json_extractor import JSONExtractionError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+# Callers every Gemini call is tagged with
+CALLERS = ("itinerary", "alternatives", "updates", "knowledge")
+
+
+def failure_reason(error: BaseException) -> str:
+    """Short, low-cardinality label for why a Gemini call or its handling failed"""
+    while error is not None:
+        if isinstance(error, GeminiDeadlineExceededError):
+            return "deadline_exceeded"
+        if isinstance(error, GeminiQueueFullError):
+            return "queue_full"
+        if isinstance(error, CircuitOpenError):
+            return "circuit_open"
+        if isinstance(error, JSONExtractionError):
+            return "parse_error"
+        error = error.__cause__
+    return "gemini_error"
+
+
+class CallerStats:
+    """Counters and histograms for the Gemini calls made on behalf of one caller"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors: Dict[str, int] = {}
+        self.models: Dict[str, int] = {}
+        self.parse_success = 0
+        self.parse_failure: Dict[str, int] = {}
+        self.fallbacks: Dict[str, int] = {}
+        self.escalations: Dict[str, int] = {}
+        self.schema_valid = 0
+        self.schema_mismatch = 0
+        self.schema_mismatch_fields: Dict[str, int] = {}
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.ttft_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.prompt_tokens = Histogram(TOKEN_BUCKETS)
+        self.response_tokens = Histogram(TOKEN_BUCKETS)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": dict(self.errors),
+            "models": dict(self.models),
+            "parse_success": self.parse_success,
+            "parse_failure": dict(self.parse_failure),
+            "fallbacks": dict(self.fallbacks),
+            "escalations": dict(self.escalations),
+            "schema_valid": self.schema_valid,
+            "schema_mismatch": self.schema_mismatch,
+            "schema_mismatch_rate": round(self.schema_mismatch / (self.schema_valid + self.schema_mismatch), 3)
+            if self.schema_mismatch else 0.0,
+            "schema_mismatch_fields": dict(self.schema_mismatch_fields),
+            "latency_ms": self.latency_ms.snapshot(),
+            "ttft_ms": self.ttft_ms.snapshot(),
+            "prompt_tokens": self.prompt_tokens.snapshot(),
+            "response_tokens": self.response_tokens.snapshot()
+        }
+
+
+class GeminiTelemetry:
+    """Records every Gemini call and what became of its output, tagged by caller.
+
+    A call is recorded once it ends (successfully or not) with its model,
+    token counts, wall time and time-to-first-token. Parse outcomes,
+    escalations and fallbacks are recorded separately by the code that
+    handles the response, with a short reason such as
+    ``deadline_exceeded`` or ``parse_error``.
+    """
+
+    def __init__(self):
+        self._callers: Dict[str, CallerStats] = {caller: CallerStats() for caller in CALLERS}
+
+    def record_call(self, caller: str, model: str, prompt_tokens: int, response_tokens: int,
+                    wall_time: float, ttft: Optional[float], error: Optional[str] = None):
+        stats = self._stats(caller)
+        stats.calls += 1
+        stats.models[model] = stats.models.get(model, 0) + 1
+        stats.latency_ms.observe(wall_time * 1000)
+        stats.prompt_tokens.observe(prompt_tokens)
+        if ttft is not None:
+            stats.ttft_ms.observe(ttft * 1000)
+        if error:
+            stats.errors[error] = stats.errors.get(error, 0) + 1
+        else:
+            stats.response_tokens.observe(response_tokens)
+
+        logger.info(
+            f"gemini_call caller={caller} model={model} prompt_tokens={prompt_tokens} "
+            f"response_tokens={response_tokens} wall_ms={wall_time * 1000:.0f} "
+            f"ttft_ms={'-' if ttft is None else f'{ttft * 1000:.0f}'} error={error or '-'}"
+        )
+
+    def record_parse(self, caller: str, reason: Optional[str] = None):
+        """Record a parsed response; ``reason`` is set when parsing failed"""
+        stats = self._stats(caller)
+        if reason is None:
+            stats.parse_success += 1
+        else:
+            stats.parse_failure[reason] = stats.parse_failure.get(reason, 0) + 1
+
+    def record_schema(self, caller: str, mismatched_fields: Optional[List[str]] = None):
+        """Record a structured response's validation; ``mismatched_fields`` is set when it failed"""
+        stats = self._stats(caller)
+        if mismatched_fields is None:
+            stats.schema_valid += 1
+            return
+        stats.schema_mismatch += 1
+        for field in mismatched_fields:
+            stats.schema_mismatch_fields[field] = stats.schema_mismatch_fields.get(field, 0) + 1
+
+    def record_fallback(self, caller: str, reason: str):
+        """Record that a caller served non-Gemini output and why"""
+        stats = self._stats(caller)
+        stats.fallbacks[reason] = stats.fallbacks.get(reason, 0) + 1
+        logger.warning(f"gemini_fallback caller={caller} reason={reason}")
+
+    def record_escalation(self, caller: str, reason: str):
+        """Record that a caller's output was unusable and the call was retried on the large model"""
+        stats = self._stats(caller)
+        stats.escalations[reason] = stats.escalations.get(reason, 0) + 1
+        logger.info(f"gemini_escalation caller={caller} reason={reason}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return counters and histograms for every caller"""
+        return {caller: stats.snapshot() for caller, stats in self._callers.items()}
+
+    def _stats(self, caller: str) -> CallerStats:
+        if caller not in self._callers:
+            self._callers[caller] = CallerStats()
+        return self._callers[caller]
@@ -1,34 +1,17 @@
+import re
 
-import requests
-import os
-from dotenv import load_dotenv
+from services.rapidapi_client import rapidapi_client
+from services.paginated_search import PaginatedSearch
 
-load_dotenv()
-
-host = os.getenv("RAPIDAPI_HOST")
-
-def get_destination(location):
-  url = f"https://{host}/api/v1/hotels/searchDestination"
-  headers = {
-      'x-rapidapi-key': os.getenv("RAPIDAPI_KEY"),
-      'x-rapidapi-host': host
-  }
+async def get_destination(location):
   params = {
     "query": location
   }
 
-  response = requests.get(url, headers=headers, params=params)
-  return response.json()
+  return await rapidapi_client.get("/api/v1/hotels/searchDestination", params)
 
 
-def get_hotels_for_city(destination_id, arrival_date, departure_date, adults, room_qty):
-  
-  url = "https://booking-com15.p.rapidapi.com/api/v1/hotels/searchHotels"
-
-  headers = {
-      'x-rapidapi-key': os.getenv("RAPIDAPI_KEY"),
-      'x-rapidapi-host': host
-  }
+async def get_hotels_for_city(destination_id, arrival_date, departure_date, adults, room_qty, page_number='1'):
 
   params = {
     'dest_id': destination_id,
@@ -37,12 +20,29 @@ def get_hotels_for_city(destination_id, arrival_date, departure_date, adults, ro
     'departure_date': departure_date,
     'adults': adults,
     'room_qty': room_qty,
-    'page_number': '1',
+    'page_number': page_number,
     'units': 'metric',
     'temperature_unit': 'c',
     'languagecode': 'en-us',
     'currency_code': 'INR'
   }
 
-  response = requests.get(url, headers=headers, params=params)
-  return response.json()
\ No newline at end of file
+  return await rapidapi_client.get("/api/v1/hotels/searchHotels", params)
+
+
+def _hotel_total(payload):
+  # The count only comes as text, e.g. {"meta": [{"title": "1845 properties"}]}
+  title = payload["data"]["meta"][0]["title"]
+  return int(re.sub(r"[^\d]", "", title.split(" ")[0]))
+
+
+def search_hotels_for_city(destination_id, arrival_date, departure_date, adults, room_qty, max_pages=None):
+  """All result pages of a hotel search, fetched concurrently"""
+  return PaginatedSearch(
+    "rapidapi",
+    lambda page: get_hotels_for_city(destination_id, arrival_date, departure_date, adults, room_qty, str(page)),
+    items_path=("data", "hotels"),
+    total=_hotel_total,
+    key=lambda hotel: hotel.get("hotel_id"),
+    max_pages=max_pages
+  )
@@ -0,0 +1,89 @@
+import os
+import json
+import math
+import hashlib
+from typing import Any, Dict, Optional
+
+from models.trip_models import TripRequest
+from services.ttl_cache import TTLCache
+
+# Budgets within ~20% of each other land in the same band
+BUDGET_BAND_RATIO = 1.2
+
+
+def budget_band(max_budget: float) -> int:
+    """Map a budget onto a coarse logarithmic band"""
+    return int(round(math.log(max(max_budget, 1.0)) / math.log(BUDGET_BAND_RATIO)))
+
+
+def _text(value: Any) -> str:
+    return str(getattr(value, "value", value) or "").strip().lower()
+
+
+def _terms(values: Any) -> list:
+    return sorted({_text(value) for value in values or []} - {""})
+
+
+def normalize_trip_request(trip_request: TripRequest) -> Dict[str, Any]:
+    """Reduce a trip request to the fields that influence the generated itinerary
+
+    Everything the prompt or the candidate lookup reads is included: origin
+    (it picks the flights), interests (they rank candidates), dietary and
+    accessibility needs, travel style and special requirements. Only
+    ``max_budget`` is coarsened, into a band.
+    """
+    origin = trip_request.origin
+    destination = trip_request.destination
+    preferences = trip_request.preferences
+    return {
+        "origin": [_text(part) for part in (origin.name, origin.city, origin.state, origin.country, origin.airport_id)],
+        "destination": [
+            _text(part)
+            for part in (destination.name, destination.city, destination.state, destination.country, destination.airport_id)
+        ],
+        "start_date": trip_request.start_date.isoformat(),
+        "end_date": trip_request.end_date.isoformat(),
+        "themes": _terms(preferences.themes),
+        "interests": _terms(preferences.interests),
+        "dietary_restrictions": _terms(preferences.dietary_restrictions),
+        "accessibility_needs": _terms(preferences.accessibility_needs),
+        "travel_style": _text(preferences.travel_style),
+        "budget_level": _text(preferences.budget_level),
+        "budget_band": budget_band(preferences.max_budget),
+        "travelers_count": trip_request.travelers_count,
+        "special_requirements": " ".join((trip_request.special_requirements or "").lower().split())
+    }
+
+
+def make_request_key(trip_request: TripRequest, template_version: str) -> str:
+    """Content address of a trip request for a given prompt template version"""
+    canonical = json.dumps(
+        {"request": normalize_trip_request(trip_request), "template_version": template_version},
+        sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def make_exact_request_key(trip_request: TripRequest, template_version: str) -> str:
+    """Hash of the whole trip request, with no normalization, for a given prompt template version"""
+    canonical = json.dumps(
+        {"request": trip_request.model_dump(mode="json"), "template_version": template_version},
+        sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ItineraryCache(TTLCache):
+    """TTL cache for generated itineraries, keyed by make_request_key.
+
+    Sized by ``ITINERARY_CACHE_SIZE`` and ``ITINERARY_CACHE_TTL``, with the
+    disk tier in ``ITINERARY_CACHE_DIR`` when it is set.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None,
+                 disk_dir: Optional[str] = None):
+        super().__init__(
+            max_entries=max_entries or int(os.getenv("ITINERARY_CACHE_SIZE", "256")),
+            ttl_seconds=ttl_seconds or float(os.getenv("ITINERARY_CACHE_TTL", "21600")),
+            disk_dir=disk_dir or os.getenv("ITINERARY_CACHE_DIR")
+        )
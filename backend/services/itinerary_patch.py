@@ -0,0 +1,235 @@
+import os
+import re
+import copy
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from services.trip_planner import compute_budget
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Most activities a single day may hold after a patch
+MAX_ACTIVITIES_PER_DAY = 4
+MAX_MEALS_PER_DAY = 3
+
+PATCH_OPS = ("add", "remove", "replace")
+_PATH = re.compile(r"^/days/(\d+)/(activities|meals)/(\d+|-)$")
+
+_DAY_NUMBERS = re.compile(r"\bdays?\s+((?:\d+|\s*(?:,|-|–|to|and|&)\s*)+)")
+_ORDINALS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5,
+    "sixth": 6, "seventh": 7, "eighth": 8, "ninth": 9, "tenth": 10
+}
+_WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+_COST_WORDS = ("expensive", "cheaper", "cheap", "budget", "cost", "price", "afford", "pricey")
+
+
+class PatchError(ValueError):
+    """Raised when a suggested patch cannot be applied to the stored itinerary"""
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _day_hours(day: Dict[str, Any]) -> float:
+    return sum(item.get("duration_hours") or 0 for item in day.get("activities", []) if isinstance(item, dict))
+
+
+def classify_feedback(itinerary: Dict[str, Any], feedback: str, max_days: Optional[int] = None) -> List[int]:
+    """Pick the indexes of the days a piece of feedback is about.
+
+    Days named explicitly ("day 3", "days 2-4", "the last day", a date or a
+    weekday) or holding an item or category the feedback mentions come
+    first. Feedback that names nothing falls back to the costliest days for
+    budget complaints and the busiest days otherwise. At most ``max_days``
+    days are returned, in trip order.
+    """
+    max_days = max_days or int(os.getenv("ALTERNATIVES_MAX_DAYS", "3"))
+    days = itinerary.get("days", [])
+    text = feedback.lower()
+    scores = [0] * len(days)
+
+    def mention(index: int, weight: int):
+        if 0 <= index < len(days):
+            scores[index] += weight
+
+    for match in _DAY_NUMBERS.finditer(text):
+        for part in re.split(r"\s*(?:,|&|\band\b)\s*", match.group(1)):
+            bounds = [int(n) for n in re.findall(r"\d+", part)]
+            if len(bounds) == 2 and re.search(r"-|–|\bto\b", part):
+                numbers = range(bounds[0], bounds[1] + 1)
+            else:
+                numbers = bounds
+            for number in numbers:
+                mention(number - 1, 10)
+    for word, number in _ORDINALS.items():
+        if re.search(rf"\b{word} day\b", text):
+            mention(number - 1, 10)
+    if re.search(r"\b(last|final) day\b", text):
+        mention(len(days) - 1, 10)
+
+    for index, day in enumerate(days):
+        day_date = _parse_date(day.get("date"))
+        if day_date and (day_date.isoformat() in text or _WEEKDAYS[day_date.weekday()] in text):
+            mention(index, 10)
+        for item in day.get("activities", []) + day.get("meals", []):
+            if not isinstance(item, dict):
+                continue
+            name = str(item.get("name") or "").lower()
+            if name and re.search(rf"\b{re.escape(name)}\b", text):
+                mention(index, 5)
+            for tag in (item.get("category"), item.get("cuisine")):
+                if tag and re.search(rf"\b{re.escape(str(tag).lower())}\b", text):
+                    mention(index, 1)
+
+    ranked = sorted((i for i in range(len(days)) if scores[i]), key=lambda i: -scores[i])
+    if not ranked:
+        if any(word in text for word in _COST_WORDS):
+            key = lambda i: -(days[i].get("total_daily_cost") or 0)
+        else:
+            key = lambda i: -_day_hours(days[i])
+        ranked = sorted(range(len(days)), key=key)
+    return sorted(ranked[:max_days])
+
+
+def apply_patch(itinerary: Dict[str, Any], patch: List[Dict[str, Any]],
+                activities: List[Dict[str, Any]] = None, restaurants: List[Dict[str, Any]] = None,
+                allowed_days: Optional[List[int]] = None) -> Dict[str, Any]:
+    """Apply a JSON Patch of activity and meal changes to a copy of the itinerary.
+
+    Only ``add``, ``remove`` and ``replace`` on ``/days/<i>/activities/<n>``
+    and ``/days/<i>/meals/<n>`` are accepted, and only for ``allowed_days``
+    when given. Added items must name a known activity or restaurant (or
+    one already in the itinerary) and are hydrated with its full record.
+    The result must not repeat an activity or overfill a day; daily totals,
+    ``total_cost`` and ``budget_breakdown`` are recomputed. Raises
+    ``PatchError`` if anything is invalid.
+    """
+    if not isinstance(patch, list) or not patch:
+        raise PatchError("Patch must be a non-empty list of operations")
+
+    patched = copy.deepcopy(itinerary)
+    days = patched.get("days", [])
+    known = {
+        "activities": _index_by_name(activities, days, "activities"),
+        "meals": _index_by_name(restaurants, days, "meals")
+    }
+
+    touched = set()
+    for operation in patch:
+        if not isinstance(operation, dict) or operation.get("op") not in PATCH_OPS:
+            raise PatchError(f"Unsupported patch operation: {operation!r}")
+        match = _PATH.match(str(operation.get("path", "")))
+        if not match:
+            raise PatchError(f"Unsupported patch path: {operation.get('path')!r}")
+
+        day_index, section, position = int(match.group(1)), match.group(2), match.group(3)
+        if day_index >= len(days) or (allowed_days is not None and day_index not in allowed_days):
+            raise PatchError(f"Patch touches day {day_index + 1}, which it may not change")
+        items = days[day_index].setdefault(section, [])
+
+        op = operation["op"]
+        if position == "-":
+            if op != "add":
+                raise PatchError(f"'-' can only be used to add, not {op}")
+            index = len(items)
+        else:
+            index = int(position)
+            limit = len(items) + 1 if op == "add" else len(items)
+            if index >= limit:
+                raise PatchError(f"{operation['path']} is out of range")
+
+        if op == "remove":
+            del items[index]
+        else:
+            value = _resolve(operation.get("value"), known[section], section)
+            if op == "add":
+                items.insert(index, value)
+            else:
+                items[index] = value
+        touched.add(day_index)
+
+    _validate(days, touched)
+    return recompute_budget(patched)
+
+
+def recompute_budget(itinerary: Dict[str, Any]) -> Dict[str, Any]:
+    """Recompute an itinerary's costs using the traveller count and dates of its trip request"""
+    trip_request = itinerary.get("trip_request") or {}
+    start, end = _parse_date(trip_request.get("start_date")), _parse_date(trip_request.get("end_date"))
+    nights = (end - start).days if start and end else len(itinerary.get("days", []))
+    return compute_budget(itinerary, trip_request.get("travelers_count") or 1, nights)
+
+
+def _index_by_name(candidates: Optional[List[Dict[str, Any]]], days: List[Dict[str, Any]],
+                   section: str) -> Dict[str, Dict[str, Any]]:
+    index = {}
+    for day in days:
+        for item in day.get(section, []):
+            if isinstance(item, dict) and item.get("name"):
+                index[str(item["name"]).strip().lower()] = item
+    for item in candidates or []:
+        if item.get("name"):
+            index[str(item["name"]).strip().lower()] = item
+    return index
+
+
+def _resolve(value: Any, known: Dict[str, Dict[str, Any]], section: str) -> Dict[str, Any]:
+    """Turn a patch value that names an item into the item's full record"""
+    if isinstance(value, str):
+        value = {"name": value}
+    if not isinstance(value, dict) or not value.get("name"):
+        raise PatchError(f"Patch values for {section} must name an item")
+    match = known.get(str(value["name"]).strip().lower())
+    if match is None:
+        raise PatchError(f"Unknown {'activity' if section == 'activities' else 'restaurant'}: {value['name']}")
+    # Only scheduling details may be set by the patch; the record itself comes from our data
+    return {**match, **{key: value[key] for key in ("time_slot", "meal") if value.get(key)}}
+
+
+def _validate(days: List[Dict[str, Any]], touched: set):
+    seen: Dict[str, int] = {}
+    for day_index, day in enumerate(days):
+        for item in day.get("activities", []):
+            name = str(item.get("name") if isinstance(item, dict) else item).strip().lower()
+            if name in seen and (day_index in touched or seen[name] in touched):
+                raise PatchError(f"{name} would be visited twice (days {seen[name] + 1} and {day_index + 1})")
+            seen.setdefault(name, day_index)
+
+    for day_index in touched:
+        day = days[day_index]
+        if len(day.get("activities", [])) > MAX_ACTIVITIES_PER_DAY:
+            raise PatchError(f"Day {day_index + 1} would have more than {MAX_ACTIVITIES_PER_DAY} activities")
+        if len(day.get("meals", [])) > MAX_MEALS_PER_DAY:
+            raise PatchError(f"Day {day_index + 1} would have more than {MAX_MEALS_PER_DAY} meals")
+        meal_names = [str(item.get("name") if isinstance(item, dict) else item).lower() for item in day.get("meals", [])]
+        if len(meal_names) != len(set(meal_names)):
+            raise PatchError(f"Day {day_index + 1} would have the same restaurant twice")
+
+
+def suggestion_result(baseline_cost: float, patched: Dict[str, Any],
+                      suggestion: Dict[str, Any], patch: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Describe an applied suggestion with just the days it changed"""
+    changed = sorted({int(_PATH.match(op["path"]).group(1)) for op in patch})
+    return {
+        "title": suggestion.get("title", ""),
+        "description": suggestion.get("description", ""),
+        "reasoning": suggestion.get("reasoning", ""),
+        "patch": patch,
+        "modified_days": [i + 1 for i in changed],
+        "days": {str(i): patched["days"][i] for i in changed},
+        "cost_impact": (patched.get("total_cost") or 0) - baseline_cost,
+        "total_cost": patched.get("total_cost"),
+        "budget_breakdown": patched.get("budget_breakdown")
+    }
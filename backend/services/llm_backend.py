@@ -0,0 +1,53 @@
+import os
+import logging
+from typing import Any
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LLMBackend:
+    """Interface GeminiService talks to instead of the Gemini SDK directly.
+
+    Implementations mirror ``genai.GenerativeModel.generate_content``: a
+    blocking call that returns a response with ``.text`` or, with
+    ``stream=True``, an iterator of chunks with ``.text`` (the last one may
+    carry ``usage_metadata``). Calls are made from the executor's worker
+    threads, so implementations must be thread-safe.
+    """
+
+    model_name = "unknown"
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs) -> Any:
+        raise NotImplementedError
+
+
+class GeminiBackend(LLMBackend):
+    """The real Gemini API through the google-generativeai SDK"""
+
+    def __init__(self, model_name: str = None):
+        self.api_key = os.getenv("GEMINI_API_KEY")
+        if not self.api_key:
+            raise ValueError("GEMINI_API_KEY environment variable is required")
+
+        import google.generativeai as genai
+
+        genai.configure(api_key=self.api_key)
+        self.model_name = model_name or os.getenv("GEMINI_LARGE_MODEL", "gemini-1.5-pro")
+        self._model = genai.GenerativeModel(self.model_name)
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs) -> Any:
+        return self._model.generate_content(prompt, stream=stream, **kwargs)
+
+
+def create_llm_backend(model_name: str = None) -> LLMBackend:
+    """Build the backend selected by ``LLM_BACKEND`` (``gemini`` or ``fake``) for a model"""
+    backend = os.getenv("LLM_BACKEND", "gemini").lower()
+    if backend == "fake":
+        from services.fake_llm import FakeGeminiBackend
+        logger.info(f"Using the local fake LLM backend for {model_name or 'the default model'}")
+        return FakeGeminiBackend(model_name=model_name)
+    if backend == "gemini":
+        return GeminiBackend(model_name)
+    raise ValueError(f"Unknown LLM_BACKEND: {backend}")
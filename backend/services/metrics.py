@@ -0,0 +1,77 @@
+import math
+import bisect
+import random
+from typing import Any, Dict, Optional, Sequence
+
+# Bucket bounds for call latencies, shared by the Gemini and upstream API metrics
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 20000, 40000, 60000, 90000)
+
+
+class Histogram:
+    """Fixed-bucket histogram with cumulative bucket counts, like a Prometheus histogram"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._max = 0.0
+
+    def observe(self, value: float):
+        self._counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sum += value
+        self._count += 1
+        self._max = max(self._max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile"""
+        if not self._count:
+            return None
+        rank = q * self._count
+        seen = 0
+        for bound, count in zip(self.buckets, self._counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self._max)
+        return self._max
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets, self._counts):
+            cumulative += count
+            buckets[f"le_{bound}"] = cumulative
+        buckets["le_inf"] = self._count
+        return {
+            "count": self._count,
+            "sum": round(self._sum, 2),
+            "avg": round(self._sum / self._count, 2) if self._count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": round(self._max, 2) if self._count else None,
+            "buckets": buckets
+        }
+
+
+class LatencyDistribution:
+    """Samples delays in seconds from a spec such as ``fixed:800``, ``uniform:500,1500``,
+    ``normal:1200,300`` or ``lognormal:1200,0.5`` (median ms, sigma); values are in ms"""
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        kind, _, args = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.args = [float(arg) for arg in args.split(",") if arg.strip()]
+        if self.kind not in ("fixed", "uniform", "normal", "lognormal") or not self.args:
+            raise ValueError(f"Invalid latency distribution: {spec}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            ms = self.args[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(self.args[0], self.args[-1])
+        elif self.kind == "normal":
+            ms = rng.gauss(self.args[0], self.args[1] if len(self.args) > 1 else 0)
+        else:
+            ms = rng.lognormvariate(math.log(max(self.args[0], 1)), self.args[1] if len(self.args) > 1 else 0.5)
+        return max(ms, 0) / 1000
@@ -0,0 +1,119 @@
+import json
+import copy
+import logging
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CATALOG_PATH = Path(__file__).resolve().parent.parent / "mocks" / "catalog.json"
+
+# Same defaults as the app's MockData (plansmith/lib/models/mock_data.dart)
+DEFAULT_DESTINATION = "Jaipur"
+DEFAULT_FROM_CITY = "Mumbai"
+FALLBACK_COUNT = 3
+
+
+def _text(value: Any) -> str:
+    return str(getattr(value, "value", value) or "").lower()
+
+
+def is_budget_compatible(budget_level: Any, cost: float) -> bool:
+    """Whether a price suits a budget level"""
+    level = _text(budget_level)
+    if level == "budget":
+        return cost <= 2000
+    if level == "mid_range":
+        return cost <= 10000
+    if level == "luxury":
+        return True
+    return cost <= 5000
+
+
+def _at_destination(items: List[Dict[str, Any]], destination: str) -> List[Dict[str, Any]]:
+    """Items located at the destination, or every item when none are"""
+    destination = destination.lower()
+    matches = [
+        item for item in items
+        if destination in item["location"].lower() or item["location"].lower().split(",")[0] in destination
+    ]
+    return matches or items
+
+
+def _matches_any(wanted: List[Any], tags: List[str], both_ways: bool = True) -> bool:
+    if not wanted:
+        return True
+    tags = [tag.lower() for tag in tags]
+    return any(
+        _text(term) in tag or (both_ways and tag in _text(term))
+        for term in wanted for tag in tags
+    )
+
+
+class MockDataService:
+    """Activities, stays, flights and restaurants from the bundled catalog.
+
+    The catalog (``mocks/catalog.json``) is the data the mobile app ships
+    in ``MockData``, and the filters follow the app's: match the
+    destination first, then themes, interests and budget level, and fall
+    back to the first few items rather than return nothing. Callers get
+    copies, so they may modify what they are given.
+    """
+
+    def __init__(self, catalog_path: Path = CATALOG_PATH):
+        with open(catalog_path, encoding="utf-8") as catalog:
+            self.catalog: Dict[str, List[Dict[str, Any]]] = json.load(catalog)
+
+    def _items(self, kind: str) -> List[Dict[str, Any]]:
+        return self.catalog.get(kind, [])
+
+    def get_activities(self, preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
+        themes = preferences.get("themes") or []
+        interests = preferences.get("interests") or []
+        budget_level = preferences.get("budget_level") or "mid_range"
+        candidates = _at_destination(self._items("activities"), preferences.get("destination") or DEFAULT_DESTINATION)
+        matches = [
+            item for item in candidates
+            if _matches_any(themes, item["themes"]) and _matches_any(interests, item["interests"])
+            and is_budget_compatible(budget_level, item["cost_per_person"])
+        ]
+        return copy.deepcopy(matches or candidates[:FALLBACK_COUNT])
+
+    def get_accommodations(self, preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
+        budget_level = preferences.get("budget_level") or "mid_range"
+        candidates = _at_destination(self._items("accommodations"), preferences.get("destination") or DEFAULT_DESTINATION)
+        matches = [item for item in candidates if is_budget_compatible(budget_level, item["cost_per_night"])]
+        return copy.deepcopy(matches or candidates[:FALLBACK_COUNT])
+
+    def get_flights(self, preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Flights on the route, else on the reverse route (swapped), else any flight"""
+        from_city = (preferences.get("from_city") or DEFAULT_FROM_CITY).lower()
+        to_city = (preferences.get("to_city") or DEFAULT_DESTINATION).lower()
+
+        def serves(flight: Dict[str, Any], origin: str, destination: str) -> bool:
+            start, end = flight["from"].lower(), flight["to"].lower()
+            return (origin in start or start in origin) and (destination in end or end in destination)
+
+        flights = self._items("flights")
+        candidates = [flight for flight in flights if serves(flight, from_city, to_city)]
+        if not candidates:
+            candidates = [
+                {**flight, "from": flight["to"], "to": flight["from"]}
+                for flight in flights if serves(flight, to_city, from_city)
+            ] or flights
+        budget_level = preferences.get("budget_level") or "mid_range"
+        matches = [flight for flight in candidates if is_budget_compatible(budget_level, flight["price"])]
+        return copy.deepcopy(matches or candidates[:FALLBACK_COUNT])
+
+    def get_restaurants(self, preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
+        themes = preferences.get("themes") or []
+        interests = preferences.get("interests") or []
+        candidates = _at_destination(self._items("restaurants"), preferences.get("destination") or DEFAULT_DESTINATION)
+        matches = [
+            item for item in candidates
+            if _matches_any(themes, item["themes"], both_ways=False)
+            and _matches_any(interests, item["interests"], both_ways=False)
+        ]
+        return copy.deepcopy(matches or candidates[:FALLBACK_COUNT])
@@ -0,0 +1,140 @@
+import os
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from services.context_builder import estimate_tokens
+from services.llm_backend import LLMBackend, create_llm_backend
+from services.metrics import LATENCY_BUCKETS_MS, Histogram
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SMALL = "small"
+LARGE = "large"
+
+# Callers that never need the large model
+SMALL_ONLY_CALLERS = ("alternatives", "updates", "knowledge")
+
+
+def _parse_price(value: str) -> Tuple[float, float]:
+    """Parse "input,output" USD per million tokens"""
+    prompt_price, _, response_price = value.partition(",")
+    return float(prompt_price), float(response_price or prompt_price)
+
+
+class ModelRoute:
+    """One tier's model, its backend and its per-token prices"""
+
+    def __init__(self, tier: str, backend: LLMBackend, prompt_price: float, response_price: float):
+        self.tier = tier
+        self.backend = backend
+        self.model_name = backend.model_name
+        self.prompt_price = prompt_price
+        self.response_price = response_price
+
+    def cost(self, prompt_tokens: int, response_tokens: int) -> float:
+        """Estimated USD cost of one call"""
+        return (prompt_tokens * self.prompt_price + response_tokens * self.response_price) / 1_000_000
+
+
+class RouteStats:
+    """Calls, latency, tokens and estimated cost for one caller on one tier"""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.response_tokens = 0
+        self.cost_usd = 0.0
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "response_tokens": self.response_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "cost_per_call_usd": round(self.cost_usd / self.calls, 6) if self.calls else 0.0,
+            "latency_ms": self.latency_ms.snapshot()
+        }
+
+
+class ModelRouter:
+    """Picks the Gemini model for each call.
+
+    Alternatives, updates, destination knowledge and short itineraries go
+    to the small model (``GEMINI_SMALL_MODEL``); itineraries of at least
+    ``large_min_days`` days, or prompts of at least
+    ``large_min_prompt_tokens`` tokens, go to the large one
+    (``GEMINI_LARGE_MODEL``). Output from the small model that fails validation
+    can be escalated to the large model once. Setting both models to the
+    same name turns routing off.
+    """
+
+    def __init__(self, small_model: Optional[str] = None, large_model: Optional[str] = None,
+                 large_min_days: Optional[int] = None, large_min_prompt_tokens: Optional[int] = None,
+                 escalate: Optional[bool] = None):
+        large_model = large_model or os.getenv("GEMINI_LARGE_MODEL", "gemini-1.5-pro")
+        small_model = small_model or os.getenv("GEMINI_SMALL_MODEL", "gemini-1.5-flash")
+        self.large_min_days = large_min_days or int(os.getenv("ROUTER_LARGE_MIN_DAYS", "6"))
+        self.large_min_prompt_tokens = large_min_prompt_tokens or int(os.getenv("ROUTER_LARGE_MIN_PROMPT_TOKENS", "4000"))
+        self.escalate_invalid = escalate if escalate is not None else os.getenv("ROUTER_ESCALATE", "true").lower() == "true"
+
+        large_backend = create_llm_backend(large_model)
+        small_backend = large_backend if small_model == large_model else create_llm_backend(small_model)
+        self.routes = {
+            LARGE: ModelRoute(LARGE, large_backend, *_parse_price(os.getenv("GEMINI_LARGE_PRICE", "0.50,1.50"))),
+            SMALL: ModelRoute(SMALL, small_backend, *_parse_price(os.getenv("GEMINI_SMALL_PRICE", "0.075,0.30")))
+        }
+
+        self._stats: Dict[str, RouteStats] = {}
+        self._decisions: Dict[str, int] = {}
+        self._escalations: Dict[str, int] = {}
+
+    def route(self, caller: str, prompt: str, duration_days: Optional[int] = None) -> ModelRoute:
+        """Choose the route for a call from its type, the trip length and the prompt size"""
+        tier = SMALL
+        if caller not in SMALL_ONLY_CALLERS:
+            if (duration_days or 0) >= self.large_min_days or estimate_tokens(prompt) >= self.large_min_prompt_tokens:
+                tier = LARGE
+        key = f"{caller}/{tier}"
+        self._decisions[key] = self._decisions.get(key, 0) + 1
+        return self.routes[tier]
+
+    def escalate(self, caller: str, route: ModelRoute) -> Optional[ModelRoute]:
+        """The route to retry invalid output on, or None if there is nothing bigger to try"""
+        large = self.routes[LARGE]
+        if not self.escalate_invalid or route.tier == LARGE or route.backend is large.backend:
+            return None
+        self._escalations[caller] = self._escalations.get(caller, 0) + 1
+        logger.info(f"Escalating {caller} from {route.model_name} to {large.model_name} after invalid output")
+        return large
+
+    def record(self, caller: str, route: ModelRoute, prompt_tokens: int, response_tokens: int,
+               wall_time: float, error: Optional[str] = None):
+        """Record a finished call on a route"""
+        key = f"{caller}/{route.tier}"
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = RouteStats(route.model_name)
+        stats.calls += 1
+        stats.errors += error is not None
+        stats.prompt_tokens += prompt_tokens
+        stats.response_tokens += response_tokens
+        stats.cost_usd += route.cost(prompt_tokens, response_tokens)
+        stats.latency_ms.observe(wall_time * 1000)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "models": {tier: route.model_name for tier, route in self.routes.items()},
+            "large_min_days": self.large_min_days,
+            "large_min_prompt_tokens": self.large_min_prompt_tokens,
+            "decisions": dict(self._decisions),
+            "escalations": dict(self._escalations),
+            "routes": {key: stats.snapshot() for key, stats in self._stats.items()},
+            "total_cost_usd": round(sum(stats.cost_usd for stats in self._stats.values()), 6)
+        }
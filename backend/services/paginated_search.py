@@ -0,0 +1,151 @@
+import os
+import math
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROVIDER_CONCURRENCY = {"rapidapi": 4, "amadeus": 2}
+
+
+class ProviderLimiter:
+    """Caps concurrent page fetches to one upstream provider across all searches"""
+
+    def __init__(self, provider: str):
+        default = DEFAULT_PROVIDER_CONCURRENCY.get(provider, 4)
+        self.concurrency = int(os.getenv(f"SEARCH_PAGE_CONCURRENCY_{provider.upper()}", str(default)))
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.in_flight = 0
+        self.stats = {
+            "searches": 0,
+            "pages_fetched": 0,
+            "page_failures": 0,
+            "duplicates_dropped": 0
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"concurrency": self.concurrency, "in_flight": self.in_flight, **self.stats}
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+
+
+def provider_limiter(provider: str) -> ProviderLimiter:
+    if provider not in _limiters:
+        _limiters[provider] = ProviderLimiter(provider)
+    return _limiters[provider]
+
+
+def _dig(payload: Any, path: Sequence[str]) -> Any:
+    for name in path:
+        payload = payload.get(name) if isinstance(payload, dict) else None
+    return payload
+
+
+class PaginatedSearch:
+    """Fetches every page of a paginated upstream search.
+
+    The first page gives the total count and page size; the remaining pages
+    (up to ``max_pages``, at most ``SEARCH_MAX_PAGES``) are then fetched concurrently, limited per
+    provider so parallel searches share one budget of connections and
+    quota. Items are deduplicated by ``key`` across pages. ``pages()`` yields
+    each page's new items as it arrives; ``collect()`` merges them into the
+    first page's payload, so callers see the usual upstream shape. A failed
+    later page is logged and skipped; a failed first page raises.
+    """
+
+    def __init__(self, provider: str, fetch_page: Callable[[int], Awaitable[Dict[str, Any]]],
+                 items_path: Sequence[str], total: Callable[[Dict[str, Any]], Optional[int]],
+                 key: Callable[[Dict[str, Any]], Any], max_pages: Optional[int] = None):
+        self.limiter = provider_limiter(provider)
+        self.fetch_page = fetch_page
+        self.items_path = items_path
+        self.total = total
+        self.key = key
+        limit = int(os.getenv("SEARCH_MAX_PAGES", "5"))
+        self.max_pages = min(max_pages or limit, limit)
+
+        self.first_page: Optional[Dict[str, Any]] = None
+        self.total_count = 0
+        self.page_count = 1
+        self.page_failures = 0
+        self._seen = set()
+
+    async def _fetch(self, page: int) -> Tuple[int, Dict[str, Any]]:
+        async with self.limiter.semaphore:
+            self.limiter.in_flight += 1
+            try:
+                payload = await self.fetch_page(page)
+            finally:
+                self.limiter.in_flight -= 1
+        self.limiter.stats["pages_fetched"] += 1
+        return page, payload
+
+    def _new_items(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        items = []
+        for item in _dig(payload, self.items_path) or []:
+            key = self.key(item)
+            if key in self._seen:
+                self.limiter.stats["duplicates_dropped"] += 1
+                continue
+            self._seen.add(key)
+            items.append(item)
+        return items
+
+    async def pages(self) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+        """Yield ``(page number, new items)`` for each page, in the order pages arrive"""
+        self.limiter.stats["searches"] += 1
+        _, self.first_page = await self._fetch(1)
+        page_size = len(_dig(self.first_page, self.items_path) or [])
+        yield 1, self._new_items(self.first_page)
+
+        try:
+            self.total_count = int(self.total(self.first_page) or page_size)
+        except (KeyError, TypeError, ValueError):
+            self.total_count = page_size
+        if not page_size or self.total_count <= page_size:
+            return
+        self.page_count = min(math.ceil(self.total_count / page_size), self.max_pages)
+
+        tasks = [asyncio.ensure_future(self._fetch(page)) for page in range(2, self.page_count + 1)]
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                try:
+                    page, payload = await next_page
+                except Exception as e:
+                    self.page_failures += 1
+                    self.limiter.stats["page_failures"] += 1
+                    logger.warning(f"Skipping a failed search page: {str(e)}")
+                    continue
+                yield page, self._new_items(payload)
+        finally:
+            # Stop outstanding fetches when the consumer goes away
+            for task in tasks:
+                task.cancel()
+
+    async def collect(self) -> Dict[str, Any]:
+        """Fetch every page and return the first page's payload holding all items, in page order"""
+        by_page = {}
+        async for page, items in self.pages():
+            by_page[page] = items
+        merged = [item for page in sorted(by_page) for item in by_page[page]]
+
+        container = _dig(self.first_page, self.items_path[:-1])
+        if isinstance(container, dict):
+            container[self.items_path[-1]] = merged
+        return self.first_page
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "total": self.total_count,
+            "pages": self.page_count,
+            "page_failures": self.page_failures,
+            "unique_items": len(self._seen)
+        }
+
+
+def get_metrics() -> Dict[str, Any]:
+    return {provider: limiter.snapshot() for provider, limiter in _limiters.items()}
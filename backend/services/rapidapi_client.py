@@ -0,0 +1,226 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import importlib.util
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+from services.metrics import LATENCY_BUCKETS_MS, Histogram
+from services.upstream_fixtures import UpstreamFixtures, UpstreamFixtureMissing, fixture_name, get_upstream_fixtures
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "booking-com15.p.rapidapi.com"
+
+# Seconds allowed per endpoint; searches are slow, lookups are quick
+ENDPOINT_TIMEOUTS = {
+    "/api/v1/flights/searchFlights": 20.0,
+    "/api/v1/flights/getFlightDetails": 10.0,
+    "/api/v1/hotels/searchDestination": 5.0,
+    "/api/v1/hotels/searchHotels": 20.0,
+    "/api/v1/attraction/searchAttractions": 10.0,
+    "/api/v1/taxi/searchLocation": 5.0
+}
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRY_AFTER_SECONDS = 10.0
+
+
+class RapidAPIError(Exception):
+    """Raised when a RapidAPI call fails after its retries"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _parse_timeouts(value: str) -> Dict[str, float]:
+    """Parse "path=seconds,path=seconds" overrides, e.g. "/api/v1/hotels/searchHotels=30" """
+    timeouts = {}
+    for item in value.split(","):
+        path, _, seconds = item.partition("=")
+        if path.strip() and seconds.strip():
+            timeouts[path.strip()] = float(seconds)
+    return timeouts
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Seconds from a ``Retry-After`` header, given either as seconds or as an HTTP date"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+
+class RapidAPIClient:
+    """Shared async HTTP client for the Booking.com RapidAPI host.
+
+    One pooled ``httpx.AsyncClient`` keeps connections alive across
+    requests (HTTP/2 with ``RAPIDAPI_HTTP2=true`` when the ``h2`` package is
+    installed). Each endpoint has its own timeout, and GETs that fail with a
+    transport error, 429 or 5xx are retried with full-jitter exponential
+    backoff, honouring ``Retry-After``. In record and replay upstream modes
+    responses are saved to or served from ``fixtures``.
+    """
+
+    def __init__(self, host: Optional[str] = None, max_connections: Optional[int] = None,
+                 max_keepalive: Optional[int] = None, retries: Optional[int] = None,
+                 backoff: Optional[float] = None, http2: Optional[bool] = None,
+                 fixtures: Optional[UpstreamFixtures] = None):
+        self._host = host
+        self._max_connections = max_connections
+        self._max_keepalive = max_keepalive
+        self._retries = retries
+        self._backoff = backoff
+        self._http2 = http2
+        self._fixtures = fixtures
+        self._client: Optional[httpx.AsyncClient] = None
+
+        self._in_flight = 0
+        self._latency: Dict[str, Histogram] = {}
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "status_codes": {}
+        }
+
+    def _configure(self):
+        """Read settings on first use, after the app has loaded its .env file"""
+        self.host = self._host or os.getenv("RAPIDAPI_HOST") or DEFAULT_HOST
+        self.max_connections = self._max_connections or int(os.getenv("RAPIDAPI_MAX_CONNECTIONS", "20"))
+        self.max_keepalive = self._max_keepalive or int(os.getenv("RAPIDAPI_MAX_KEEPALIVE", "10"))
+        self.retries = self._retries if self._retries is not None else int(os.getenv("RAPIDAPI_RETRIES", "2"))
+        self.backoff = self._backoff or float(os.getenv("RAPIDAPI_RETRY_BACKOFF", "0.25"))
+        self.default_timeout = float(os.getenv("RAPIDAPI_TIMEOUT", "10"))
+        self.timeouts = {**ENDPOINT_TIMEOUTS, **_parse_timeouts(os.getenv("RAPIDAPI_TIMEOUTS", ""))}
+
+        http2 = self._http2 if self._http2 is not None else os.getenv("RAPIDAPI_HTTP2", "false").lower() == "true"
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("RAPIDAPI_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+
+    @property
+    def fixtures(self) -> UpstreamFixtures:
+        return self._fixtures or get_upstream_fixtures()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._configure()
+            self._client = httpx.AsyncClient(
+                base_url=f"https://{self.host}",
+                headers={"x-rapidapi-key": os.getenv("RAPIDAPI_KEY") or "", "x-rapidapi-host": self.host},
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=float(os.getenv("RAPIDAPI_KEEPALIVE_EXPIRY", "30"))
+                ),
+                timeout=self.default_timeout,
+                http2=self.http2
+            )
+        return self._client
+
+    async def get(self, path: str, params: Dict[str, Any]) -> Any:
+        """GET an endpoint and return its JSON body"""
+        if self.fixtures.replaying:
+            try:
+                return await self.fixtures.replay(fixture_name(path), params)
+            except UpstreamFixtureMissing as e:
+                raise RapidAPIError(str(e), 404) from e
+
+        client = self.client
+        timeout = self.timeouts.get(path, self.default_timeout)
+        attempt = 0
+        while True:
+            self._stats["requests"] += 1
+            self._in_flight += 1
+            started = time.monotonic()
+            try:
+                response = await client.get(path, params=params, timeout=timeout)
+            except httpx.TransportError as e:
+                if isinstance(e, httpx.TimeoutException):
+                    self._stats["timeouts"] += 1
+                error, retry_after = e, None
+            else:
+                codes = self._stats["status_codes"]
+                codes[response.status_code] = codes.get(response.status_code, 0) + 1
+                if response.status_code < 400:
+                    self._observe(path, started)
+                    body = response.json()
+                    if self.fixtures.recording:
+                        await self.fixtures.record_async(fixture_name(path), params, body)
+                    return body
+                error = RapidAPIError(
+                    f"RapidAPI {path} returned {response.status_code}: {response.text[:200]}", response.status_code
+                )
+                if response.status_code not in RETRY_STATUSES:
+                    self._stats["failures"] += 1
+                    raise error
+                retry_after = retry_after_seconds(response)
+            finally:
+                self._in_flight -= 1
+
+            if attempt >= self.retries:
+                self._stats["failures"] += 1
+                if isinstance(error, RapidAPIError):
+                    raise error
+                raise RapidAPIError(f"RapidAPI {path} failed: {type(error).__name__}: {str(error)}") from error
+
+            delay = random.uniform(0, self.backoff * 2 ** attempt)
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, MAX_RETRY_AFTER_SECONDS))
+            attempt += 1
+            self._stats["retries"] += 1
+            logger.warning(f"Retrying RapidAPI {path} in {delay:.2f}s (attempt {attempt + 1}): {str(error)}")
+            await asyncio.sleep(delay)
+
+    def _observe(self, path: str, started: float):
+        if path not in self._latency:
+            self._latency[path] = Histogram(LATENCY_BUCKETS_MS)
+        self._latency[path].observe((time.monotonic() - started) * 1000)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return request counters, per-endpoint latency and connection pool usage"""
+        pool = {"in_flight": self._in_flight}
+        if self._client is not None:
+            pool.update({
+                "max_connections": self.max_connections,
+                "max_keepalive": self.max_keepalive,
+                "http2": self.http2
+            })
+            # httpx does not expose its pool; read httpcore's connection list when it is there
+            connections = getattr(getattr(self._client, "_transport", None), "_pool", None)
+            connections = getattr(connections, "connections", None)
+            if connections is not None:
+                pool["connections"] = len(connections)
+                pool["idle_connections"] = sum(1 for connection in connections if connection.is_idle())
+        return {
+            **self._stats,
+            "status_codes": dict(self._stats["status_codes"]),
+            "latency_ms": {path: histogram.snapshot() for path, histogram in self._latency.items()},
+            "pool": pool
+        }
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Shared by every RapidAPI service module so they reuse one connection pool
+rapidapi_client = RapidAPIClient()
@@ -0,0 +1,46 @@
+import time
+import asyncio
+from typing import Any, Dict, Optional
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` requests per second with bursts of up to ``burst``.
+
+    ``acquire()`` waits until a token is free. Waiters are served in arrival
+    order, so a steady stream of callers cannot starve an earlier one.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst or max(int(rate), 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._stats = {"acquired": 0, "waited": 0, "wait_seconds": 0.0}
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                wait = (1 - self._tokens) / self.rate
+                self._stats["waited"] += 1
+                self._stats["wait_seconds"] += wait
+                await asyncio.sleep(wait)
+                self._refill()
+            self._tokens -= 1
+            self._stats["acquired"] += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            **self._stats,
+            "wait_seconds": round(self._stats["wait_seconds"], 3)
+        }
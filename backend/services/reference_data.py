@@ -0,0 +1,299 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from models.amadeus_models import AirlineQuery, AirlineRoutesQuery, AirportRoutesQuery, AirportSearchQuery
+from services.airport_locator import AirportLocator
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SEED_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def _normalize(text: Optional[str]) -> str:
+    return " ".join((text or "").lower().replace("-", " ").split())
+
+
+class PrefixIndex:
+    """Sorted (key, code) pairs searched with bisect: O(log n + k) prefix lookups.
+
+    Each name is indexed from the start of every word, so "shivaji" finds
+    "Chhatrapati Shivaji Maharaj International Airport".
+    """
+
+    def __init__(self, entries: Dict[str, List[Optional[str]]]):
+        keys = set()
+        for code, names in entries.items():
+            for name in names:
+                words = _normalize(name).split()
+                for start in range(len(words)):
+                    keys.add((" ".join(words[start:]), code))
+        self._keys = sorted(keys)
+
+    def search(self, prefix: str, limit: int = 10) -> List[str]:
+        prefix = _normalize(prefix)
+        if not prefix:
+            return []
+        codes: List[str] = []
+        position = bisect_left(self._keys, (prefix, ""))
+        while position < len(self._keys) and len(codes) < limit:
+            key, code = self._keys[position]
+            if not key.startswith(prefix):
+                break
+            if code not in codes:
+                codes.append(code)
+            position += 1
+        return codes
+
+
+class ReferenceDataStore:
+    """Airlines, airports and routes held in memory and persisted to disk.
+
+    Starts from the on-disk snapshot (``REFERENCE_DATA_PATH``) or, the first
+    time, from the seed files in ``data/``. Airlines are bulk-refreshed from
+    Amadeus every ``ttl_seconds``. Airports of a city and routes from an
+    airport or of an airline are fetched the first time they are asked for
+    and kept for the same TTL. Lookups by IATA code are dict hits and name
+    lookups use a prefix index, so nothing here waits on the network once
+    the data is loaded.
+    """
+
+    def __init__(self, client=None, snapshot_path: Optional[str] = None, ttl_seconds: Optional[float] = None):
+        self.client = client
+        self.snapshot_path = Path(snapshot_path or os.getenv("REFERENCE_DATA_PATH") or SEED_DIR / "reference_data.json")
+        self.ttl_seconds = ttl_seconds or float(os.getenv("REFERENCE_DATA_TTL", str(7 * 86400)))
+
+        self.refreshed_at = 0.0
+        self.airlines: Dict[str, Dict[str, Any]] = {}
+        self.airports: Dict[str, Dict[str, Any]] = {}
+        self.airport_routes: Dict[str, Dict[str, Any]] = {}
+        self.airline_routes: Dict[str, Dict[str, Any]] = {}
+        self.cities: Dict[str, Dict[str, Any]] = {}
+
+        self._airlines_by_icao: Dict[str, str] = {}
+        self._airports_by_city: Dict[str, List[str]] = {}
+        self._airline_names = PrefixIndex({})
+        self._airport_names = PrefixIndex({})
+        self.locator = AirportLocator([])
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._stats = {
+            "lookups": 0,
+            "misses": 0,
+            "fetched": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "nearest_lookups": 0,
+            "nearest_lookup_us": 0.0
+        }
+
+    # ---------- loading and persistence ----------
+
+    def load(self):
+        """Load the snapshot, falling back to the seed files"""
+        snapshot = None
+        if self.snapshot_path.is_file():
+            try:
+                snapshot = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable reference data snapshot: {str(e)}")
+        if snapshot:
+            self.refreshed_at = snapshot.get("refreshed_at", 0.0)
+            airlines, airports = snapshot.get("airlines", []), snapshot.get("airports", [])
+            self.airport_routes = snapshot.get("airport_routes", {})
+            self.airline_routes = snapshot.get("airline_routes", {})
+            self.cities = snapshot.get("cities", {})
+        else:
+            airlines = json.loads((SEED_DIR / "airlines.json").read_text(encoding="utf-8"))
+            airports = json.loads((SEED_DIR / "airports.json").read_text(encoding="utf-8"))
+        self.airlines = {airline["iata"]: airline for airline in airlines}
+        self.airports = {airport["iata"]: airport for airport in airports}
+        self._index()
+        logger.info(f"Reference data loaded: {len(self.airlines)} airlines, {len(self.airports)} airports")
+
+    def _index(self):
+        self._airlines_by_icao = {airline["icao"]: code for code, airline in self.airlines.items() if airline.get("icao")}
+        self._airports_by_city = {}
+        for code, airport in self.airports.items():
+            for key in {airport.get("city_code"), _normalize(airport.get("city"))}:
+                if key:
+                    self._airports_by_city.setdefault(key, []).append(code)
+        self._airline_names = PrefixIndex({code: [airline.get("name")] for code, airline in self.airlines.items()})
+        self._airport_names = PrefixIndex({
+            code: [airport.get("name"), airport.get("city")] for code, airport in self.airports.items()
+        })
+        self.locator = AirportLocator(self.airports.values())
+
+    def save(self):
+        snapshot = {
+            "refreshed_at": self.refreshed_at,
+            "airlines": list(self.airlines.values()),
+            "airports": list(self.airports.values()),
+            "airport_routes": self.airport_routes,
+            "airline_routes": self.airline_routes,
+            "cities": self.cities
+        }
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.snapshot_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(snapshot, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Failed to persist reference data: {str(e)}")
+
+    async def _save(self):
+        await asyncio.to_thread(self.save)
+
+    # ---------- scheduled refresh ----------
+
+    def start(self):
+        """Start the background refresh loop; call from a running event loop"""
+        if self.client is not None and self._refresh_task is None:
+            self._refresh_task = asyncio.ensure_future(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        while True:
+            wait = self.refreshed_at + self.ttl_seconds - time.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            try:
+                await self.refresh()
+            except Exception as e:
+                self._stats["refresh_failures"] += 1
+                logger.warning(f"Reference data refresh failed: {str(e)}")
+                await asyncio.sleep(min(3600, self.ttl_seconds))
+
+    async def refresh(self):
+        """Bulk-reload airlines; names already known are kept"""
+        body = await self.client.airlines(AirlineQuery())
+        for record in body.get("data", []):
+            code = record.get("iataCode")
+            if not code:
+                continue
+            known = self.airlines.get(code, {})
+            self.airlines[code] = {
+                "iata": code,
+                "icao": record.get("icaoCode") or known.get("icao"),
+                "name": known.get("name") or (record.get("commonName") or record.get("businessName") or code).title()
+            }
+        self.refreshed_at = time.time()
+        self._stats["refreshes"] += 1
+        self._index()
+        await self._save()
+
+    async def close(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    # ---------- lookups ----------
+
+    def airline(self, code: str) -> Optional[Dict[str, Any]]:
+        """Airline by IATA or ICAO code"""
+        self._stats["lookups"] += 1
+        code = code.strip().upper()
+        return self.airlines.get(code) or self.airlines.get(self._airlines_by_icao.get(code, ""))
+
+    def airport(self, code: str) -> Optional[Dict[str, Any]]:
+        self._stats["lookups"] += 1
+        return self.airports.get(code.strip().upper())
+
+    def search_airlines(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        self._stats["lookups"] += 1
+        return [self.airlines[code] for code in self._airline_names.search(prefix, limit)]
+
+    def search_airports(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Airports whose name or city starts with ``prefix`` (at any word)"""
+        self._stats["lookups"] += 1
+        return [self.airports[code] for code in self._airport_names.search(prefix, limit)]
+
+    def nearest_airports(self, latitude: float, longitude: float, k: int = 1,
+                         max_km: Optional[float] = None) -> List[Dict[str, Any]]:
+        """The ``k`` airports nearest a point, each with its ``distance_km``"""
+        started = time.perf_counter()
+        nearest = self.locator.nearest(latitude, longitude, k, max_km)
+        self._stats["nearest_lookups"] += 1
+        self._stats["nearest_lookup_us"] += (time.perf_counter() - started) * 1e6
+        return [{**airport, "distance_km": round(distance, 1)} for airport, distance in nearest]
+
+    def _fresh(self, entry: Optional[Dict[str, Any]]) -> bool:
+        return entry is not None and time.time() - entry["fetched_at"] < self.ttl_seconds
+
+    def _city_airports(self, city: str) -> List[Dict[str, Any]]:
+        codes = self._airports_by_city.get(city.strip().upper()) or self._airports_by_city.get(_normalize(city)) or []
+        return [self.airports[code] for code in codes]
+
+    async def airports_in_city(self, city: str) -> List[Dict[str, Any]]:
+        """Airports serving a city, by city code or name; unknown cities are looked up once per TTL"""
+        self._stats["lookups"] += 1
+        airports = self._city_airports(city)
+        key = _normalize(city)
+        if airports or self.client is None or self._fresh(self.cities.get(key)):
+            return airports
+
+        self._stats["misses"] += 1
+        body = await self.client.airports(AirportSearchQuery(keyword=city.strip()))
+        for record in body.get("data", []):
+            address, geo = record.get("address") or {}, record.get("geoCode") or {}
+            if record.get("iataCode") and record["iataCode"] not in self.airports:
+                self.airports[record["iataCode"]] = {
+                    "iata": record["iataCode"],
+                    "name": (record.get("name") or "").title(),
+                    "city": (address.get("cityName") or "").title(),
+                    "city_code": address.get("cityCode"),
+                    "country": address.get("countryCode"),
+                    "latitude": geo.get("latitude"),
+                    "longitude": geo.get("longitude")
+                }
+        # Remembered even when nothing was found, so the API is not asked again until the TTL
+        self.cities[key] = {"fetched_at": time.time()}
+        self._stats["fetched"] += 1
+        self._index()
+        await self._save()
+        return self._city_airports(city)
+
+    async def routes_from_airport(self, code: str) -> Optional[List[str]]:
+        """IATA codes served non-stop from an airport; None when unknown and there is no client"""
+        return await self._routes(self.airport_routes, code.strip().upper(),
+                                  lambda key: self.client.airport_routes(AirportRoutesQuery(departure_airport_code=key)))
+
+    async def routes_of_airline(self, code: str) -> Optional[List[str]]:
+        """IATA codes an airline flies to"""
+        return await self._routes(self.airline_routes, code.strip().upper(),
+                                  lambda key: self.client.airline_routes(AirlineRoutesQuery(airline_code=key)))
+
+    async def _routes(self, table: Dict[str, Dict[str, Any]], key: str, fetch) -> Optional[List[str]]:
+        self._stats["lookups"] += 1
+        entry = table.get(key)
+        if self._fresh(entry) or (entry is not None and self.client is None):
+            return entry["destinations"]
+        if self.client is None:
+            return None
+
+        self._stats["misses"] += 1
+        body = await fetch(key)
+        destinations = sorted({record["iataCode"] for record in body.get("data", []) if record.get("iataCode")})
+        table[key] = {"fetched_at": time.time(), "destinations": destinations}
+        self._stats["fetched"] += 1
+        await self._save()
+        return destinations
+
+    def get_metrics(self) -> Dict[str, Any]:
+        lookups = self._stats["nearest_lookups"]
+        return {
+            **self._stats,
+            "nearest_lookup_us": round(self._stats["nearest_lookup_us"] / lookups, 1) if lookups else None,
+            "airlines": len(self.airlines),
+            "airports": len(self.airports),
+            "airport_routes": len(self.airport_routes),
+            "airline_routes": len(self.airline_routes),
+            "refreshed_seconds_ago": round(time.time() - self.refreshed_at) if self.refreshed_at else None,
+            "ttl_seconds": self.ttl_seconds
+        }
@@ -0,0 +1,116 @@
+import json
+import logging
+import typing
+from typing import Any, Dict, List, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+from models.trip_models import ItineraryResponse, ActivityItem, RestaurantItem, AccommodationItem, FlightItem
+from services.destination_knowledge import KNOWLEDGE_SECTIONS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Option records are attached by hydrate_itinerary, so Gemini only names them
+REFERENCE_FIELDS = {
+    ActivityItem: {"name": str, "time_slot": str},
+    RestaurantItem: {"name": str, "meal": str},
+    AccommodationItem: {"name": str},
+    FlightItem: {"airline": str}
+}
+
+# Costs are recomputed from the hydrated records rather than trusted from the model, and
+# destination tips come from the shared knowledge store
+COMPUTED_FIELDS = {"total_daily_cost", "total_cost", "budget_breakdown"} | set(KNOWLEDGE_SECTIONS)
+
+_SCALAR_TYPES = {str: "STRING", int: "INTEGER", float: "NUMBER", bool: "BOOLEAN"}
+
+
+class SchemaMismatchError(ValueError):
+    """Raised when a structured response does not match ItineraryResponse"""
+
+    def __init__(self, message: str, fields: List[str]):
+        super().__init__(message)
+        self.fields = fields
+
+
+def _annotation_schema(annotation: Any) -> Optional[Dict[str, Any]]:
+    """Schema for one field type, or None for free-form objects Gemini cannot be constrained to"""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Union:
+        # Optional[X]: Gemini schemas express this with "nullable"
+        inner = [arg for arg in args if arg is not type(None)]
+        schema = _annotation_schema(inner[0])
+        return {**schema, "nullable": True} if schema else None
+    if origin in (list, List):
+        items = _annotation_schema(args[0])
+        return {"type": "ARRAY", "items": items} if items else None
+    if origin in (dict, Dict) or annotation is Any:
+        return None
+    if annotation in REFERENCE_FIELDS:
+        fields = REFERENCE_FIELDS[annotation]
+        return {
+            "type": "OBJECT",
+            "properties": {name: _annotation_schema(field_type) for name, field_type in fields.items()},
+            "required": list(fields)
+        }
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return model_schema(annotation)
+    return {"type": _SCALAR_TYPES.get(annotation, "STRING")}
+
+
+def model_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Translate a Pydantic model into the OpenAPI subset Gemini accepts as ``response_schema``
+
+    Computed fields and free-form objects (a day's ``transportation``) are
+    left out; the caller fills them in before validation.
+    """
+    properties = {}
+    for name, field in model.model_fields.items():
+        schema = None if name in COMPUTED_FIELDS else _annotation_schema(field.annotation)
+        if schema:
+            properties[name] = schema
+    required = [
+        name for name, field in model.model_fields.items()
+        if name in properties and field.is_required()
+    ]
+    return {"type": "OBJECT", "properties": properties, "required": required}
+
+
+ITINERARY_RESPONSE_SCHEMA = model_schema(ItineraryResponse)
+
+ITINERARY_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": ITINERARY_RESPONSE_SCHEMA
+}
+
+
+def load_structured(text: str) -> Dict[str, Any]:
+    """Decode a JSON-typed response body; no fence stripping or brace hunting is needed"""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise SchemaMismatchError(f"Structured response is not valid JSON: {str(e)}", ["<json>"]) from e
+    if not isinstance(data, dict):
+        raise SchemaMismatchError("Structured response is not a JSON object", ["<root>"])
+    return data
+
+
+def validate_itinerary(itinerary: Dict[str, Any]) -> ItineraryResponse:
+    """Validate a hydrated, costed itinerary against ItineraryResponse in one pass.
+
+    Raises SchemaMismatchError listing the mismatched fields, with list
+    indexes collapsed (``days.*.activities.*.cost_per_person``) so they can
+    be counted across responses.
+    """
+    try:
+        return ItineraryResponse.model_validate(itinerary)
+    except ValidationError as e:
+        fields = sorted({
+            ".".join("*" if isinstance(part, int) else str(part) for part in error["loc"])
+            for error in e.errors()
+        })
+        raise SchemaMismatchError(f"Itinerary does not match the response schema: {', '.join(fields)}", fields) from e
+
@@ -1,20 +1,6 @@
-import requests
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-host = os.getenv("RAPIDAPI_HOST")
-
-def get_taxi_locations(location: str):
-  url = f"https://{host}/api/v1/taxi/searchLocation"
+from services.rapidapi_client import rapidapi_client
 
+async def get_taxi_locations(location: str):
   querystring = {"query":location}
 
-  headers = {
-    "x-rapidapi-key": os.getenv("RAPIDAPI_KEY"),
-    "x-rapidapi-host": host
-  }
-
-  response = requests.get(url, headers=headers, params=querystring)
-  return response.json()
\ No newline at end of file
+  return await rapidapi_client.get("/api/v1/taxi/searchLocation", querystring)
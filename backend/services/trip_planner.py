@@ -0,0 +1,262 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.trip_models import Location, TripRequest
+from services.airport_locator import airport_iata
+from services.context_builder import rank_candidates
+from services.mock_data_service import MockDataService
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Typical per-person spend for a meal at each restaurant price range (INR)
+MEAL_COST_BY_PRICE_RANGE = {1: 300, 2: 600, 3: 1200, 4: 2000}
+
+ACTIVITIES_PER_DAY = 2
+MEALS_PER_DAY = 2
+MAX_ACTIVITY_HOURS_PER_DAY = 9
+
+# Share of the budget flights and the stay may take before cheaper options are preferred
+TRAVEL_AND_STAY_BUDGET_SHARE = 0.7
+
+GENERAL_CULTURAL_INSIGHTS = [
+    "Respect local customs and traditions",
+    "Dress modestly when visiting religious sites",
+    "Try local cuisine and street food"
+]
+GENERAL_SAFETY_TIPS = [
+    "Keep emergency contacts handy",
+    "Stay hydrated and use sunscreen",
+    "Be cautious with street food if you have a sensitive stomach"
+]
+GENERAL_LOCAL_RECOMMENDATIONS = [
+    "Visit popular sights early in the morning or late in the evening",
+    "Bargain at local markets",
+    "Ask locals for their favourite neighbourhood restaurants"
+]
+
+
+def estimate_meal_cost(restaurant: Dict[str, Any]) -> int:
+    """Per-person cost of a meal, from an explicit cost or the restaurant's price range"""
+    if restaurant.get("cost_per_person") is not None:
+        return int(restaurant["cost_per_person"])
+    price_level = len(restaurant.get("price_range") or "") or 2
+    return MEAL_COST_BY_PRICE_RANGE.get(min(price_level, 4), MEAL_COST_BY_PRICE_RANGE[2])
+
+
+def allocate_days(activities: List[Dict[str, Any]], restaurants: List[Dict[str, Any]],
+                  duration_days: int, preferences: Dict[str, Any], travelers_count: int = 1,
+                  daily_allowance: Optional[float] = None) -> List[Dict[str, List[Dict[str, Any]]]]:
+    """Spread the best-ranked activities and restaurants across the trip.
+
+    Activities are never repeated and a day mixes categories where it can,
+    within MAX_ACTIVITY_HOURS_PER_DAY. Restaurants are only revisited once
+    every candidate has been used, and never twice on the same day. With a
+    ``daily_allowance`` (group spend per day, unspent money rolls over)
+    nothing is booked past it: cheaper restaurants win, and meals and
+    activities that do not fit are left out.
+    """
+    ranked_activities = rank_candidates("activities", activities or [], preferences)
+    ranked_restaurants = rank_candidates("restaurants", restaurants or [], preferences)
+
+    used_activities = set()
+    restaurant_visits = {id(item): 0 for item in ranked_restaurants}
+    carry = 0.0
+    plan = []
+
+    for _ in range(duration_days):
+        allowance = None if daily_allowance is None else daily_allowance + carry
+
+        meals = []
+        for _ in range(min(MEALS_PER_DAY, len(ranked_restaurants))):
+            options = sorted(
+                (item for item in ranked_restaurants if item not in meals),
+                key=lambda item: restaurant_visits[id(item)]
+            )
+            least_visited = [item for item in options if restaurant_visits[id(item)] == restaurant_visits[id(options[0])]]
+            spent = sum(estimate_meal_cost(item) for item in meals) * travelers_count
+
+            def fits(item):
+                return allowance is None or spent + estimate_meal_cost(item) * travelers_count <= allowance
+
+            # Least visited first, then any restaurant that fits; none fits means no more meals today
+            affordable = [item for item in least_visited if fits(item)] or [item for item in options if fits(item)]
+            if not affordable:
+                break
+            choice = affordable[0]
+            restaurant_visits[id(choice)] += 1
+            meals.append(choice)
+
+        spent = sum(estimate_meal_cost(item) for item in meals) * travelers_count
+        day_activities = []
+        hours = 0.0
+        for allow_same_category in (False, True):
+            for item in ranked_activities:
+                if len(day_activities) >= ACTIVITIES_PER_DAY:
+                    break
+                if id(item) in used_activities:
+                    continue
+                cost = (item.get("cost_per_person") or 0) * travelers_count
+                duration = item.get("duration_hours") or 0
+                # Free activities always fit; paid ones need room in the allowance
+                if cost and allowance is not None and spent + cost > allowance:
+                    continue
+                if hours + duration > MAX_ACTIVITY_HOURS_PER_DAY:
+                    continue
+                if not allow_same_category and any(item.get("category") == other.get("category") for other in day_activities):
+                    continue
+                used_activities.add(id(item))
+                day_activities.append(item)
+                spent += cost
+                hours += duration
+
+        if allowance is not None:
+            carry = max(allowance - spent, 0.0)
+        plan.append({"activities": day_activities, "meals": meals})
+
+    return plan
+
+
+def compute_budget(itinerary: Dict[str, Any], travelers_count: int, nights: int) -> Dict[str, Any]:
+    """Recompute daily totals, total_cost and budget_breakdown from the itinerary's own items"""
+    activities_cost = 0
+    meals_cost = 0
+    for day in itinerary.get("days", []):
+        day_activities = sum(
+            int(item.get("cost_per_person") or 0) for item in day.get("activities", []) if isinstance(item, dict)
+        ) * travelers_count
+        day_meals = sum(
+            estimate_meal_cost(item) for item in day.get("meals", []) if isinstance(item, dict)
+        ) * travelers_count
+        day["total_daily_cost"] = day_activities + day_meals
+        activities_cost += day_activities
+        meals_cost += day_meals
+
+    accommodation = next((item for item in itinerary.get("accommodation", []) if isinstance(item, dict)), {})
+    flight = next((item for item in itinerary.get("transportation", []) if isinstance(item, dict)), {})
+    accommodation_cost = int(accommodation.get("cost_per_night") or 0) * nights
+    transportation_cost = int(flight.get("price") or 0) * travelers_count
+
+    itinerary["budget_breakdown"] = {
+        "accommodation": accommodation_cost,
+        "transportation": transportation_cost,
+        "activities": activities_cost,
+        "meals": meals_cost
+    }
+    itinerary["total_cost"] = accommodation_cost + transportation_cost + activities_cost + meals_cost
+    return itinerary
+
+
+def plan_itinerary(trip_request: TripRequest, activities: List[Dict[str, Any]],
+                   accommodations: List[Dict[str, Any]], flights: List[Dict[str, Any]],
+                   restaurants: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build a complete itinerary from candidate lists without calling an LLM"""
+    preferences = trip_request.preferences.dict()
+    travelers_count = trip_request.travelers_count
+    nights = max((trip_request.end_date - trip_request.start_date).days, 0)
+    duration_days = max(nights, 1)
+    max_budget = float(preferences["max_budget"])
+
+    # Best-fitting flight and stay, trading down to cheaper ones if they would eat the budget
+    travel_budget = max_budget * TRAVEL_AND_STAY_BUDGET_SHARE
+    ranked_flights = rank_candidates("flights", flights or [], preferences)
+    flight = next(
+        (item for item in ranked_flights if (item.get("price") or 0) * travelers_count <= travel_budget),
+        min(ranked_flights, key=lambda item: item.get("price") or 0, default=None)
+    )
+    flight_cost = (flight.get("price") or 0) * travelers_count if flight else 0
+
+    ranked_stays = rank_candidates("accommodations", accommodations or [], preferences)
+    stay = next(
+        (item for item in ranked_stays if flight_cost + (item.get("cost_per_night") or 0) * nights <= travel_budget),
+        min(ranked_stays, key=lambda item: item.get("cost_per_night") or 0, default=None)
+    )
+    stay_cost = (stay.get("cost_per_night") or 0) * nights if stay else 0
+
+    daily_allowance = max(max_budget - flight_cost - stay_cost, 0.0) / duration_days
+    allocation = allocate_days(activities, restaurants, duration_days, preferences, travelers_count, daily_allowance)
+
+    days = [
+        {
+            "date": (trip_request.start_date + timedelta(days=i)).isoformat(),
+            "activities": [dict(item) for item in day["activities"]],
+            "meals": [dict(item) for item in day["meals"]],
+            "transportation": []
+        }
+        for i, day in enumerate(allocation)
+    ]
+
+    themes = ", ".join(getattr(theme, "value", theme) for theme in preferences.get("themes", []))
+    itinerary = {
+        "summary": f"Personalized {duration_days}-day trip to {trip_request.destination.name}"
+                   + (f" focused on {themes}" if themes else ""),
+        "days": days,
+        "accommodation": [dict(stay)] if stay else [],
+        "transportation": [dict(flight)] if flight else [],
+        "cultural_insights": list(GENERAL_CULTURAL_INSIGHTS),
+        "safety_tips": list(GENERAL_SAFETY_TIPS),
+        "local_recommendations": list(GENERAL_LOCAL_RECOMMENDATIONS)
+    }
+    compute_budget(itinerary, travelers_count, nights)
+    itinerary["within_budget"] = itinerary["total_cost"] <= max_budget
+    return itinerary
+
+
+class TripPlanner:
+    """Instant, deterministic itinerary planner used for mode=fast and as the Gemini fallback
+
+    With a ``knowledge`` store, destination tips already generated for the
+    trip's month replace the general ones; the planner never generates them.
+    With ``airports`` (a ReferenceDataStore), flights are looked up between
+    the cities of the origin's and destination's ``airport_id`` rather than
+    the cities the traveller typed.
+    """
+
+    def __init__(self, mock_data_service: MockDataService = None, knowledge=None, airports=None):
+        self.mock_data_service = mock_data_service or MockDataService()
+        self.knowledge = knowledge
+        self.airports = airports
+
+    def get_candidates(self, trip_request: TripRequest) -> Tuple[List[Dict[str, Any]], ...]:
+        """Get activities, accommodations, flights and restaurants matching the trip preferences"""
+        preferences = {
+            **trip_request.preferences.dict(),
+            "destination": trip_request.destination.city,
+            "from_city": self._flight_city(trip_request.origin),
+            "to_city": self._flight_city(trip_request.destination)
+        }
+        return (
+            self.mock_data_service.get_activities(preferences),
+            self.mock_data_service.get_accommodations(preferences),
+            self.mock_data_service.get_flights(preferences),
+            self.mock_data_service.get_restaurants(preferences)
+        )
+
+    def _flight_city(self, location: Location) -> str:
+        """The city of the location's airport when it has a known ``airport_id``, else its own city"""
+        code = airport_iata(location.airport_id)
+        airport = self.airports.airport(code) if code and self.airports is not None else None
+        return airport["city"] if airport and airport.get("city") else location.city
+
+    def get_itinerary_candidates(self, itinerary: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], ...]:
+        """Candidates for a stored itinerary, looked up from its saved trip request"""
+        try:
+            trip_request = TripRequest(**itinerary["trip_request"])
+        except (KeyError, TypeError, ValueError):
+            return [], [], [], []
+        return self.get_candidates(trip_request)
+
+    def plan(self, trip_request: TripRequest, candidates: Tuple[List[Dict[str, Any]], ...] = None) -> Dict[str, Any]:
+        """Plan a full itinerary from the candidates matching the trip preferences
+        
+        ``candidates`` is a get_candidates() tuple already fetched for these preferences.
+        """
+        itinerary = plan_itinerary(trip_request, *(candidates or self.get_candidates(trip_request)))
+        if self.knowledge is not None:
+            itinerary.update(self.knowledge.peek(trip_request.destination, trip_request.start_date.month) or {})
+        itinerary["trip_request"] = trip_request.dict()
+        itinerary["generated_by"] = "local_planner"
+        itinerary["created_at"] = datetime.now().isoformat()
+        return itinerary
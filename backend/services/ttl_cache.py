@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import copy
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Keys that are already safe, fixed-length file names (such as sha256 hex digests)
+HEX_KEY = re.compile(r"[0-9a-f]{64}")
+
+
+class TTLCache:
+    """Two-tier TTL cache for JSON-serializable values.
+
+    The memory tier is a bounded LRU; the optional disk tier keeps one JSON
+    file per key under ``disk_dir`` so entries survive restarts and can be
+    shared by workers on the same host. Keys that are not hex digests are
+    hashed into file names.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached value, or None on a miss"""
+        now = time.time()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            if now - stored_at < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return copy.deepcopy(value)
+            del self._entries[key]
+            self._stats["expirations"] += 1
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            stored_at, value = entry
+            if now - stored_at < self.ttl_seconds:
+                self._remember(key, stored_at, value)
+                self._stats["disk_hits"] += 1
+                return copy.deepcopy(value)
+            self._delete_disk(key)
+            self._stats["expirations"] += 1
+
+        self._stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store a value in every configured tier"""
+        stored_at = time.time()
+        value = copy.deepcopy(value)
+        self._remember(key, stored_at, value)
+        self._write_disk(key, stored_at, value)
+
+    def purge_expired(self) -> int:
+        """Drop expired entries from the memory tier"""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [key for key, (stored_at, _) in self._entries.items() if stored_at <= cutoff]
+        for key in expired:
+            del self._entries[key]
+        self._stats["expirations"] += len(expired)
+        return len(expired)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier sizes"""
+        hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "disk_enabled": bool(self.disk_dir)
+        }
+
+    def _remember(self, key: str, stored_at: float, value: Dict[str, Any]):
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _disk_path(self, key: str) -> str:
+        name = key if HEX_KEY.fullmatch(key) else hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, name[:2], f"{name}.json")
+
+    def _read_disk(self, key: str) -> Optional[tuple]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            return payload["stored_at"], payload["value"]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {str(e)}")
+            self._delete_disk(key)
+            return None
+
+    def _write_disk(self, key: str, stored_at: float, value: Dict[str, Any]):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": stored_at, "value": value}, f, default=str)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to persist cache entry {key}: {str(e)}")
+
+    def _delete_disk(self, key: str):
+        try:
+            os.remove(self._disk_path(key))
+        except OSError:
+            pass
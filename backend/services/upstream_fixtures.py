@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from services.metrics import LatencyDistribution
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LIVE = "live"
+RECORD = "record"
+REPLAY = "replay"
+
+DEFAULT_FIXTURES_DIR = Path(__file__).resolve().parent.parent / "mocks"
+
+# Fixture names for the upstream endpoints; each name's default response is mocks/<name>.json
+FIXTURE_NAMES = {
+    "/api/v1/flights/searchFlights": "flights/get_flights",
+    "/api/v1/flights/getFlightDetails": "flights/get_flight_info",
+    "/api/v1/hotels/searchDestination": "destination/get_destination",
+    "/api/v1/hotels/searchHotels": "destination/get_hotels_for_city",
+    "/api/v1/attraction/searchAttractions": "attractions/get_tourist_attractions",
+    "/api/v1/taxi/searchLocation": "taxi/get_taxi_locations"
+}
+
+
+class UpstreamFixtureMissing(LookupError):
+    """Raised in strict replay when no response was recorded for a request"""
+
+
+def fixture_name(path: str, source: str = "rapidapi") -> str:
+    """Fixture name for an upstream path, e.g. ``amadeus/v2_shopping_flight-offers``"""
+    if path in FIXTURE_NAMES:
+        return FIXTURE_NAMES[path]
+    return f"{source}/" + path.strip("/").replace("/", "_")
+
+
+def normalize_params(params: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Stringify, strip and sort request params, dropping empty ones, so equal requests share a key"""
+    normalized = {}
+    for name, value in (params or {}).items():
+        if value is None:
+            continue
+        value = str(value).strip()
+        if value:
+            normalized[str(name)] = value
+    return dict(sorted(normalized.items()))
+
+
+def params_key(params: Optional[Dict[str, Any]]) -> str:
+    encoded = json.dumps(normalize_params(params), separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+class UpstreamFixtures:
+    """Switches the RapidAPI and Amadeus clients between live, record and replay.
+
+    ``live`` calls the network. ``record`` calls it too and saves each
+    successful response as ``<dir>/<name>/<params key>.json``. ``replay``
+    never touches the network: it serves the recorded response for the same
+    normalized params, falling back to the endpoint's default fixture
+    (``<dir>/<name>.json``) unless ``strict``, after a simulated delay drawn
+    from ``latency``. Fixture files are read on first use and kept in memory
+    as raw bytes, so each replay decodes a fresh copy callers may mutate.
+    """
+
+    def __init__(self, mode: Optional[str] = None, fixtures_dir: Optional[str] = None,
+                 latency: Optional[str] = None, strict: Optional[bool] = None, seed: Optional[int] = None):
+        self.mode = (mode or os.getenv("UPSTREAM_MODE", LIVE)).lower()
+        if self.mode not in (LIVE, RECORD, REPLAY):
+            raise ValueError(f"Invalid UPSTREAM_MODE: {self.mode}")
+        self.fixtures_dir = Path(fixtures_dir or os.getenv("UPSTREAM_FIXTURES_DIR") or DEFAULT_FIXTURES_DIR)
+        self.latency = LatencyDistribution(latency or os.getenv("UPSTREAM_REPLAY_LATENCY", "fixed:0"))
+        self.strict = strict if strict is not None else os.getenv("UPSTREAM_REPLAY_STRICT", "false").lower() == "true"
+        self.rng = random.Random(seed)
+
+        self._fixtures: Dict[Path, Optional[bytes]] = {}
+        # record() runs in a worker thread (record_async) while replays read on the event loop
+        self._lock = threading.Lock()
+        self._stats = {
+            "replayed": 0,
+            "default_fixture_served": 0,
+            "missing": 0,
+            "recorded": 0,
+            "fixtures_loaded": 0,
+            "bytes_loaded": 0
+        }
+        if self.mode != LIVE:
+            logger.info(f"Upstream mode {self.mode} using fixtures in {self.fixtures_dir}")
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == RECORD
+
+    def _read(self, path: Path) -> Optional[bytes]:
+        with self._lock:
+            if path not in self._fixtures:
+                data = path.read_bytes() if path.is_file() else None
+                self._fixtures[path] = data
+                if data is not None:
+                    self._stats["fixtures_loaded"] += 1
+                    self._stats["bytes_loaded"] += len(data)
+            return self._fixtures[path]
+
+    def lookup(self, name: str, params: Optional[Dict[str, Any]]) -> Tuple[Any, float]:
+        """Return the replayed body for a request and the delay to simulate before serving it"""
+        data = self._read(self.fixtures_dir / name / f"{params_key(params)}.json")
+        if data is not None:
+            body = json.loads(data)["body"]
+        else:
+            data = None if self.strict else self._read(self.fixtures_dir / f"{name}.json")
+            if data is None:
+                self._stats["missing"] += 1
+                raise UpstreamFixtureMissing(f"No recorded response for {name} with {normalize_params(params)}")
+            self._stats["default_fixture_served"] += 1
+            body = json.loads(data)
+        self._stats["replayed"] += 1
+        return body, self.latency.sample(self.rng)
+
+    async def replay(self, name: str, params: Optional[Dict[str, Any]]) -> Any:
+        body, delay = self.lookup(name, params)
+        if delay:
+            await asyncio.sleep(delay)
+        return body
+
+    def record(self, name: str, params: Optional[Dict[str, Any]], body: Any):
+        """Save a live response under its params key; the first one for an endpoint also becomes its default"""
+        entry = {"name": name, "params": normalize_params(params), "recorded_at": time.time(), "body": body}
+        path = self.fixtures_dir / name / f"{params_key(params)}.json"
+        try:
+            self._write(path, json.dumps(entry, ensure_ascii=False))
+            default = self.fixtures_dir / f"{name}.json"
+            if not default.exists():
+                self._write(default, json.dumps(body, ensure_ascii=False))
+        except OSError as e:
+            logger.warning(f"Failed to record {name}: {str(e)}")
+            return
+        with self._lock:
+            self._fixtures.pop(path, None)
+            self._fixtures.pop(self.fixtures_dir / f"{name}.json", None)
+            self._stats["recorded"] += 1
+
+    def _write(self, path: Path, text: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+
+    async def record_async(self, name: str, params: Optional[Dict[str, Any]], body: Any):
+        await asyncio.to_thread(self.record, name, params, body)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "fixtures_dir": str(self.fixtures_dir),
+            "strict": self.strict,
+            "latency": self.latency.spec,
+            **self._stats
+        }
+
+
+_shared: Optional[UpstreamFixtures] = None
+
+
+def get_upstream_fixtures() -> UpstreamFixtures:
+    """The fixtures shared by the RapidAPI client and the Amadeus routes, created on first use
+    so the settings are read after the app has loaded its .env file"""
+    global _shared
+    if _shared is None:
+        _shared = UpstreamFixtures()
+    return _shared
@@ -0,0 +1,67 @@
+import random
+from datetime import date
+
+from models.trip_models import TripRequest
+from services.airport_locator import AirportLocator, airport_iata, booking_airport_id, haversine_km
+from services.reference_data import ReferenceDataStore
+from services.trip_planner import TripPlanner
+
+
+def brute_force(airports, latitude, longitude, k, max_km):
+    distances = sorted(
+        (haversine_km(latitude, longitude, airport["latitude"], airport["longitude"]), airport["iata"])
+        for airport in airports
+    )
+    return [(code, distance) for distance, code in distances if distance <= max_km][:k]
+
+
+def test_nearest_matches_brute_force():
+    rng = random.Random(3)
+    airports = [
+        {"iata": f"A{i:03d}", "latitude": rng.uniform(-89, 89), "longitude": rng.uniform(-180, 180)}
+        for i in range(500)
+    ]
+    locator = AirportLocator(airports, max_km=3000)
+    for _ in range(200):
+        latitude, longitude = rng.uniform(-90, 90), rng.uniform(-180, 180)
+        k = rng.choice((1, 3, 8))
+        found = [(airport["iata"], distance) for airport, distance in locator.nearest(latitude, longitude, k)]
+        expected = brute_force(airports, latitude, longitude, k, 3000)
+        assert [code for code, _ in found] == [code for code, _ in expected]
+        assert all(abs(a - b) < 1e-6 for (_, a), (_, b) in zip(found, expected))
+
+
+def test_nearest_across_the_antimeridian_and_out_of_range():
+    airports = [
+        {"iata": "EST", "latitude": 0.0, "longitude": 179.9},
+        {"iata": "WST", "latitude": 0.0, "longitude": -170.0}
+    ]
+    locator = AirportLocator(airports, max_km=250)
+    assert [airport["iata"] for airport, _ in locator.nearest(0.0, -179.9)] == ["EST"]
+    assert locator.nearest(45.0, 0.0) == []
+
+
+def test_search_ids_round_trip():
+    assert airport_iata(booking_airport_id(" goi ")) == "GOI"
+    assert airport_iata("BOM.CITY") is None
+    assert airport_iata(None) is None
+
+
+def test_planner_picks_flights_between_the_resolved_airports(tmp_path):
+    airports = ReferenceDataStore(snapshot_path=str(tmp_path / "reference.json"))
+    airports.load()
+    trip = TripRequest(
+        origin={"name": "Alibaug", "city": "Alibaug", "state": "Maharashtra", "country": "India", "airport_id": "BOM.AIRPORT"},
+        destination={"name": "Amer", "city": "Amer", "state": "Rajasthan", "country": "India", "airport_id": "JAI.AIRPORT"},
+        start_date=date(2025, 10, 1),
+        end_date=date(2025, 10, 4),
+        travelers_count=1,
+        preferences={"themes": ["heritage"], "budget_level": "luxury", "max_budget": 100000}
+    )
+
+    _, _, flights, _ = TripPlanner(airports=airports).get_candidates(trip)
+    assert flights and all((flight["from"], flight["to"]) == ("Mumbai", "Jaipur") for flight in flights)
+
+    trip.origin.airport_id = "DEL.AIRPORT"
+    _, _, flights, _ = TripPlanner(airports=airports).get_candidates(trip)
+    assert flights and all(flight["from"] == "Delhi" for flight in flights)
@@ -0,0 +1,117 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.amadeus_auth import AmadeusAuthError, AmadeusTokenManager
+
+
+class TokenServer:
+    """Hands out numbered tokens; ``release`` gates each request"""
+
+    def __init__(self, expires_in=1800.0, fail=0):
+        self.expires_in = expires_in
+        self.fail = fail
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self):
+        self.release.wait(5)
+        self.calls += 1
+        if self.calls <= self.fail:
+            raise ConnectionError("connection reset")
+        return f"token-{self.calls}", self.expires_in
+
+
+def manager(server, **options):
+    return AmadeusTokenManager(client_id="id", client_secret="secret", fetch=server,
+                               expiry_margin=options.pop("expiry_margin", 0), **options)
+
+
+def test_token_is_cached_and_concurrent_callers_share_one_request():
+    server = TokenServer()
+    server.release.clear()
+    tokens = manager(server, refresh_ahead=0)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = [pool.submit(tokens.get_token) for _ in range(8)]
+        time.sleep(0.05)
+        server.release.set()
+        assert {result.result() for result in results} == {"token-1"}
+    assert tokens.get_token() == "token-1"
+    assert server.calls == 1
+    tokens.close()
+
+
+def test_refreshes_in_the_background_ahead_of_expiry():
+    server = TokenServer(expires_in=0.5)
+    tokens = manager(server, refresh_ahead=0.4)
+    assert tokens.get_token() == "token-1"
+    time.sleep(0.2)
+    # Inside the refresh window: the current token is served while a new one is fetched
+    assert tokens.get_token() == "token-1"
+    deadline = time.monotonic() + 2
+    while tokens.get_metrics()["refreshing"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert tokens.get_token() == "token-2"
+    assert tokens.get_metrics()["background_refreshes"] >= 1
+    tokens.close()
+
+
+def test_expiry_margin_and_invalidation():
+    server = TokenServer(expires_in=60)
+    tokens = manager(server, expiry_margin=60, refresh_ahead=0)
+    assert tokens.get_token() == "token-1"
+    # A token inside the margin is never served
+    assert tokens.get_token() == "token-2"
+
+    tokens.expiry_margin = 0
+    token = tokens.get_token()
+    tokens.invalidate("token-1")  # already replaced, ignored
+    assert tokens.get_token() == token
+    tokens.invalidate(token)
+    assert tokens.get_token() != token
+    tokens.close()
+
+
+def test_failed_request_is_not_reused():
+    server = TokenServer(fail=1)
+    tokens = manager(server)
+    with pytest.raises(AmadeusAuthError):
+        asyncio.run(tokens.get_token_async())
+    assert asyncio.run(tokens.get_token_async()) == "token-2"
+    assert tokens.get_metrics()["failures"] == 1
+    tokens.close()
+
+
+def test_token_wait_timeout_is_an_auth_error():
+    server = TokenServer()
+    server.release.clear()
+    tokens = manager(server, timeout=0.05)
+
+    with pytest.raises(AmadeusAuthError) as error:
+        asyncio.run(tokens.get_token_async())
+    assert error.value.status_code == 504
+    with pytest.raises(AmadeusAuthError):
+        tokens.get_token()
+
+    server.release.set()
+    tokens.close()
+
+
+def test_client_reports_a_token_timeout_as_an_amadeus_error():
+    from services.amadeus_client import AmadeusClient, AmadeusError
+    from services.upstream_fixtures import UpstreamFixtures
+
+    server = TokenServer()
+    server.release.clear()
+    client = AmadeusClient(token_manager=manager(server, timeout=0.05), tps=100, fixtures=UpstreamFixtures(mode="live"))
+
+    with pytest.raises(AmadeusError) as error:
+        asyncio.run(client.get("/v1/reference-data/airlines"))
+    assert error.value.status_code == 504
+
+    server.release.set()
+    client.token_manager.close()
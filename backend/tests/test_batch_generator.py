@@ -0,0 +1,109 @@
+import asyncio
+from datetime import date
+
+from models.trip_models import GenerationMode, TripRequest
+from services.batch_generator import BatchItineraryGenerator
+
+
+class FakePlanner:
+    def __init__(self):
+        self.candidate_calls = []
+
+    def get_candidates(self, trip_request):
+        self.candidate_calls.append(trip_request)
+        return [], [], [{"origin": trip_request.origin.city}], []
+
+    def plan(self, trip_request, candidates):
+        return {"max_budget": trip_request.preferences.max_budget, "flights": candidates[2], "generated_by": "planner"}
+
+
+class FailingPlanner(FakePlanner):
+    def plan(self, trip_request, candidates):
+        if trip_request.preferences.max_budget == 99999:
+            raise ValueError("no budget")
+        return super().plan(trip_request, candidates)
+
+
+class FakeFirebase:
+    def __init__(self):
+        self.saved = []
+        self.writes = 0
+
+    async def save_itineraries(self, itineraries, user_id):
+        self.writes += 1
+        self.saved.extend(itineraries)
+        return [f"itinerary-{len(self.saved) - len(itineraries) + offset}" for offset in range(len(itineraries))]
+
+
+def trip(max_budget=12000, origin="Delhi", origin_state="Delhi"):
+    return TripRequest(
+        origin={"name": origin, "city": origin, "state": origin_state, "country": "India"},
+        destination={"name": "Jaipur", "city": "Jaipur", "state": "Rajasthan", "country": "India"},
+        start_date=date(2025, 10, 1),
+        end_date=date(2025, 10, 3),
+        travelers_count=2,
+        preferences={"themes": ["heritage"], "budget_level": "mid_range", "max_budget": max_budget}
+    )
+
+
+def run_batch(trip_requests, planner=None, write_batch_size=None):
+    planner = planner or FakePlanner()
+    firebase = FakeFirebase()
+    generator = BatchItineraryGenerator(None, None, firebase, planner, write_batch_size=write_batch_size)
+
+    async def collect():
+        return [event async for event in generator.generate(trip_requests, GenerationMode.FAST)]
+
+    return asyncio.run(collect()), firebase, planner
+
+
+def final_status(events):
+    return {data["index"]: data for kind, data in events if kind == "item"}
+
+
+def test_exact_repeats_are_generated_once_and_share_an_id():
+    events, firebase, _ = run_batch([trip(), trip()])
+    statuses = final_status(events)
+
+    assert len(firebase.saved) == 1
+    assert statuses[0]["itinerary_id"] == statuses[1]["itinerary_id"]
+    assert events[-1] == ("complete", {"success": True, "total": 2, "unique": 1, "duplicates": 1, "saved": 2, "failed": 0})
+
+
+def test_requests_differing_only_within_a_budget_band_are_not_merged():
+    events, firebase, _ = run_batch([trip(12000), trip(13500)])
+    statuses = final_status(events)
+
+    assert [data["status"] for kind, data in events[:2]] == ["queued", "queued"]
+    assert sorted(itinerary["max_budget"] for itinerary in firebase.saved) == [12000, 13500]
+    assert statuses[0]["itinerary_id"] != statuses[1]["itinerary_id"]
+
+
+def test_candidate_lookups_are_not_shared_across_origins():
+    events, firebase, planner = run_batch([trip(origin="Mumbai", origin_state="Maharashtra"), trip(origin="Delhi")])
+
+    assert len(planner.candidate_calls) == 2
+    assert sorted(itinerary["flights"][0]["origin"] for itinerary in firebase.saved) == ["Delhi", "Mumbai"]
+
+
+def test_candidate_lookups_are_shared_for_the_same_route():
+    _, _, planner = run_batch([trip(), trip().model_copy(update={"travelers_count": 3})])
+
+    assert len(planner.candidate_calls) == 1
+
+
+def test_a_failed_item_fails_its_duplicates_and_spares_the_rest():
+    events, firebase, _ = run_batch([trip(99999), trip(12000), trip(99999)], planner=FailingPlanner())
+    statuses = final_status(events)
+
+    assert statuses[0]["status"] == statuses[2]["status"] == "failed"
+    assert statuses[0]["detail"] == "no budget"
+    assert statuses[1]["status"] == "saved"
+    assert events[-1][1]["failed"] == 2 and not events[-1][1]["success"]
+
+
+def test_saves_are_grouped_into_batched_writes():
+    events, firebase, _ = run_batch([trip(budget) for budget in (10000, 11000, 12000, 13000, 14000)], write_batch_size=2)
+
+    assert firebase.writes == 3
+    assert events[-1][1]["saved"] == 5
@@ -0,0 +1,41 @@
+import asyncio
+
+from models.trip_models import Location
+from services.destination_knowledge import DestinationKnowledgeStore
+
+SECTIONS = {"cultural_insights": ["Dress modestly"], "safety_tips": ["Carry water"], "local_recommendations": ["Try kachori"]}
+DESTINATION = Location(name="Nashik/Trimbak", city="Nashik/Trimbak", state="Maharashtra", country="India")
+
+
+def test_ignores_the_itinerary_cache_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("ITINERARY_CACHE_DIR", str(tmp_path / "itineraries"))
+    monkeypatch.delenv("KNOWLEDGE_CACHE_DIR", raising=False)
+
+    async def generate(destination, month):
+        return SECTIONS
+
+    assert DestinationKnowledgeStore(generate).cache.disk_dir is None
+    monkeypatch.setenv("KNOWLEDGE_CACHE_DIR", str(tmp_path / "knowledge"))
+    assert DestinationKnowledgeStore(generate).cache.disk_dir == str(tmp_path / "knowledge")
+
+
+def test_persists_keys_with_slashes_and_shares_misses(tmp_path):
+    calls = []
+
+    async def generate(destination, month):
+        calls.append(month)
+        await asyncio.sleep(0.01)
+        return SECTIONS
+
+    async def scenario():
+        store = DestinationKnowledgeStore(generate, disk_dir=str(tmp_path))
+        results = await asyncio.gather(*(store.get(DESTINATION, 10) for _ in range(5)))
+        assert all(result == SECTIONS for result in results)
+        assert calls == [10]
+
+        # A fresh store (another worker, or after a restart) reads the entry back from disk
+        restarted = DestinationKnowledgeStore(generate, disk_dir=str(tmp_path))
+        assert restarted.peek(DESTINATION, 10) == SECTIONS
+
+    asyncio.run(scenario())
+    assert all(path.parent.parent == tmp_path for path in tmp_path.rglob("*.json"))
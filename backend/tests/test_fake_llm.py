@@ -0,0 +1,102 @@
+import json
+import random
+
+import pytest
+
+from services.fake_llm import FakeGeminiBackend, FakeLLMError, classify_prompt, parse_tables
+from services.metrics import LatencyDistribution
+from utils.json_extractor import extract_json
+
+PROMPT = """Plan a trip to Jaipur.
+Duration: 2 days
+Dates: 2025-10-01 to 2025-10-02
+
+Activities (name|category|cost):
+Amber Fort|Heritage|500
+City Palace|Heritage|300
+Hawa Mahal|Heritage|200
+
+Restaurants (name|cuisine):
+Laxmi Misthan Bhandar|Rajasthani
+Tapri|Cafe
+
+Accommodations (name|cost_per_night):
+Haveli Inn|3000
+
+Flights (airline|price):
+IndiGo|4000
+"""
+
+
+def backend(**overrides):
+    settings = {"latency": "fixed:0", "chunk_size": 64, "chunk_delay_ms": 0, "error_rate": 0,
+                "truncate_rate": 0, "seed": 7}
+    return FakeGeminiBackend(**{**settings, **overrides})
+
+
+def test_prompts_are_classified_by_their_wording():
+    assert classify_prompt(PROMPT) == "itinerary"
+    assert classify_prompt("Plan only the days below:\nDay 1 (2025-10-01):") == "days"
+    assert classify_prompt("Return a JSON Patch for each suggestion") == "alternatives"
+
+
+def test_tables_are_read_from_the_prompt():
+    tables = parse_tables(PROMPT)
+    assert [row["name"] for row in tables["activities"]] == ["Amber Fort", "City Palace", "Hawa Mahal"]
+    assert tables["flights"] == [{"airline": "IndiGo", "price": "4000"}]
+
+
+def test_synthesized_itinerary_uses_the_prompt_candidates():
+    response = backend().generate_content(PROMPT)
+    itinerary = extract_json(response.text)
+
+    assert response.text.startswith("```json")
+    assert [day["date"] for day in itinerary["days"]] == ["2025-10-01", "2025-10-02"]
+    assert [item["name"] for item in itinerary["days"][0]["activities"]] == ["Amber Fort", "City Palace"]
+    assert itinerary["accommodation"] == [{"name": "Haveli Inn"}]
+    assert response.usage_metadata.prompt_token_count > 0
+
+
+def test_structured_calls_return_bare_json():
+    response = backend().generate_content(PROMPT, generation_config={"response_mime_type": "application/json"})
+    assert json.loads(response.text)["transportation"] == [{"airline": "IndiGo"}]
+
+
+def test_streams_are_chunked_and_reproducible_under_a_seed():
+    first = [chunk.text for chunk in backend(truncate_rate=0.5).generate_content(PROMPT, stream=True)]
+    second = [chunk.text for chunk in backend(truncate_rate=0.5).generate_content(PROMPT, stream=True)]
+
+    assert first == second
+    assert len(first) > 1 and all(len(chunk) <= 64 for chunk in first)
+
+
+def test_truncation_cuts_the_answer_short():
+    full = backend().generate_content(PROMPT).text
+    truncated = backend(truncate_rate=1).generate_content(PROMPT).text
+    assert 0.3 * len(full) <= len(truncated) < 0.9 * len(full)
+
+
+def test_injected_failures_and_timeouts():
+    with pytest.raises(FakeLLMError, match="503"):
+        backend(error_rate=1).generate_content(PROMPT)
+    with pytest.raises(FakeLLMError, match="503"):
+        list(backend(error_rate=1).generate_content(PROMPT, stream=True))
+    with pytest.raises(FakeLLMError, match="504"):
+        backend(latency="fixed:50").generate_content(PROMPT, request_options={"timeout": 0.01})
+
+
+def test_replay_cycles_through_recordings(tmp_path):
+    (tmp_path / "itinerary_1.txt").write_text("first", encoding="utf-8")
+    (tmp_path / "itinerary_2.txt").write_text("second", encoding="utf-8")
+    replay = backend(mode="replay", replay_dir=str(tmp_path))
+
+    assert [replay.generate_content(PROMPT).text for _ in range(3)] == ["first", "second", "first"]
+    # Nothing recorded for updates, so it is synthesized
+    assert "updates" in extract_json(replay.generate_content("Suggest real-time conditions updates").text)
+
+
+def test_latency_specs_are_sampled_in_seconds():
+    rng = random.Random(1)
+    assert LatencyDistribution("fixed:250").sample(rng) == 0.25
+    assert all(0.5 <= LatencyDistribution("uniform:500,1500").sample(rng) <= 1.5 for _ in range(50))
+    assert LatencyDistribution("normal:10,100").sample(random.Random(3)) >= 0
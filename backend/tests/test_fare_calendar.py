@@ -0,0 +1,59 @@
+import time
+import asyncio
+from datetime import date
+
+from services.fare_calendar import FareCalendar
+
+PRICED = {"data": {"aggregation": {"minPrice": {"currencyCode": "INR", "units": 4200, "nanos": 0}, "totalCount": 3}}}
+NO_FARE = {"data": {"aggregation": {"totalCount": 0}}}
+
+
+def calendar(responses, **options):
+    calls = []
+
+    async def fetch(from_id, to_id, day, adults, children):
+        calls.append(day)
+        response = responses[day]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    options.setdefault("rate", 1000)
+    return FareCalendar(fetch, **options), calls
+
+
+def grid(fares):
+    return asyncio.run(fares.grid("BOM.AIRPORT", "BLR.AIRPORT", date(2025, 9, 1), date(2025, 9, 3)))
+
+
+def test_no_fare_dates_are_cached_briefly_and_failures_not_at_all(monkeypatch):
+    monkeypatch.delenv("ITINERARY_CACHE_DIR", raising=False)
+    fares, calls = calendar({
+        "2025-09-01": PRICED,
+        "2025-09-02": NO_FARE,
+        "2025-09-03": RuntimeError("429 Too Many Requests")
+    }, empty_ttl_seconds=60)
+
+    first = grid(fares)
+    assert first["missing"] == ["2025-09-02", "2025-09-03"]
+    assert first["cheapest"]["date"] == "2025-09-01"
+
+    assert grid(fares) == first
+    assert sorted(calls) == ["2025-09-01", "2025-09-02", "2025-09-03", "2025-09-03"]
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    grid(fares)
+    assert calls.count("2025-09-02") == 2
+    assert calls.count("2025-09-01") == 1
+    metrics = fares.get_metrics()
+    assert metrics["cells_empty"] == 2 and metrics["cells_failed"] == 3
+
+
+def test_cells_use_their_own_cache_directory(monkeypatch, tmp_path):
+    monkeypatch.setenv("ITINERARY_CACHE_DIR", str(tmp_path / "itineraries"))
+    monkeypatch.setenv("FARE_CALENDAR_CACHE_DIR", str(tmp_path / "fares"))
+    fares, _ = calendar({day: PRICED for day in ("2025-09-01", "2025-09-02", "2025-09-03")})
+    grid(fares)
+    assert not (tmp_path / "itineraries").exists()
+    assert len(list((tmp_path / "fares").rglob("*.json"))) == 3
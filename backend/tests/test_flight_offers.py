@@ -0,0 +1,46 @@
+import json
+import asyncio
+from datetime import time
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+from services.flight_offers import FlightOfferSet, parse_clock
+
+FIXTURE = Path(__file__).resolve().parent.parent / "mocks" / "flights" / "get_flights.json"
+
+
+@pytest.fixture(scope="module")
+def offers():
+    return FlightOfferSet.from_booking(json.loads(FIXTURE.read_text(encoding="utf-8")))
+
+
+def test_parse_clock_accepts_single_digit_hours():
+    assert parse_clock("9:00") == time(9, 0)
+    assert parse_clock(" 21:30 ") == time(21, 30)
+    assert parse_clock(None) is None
+    for bad in ("9", "25:00", "09:60", "9am", "09:00:00"):
+        with pytest.raises(ValueError):
+            parse_clock(bad)
+
+
+def test_departure_window_matches_unpadded_hours(offers):
+    departures = sorted(offer.departure[11:16] for offer in offers.offers)
+    after_nine = offers.filter(depart_after=parse_clock("9:00"))
+    assert after_nine.offers and len(after_nine.offers) == sum(clock >= "09:00" for clock in departures)
+
+    window = offers.filter(depart_after=time(21, 0), depart_before=time(22, 40))
+    assert window.offers and len(window.offers) == sum("21:00" <= clock <= "22:40" for clock in departures) < len(departures)
+
+
+def test_endpoint_rejects_bad_times_and_raw_streams():
+    main = pytest.importorskip("main")
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(main.get_flights_endpoint(depart_after="9.30"))
+    assert error.value.status_code == 422
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(main.get_flights_endpoint(raw=True, stream=True))
+    assert error.value.status_code == 400
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.fake_llm import FakeGeminiBackend, FakeLLMError
+from services.gemini_executor import GeminiDeadlineExceededError, GeminiExecutor, GeminiQueueFullError
+
+
+def test_concurrency_cap_and_queue_limit():
+    async def scenario():
+        executor = GeminiExecutor(max_concurrency=2, max_queue_size=1, default_timeout=5)
+        release = threading.Event()
+        running = []
+
+        def work():
+            running.append(1)
+            release.wait(2)
+            return "done"
+
+        calls = [asyncio.ensure_future(executor.run(work)) for _ in range(3)]
+        await asyncio.sleep(0.1)
+        assert executor.get_metrics()["in_flight"] == 2
+        assert executor.get_metrics()["queue_depth"] == 1
+        with pytest.raises(GeminiQueueFullError):
+            await executor.run(work)
+        release.set()
+        assert await asyncio.gather(*calls) == ["done"] * 3
+        executor.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_deadline_covers_queue_wait():
+    async def scenario():
+        executor = GeminiExecutor(max_concurrency=1, max_queue_size=4, default_timeout=5)
+        blocker = asyncio.ensure_future(executor.run(time.sleep, 0.5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(GeminiDeadlineExceededError):
+            await executor.run(time.sleep, 0, timeout=0.1)
+        await blocker
+        assert executor.get_metrics()["deadline_exceeded"] == 1
+        executor.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_remaining_deadline_is_passed_as_request_timeout():
+    async def scenario():
+        executor = GeminiExecutor(max_concurrency=1, default_timeout=5)
+        calls = []
+
+        def call(**kwargs):
+            calls.append(kwargs)
+            return "ok"
+
+        await executor.run(call, timeout=2, request_timeout=True)
+        await executor.run(call, timeout=2)
+        executor.shutdown()
+        return calls
+
+    with_timeout, without = asyncio.run(scenario())
+    assert 0 < with_timeout["request_options"]["timeout"] <= 2
+    assert without == {}
+
+
+def test_hung_call_releases_its_slot_after_the_request_timeout():
+    async def scenario():
+        executor = GeminiExecutor(max_concurrency=1, default_timeout=5)
+        backend = FakeGeminiBackend(latency="fixed:60000", seed=1)
+        with pytest.raises((GeminiDeadlineExceededError, FakeLLMError)):
+            await executor.run(backend.generate_content, "prompt", timeout=0.2, request_timeout=True)
+        # The worker gives up on its own shortly after the deadline, freeing the slot
+        await asyncio.sleep(0.3)
+        assert executor.get_metrics()["in_flight"] == 0
+        assert await executor.run(lambda: "next", timeout=1) == "next"
+        executor.shutdown()
+
+    asyncio.run(scenario())
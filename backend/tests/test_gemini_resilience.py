@@ -0,0 +1,112 @@
+import pytest
+
+from services.gemini_resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, HedgePolicy
+
+
+def breaker(**overrides):
+    settings = {"window_size": 10, "min_calls": 4, "failure_rate": 0.5, "slow_call_seconds": 5,
+                "slow_rate": 0.75, "open_seconds": 60, "half_open_calls": 2}
+    return CircuitBreaker("test", **{**settings, **overrides})
+
+
+def test_opens_once_the_failure_rate_is_reached():
+    circuit = breaker()
+    for success in (True, False, True):
+        circuit.before_call()
+        circuit.record(success, 0.1)
+    assert circuit.state == CLOSED
+
+    circuit.before_call()
+    circuit.record(False, 0.1)
+
+    assert circuit.state == OPEN
+    assert circuit.snapshot()["last_trip_reason"] == "failure rate 50%"
+    with pytest.raises(CircuitOpenError):
+        circuit.before_call()
+
+
+def test_opens_once_the_slow_call_rate_is_reached():
+    circuit = breaker()
+    for duration in (6, 6, 1, 6):
+        circuit.before_call()
+        circuit.record(True, duration)
+
+    assert circuit.state == OPEN
+    assert circuit.snapshot()["last_trip_reason"] == "slow call rate 75%"
+
+
+def test_half_open_admits_only_the_probe_limit_and_closes_when_they_succeed():
+    # An explicit zero must not fall back to the env default
+    circuit = breaker(open_seconds=0)
+    assert circuit.open_seconds == 0
+    for _ in range(4):
+        circuit.before_call()
+        circuit.record(False, 0.1)
+    assert circuit.state == OPEN
+
+    circuit.before_call()
+    circuit.before_call()
+    assert circuit.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        circuit.before_call()
+
+    circuit.record(True, 0.1)
+    circuit.record(True, 0.1)
+    assert circuit.state == CLOSED
+
+
+def test_failed_probe_reopens_the_circuit():
+    circuit = breaker(open_seconds=0)
+    for _ in range(4):
+        circuit.before_call()
+        circuit.record(False, 0.1)
+
+    circuit.before_call()
+    circuit.record(False, 0.1)
+
+    assert circuit.state == OPEN
+    assert circuit.snapshot()["times_opened"] == 2
+
+
+def test_cancel_gives_back_a_probe_slot():
+    circuit = breaker(open_seconds=0, half_open_calls=1)
+    for _ in range(4):
+        circuit.before_call()
+        circuit.record(False, 0.1)
+
+    circuit.before_call()
+    with pytest.raises(CircuitOpenError):
+        circuit.before_call()
+
+    circuit.cancel()
+    circuit.before_call()
+    circuit.record(True, 0.1)
+    assert circuit.state == CLOSED
+
+
+def test_hedges_stay_within_the_budget():
+    policy = HedgePolicy(enabled=True, fixed_delay=0.5, budget=0.25)
+    granted = 0
+    for _ in range(20):
+        assert policy.delay("itinerary") == 0.5
+        granted += policy.try_acquire()
+
+    assert granted == 5
+    assert policy.get_metrics()["hedged"] == 5
+
+
+def test_zero_budget_never_hedges():
+    policy = HedgePolicy(enabled=True, fixed_delay=0.5, budget=0)
+    policy.delay("itinerary")
+    assert not policy.try_acquire()
+
+
+def test_p95_delay_waits_for_enough_samples(monkeypatch):
+    monkeypatch.delenv("GEMINI_HEDGE_DELAY", raising=False)
+    policy = HedgePolicy(enabled=True, budget=0.1, min_samples=20)
+    for duration in range(1, 20):
+        policy.observe("itinerary", duration)
+    assert policy.delay("itinerary") is None
+
+    policy.observe("itinerary", 20)
+    assert policy.delay("itinerary") == 19
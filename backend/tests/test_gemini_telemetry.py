@@ -0,0 +1,97 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from models.trip_models import TripRequest
+from services.fake_llm import FakeGeminiBackend
+from services.gemini_executor import GeminiDeadlineExceededError
+from services.gemini_resilience import CircuitOpenError
+from services.gemini_telemetry import GeminiTelemetry, failure_reason
+from services.model_router import LARGE, SMALL
+from utils.json_extractor import JSONExtractionError
+
+
+@pytest.fixture(autouse=True)
+def fake_backend(monkeypatch):
+    monkeypatch.setenv("LLM_BACKEND", "fake")
+    monkeypatch.setenv("FAKE_LLM_LATENCY", "fixed:0")
+    monkeypatch.setenv("FAKE_LLM_CHUNK_DELAY_MS", "0")
+    monkeypatch.setenv("FAKE_LLM_SEED", "7")
+
+
+def trip(travelers_count=2):
+    return TripRequest(
+        origin={"name": "Delhi", "city": "Delhi", "state": "Delhi", "country": "India"},
+        destination={"name": "Jaipur", "city": "Jaipur", "state": "Rajasthan", "country": "India"},
+        start_date=date(2025, 10, 1),
+        end_date=date(2025, 10, 3),
+        travelers_count=travelers_count,
+        preferences={"themes": ["heritage"], "budget_level": "mid_range", "max_budget": 60000}
+    )
+
+
+def test_failure_reason_follows_the_exception_chain():
+    try:
+        try:
+            raise JSONExtractionError("bad json")
+        except JSONExtractionError as e:
+            raise ValueError("could not parse") from e
+    except ValueError as e:
+        wrapped = e
+
+    assert failure_reason(wrapped) == "parse_error"
+    assert failure_reason(GeminiDeadlineExceededError()) == "deadline_exceeded"
+    assert failure_reason(CircuitOpenError()) == "circuit_open"
+    assert failure_reason(RuntimeError("boom")) == "gemini_error"
+
+
+def test_calls_are_counted_per_caller_and_model():
+    telemetry = GeminiTelemetry()
+    telemetry.record_call("itinerary", "small", 900, 400, 1.2, 0.3)
+    telemetry.record_call("itinerary", "large", 900, 0, 30.5, None, error="deadline_exceeded")
+    telemetry.record_call("translate", "small", 50, 20, 0.2, 0.1)
+
+    metrics = telemetry.get_metrics()
+    itinerary = metrics["itinerary"]
+    assert itinerary["calls"] == 2
+    assert itinerary["models"] == {"small": 1, "large": 1}
+    assert itinerary["errors"] == {"deadline_exceeded": 1}
+    assert itinerary["latency_ms"]["count"] == 2 and itinerary["ttft_ms"]["count"] == 1
+    # A failed call has no response to count
+    assert itinerary["response_tokens"]["count"] == 1
+    assert metrics["translate"]["calls"] == 1
+    assert metrics["alternatives"]["calls"] == 0
+
+
+def test_schema_mismatches_are_counted_by_field():
+    telemetry = GeminiTelemetry()
+    telemetry.record_schema("itinerary")
+    telemetry.record_schema("itinerary", ["days.*.meals", "summary"])
+    telemetry.record_schema("itinerary", ["days.*.meals"])
+    telemetry.record_schema("itinerary")
+
+    stats = telemetry.get_metrics()["itinerary"]
+    assert stats["schema_mismatch_rate"] == 0.5
+    assert stats["schema_mismatch_fields"] == {"days.*.meals": 2, "summary": 1}
+
+
+def test_gemini_service_records_calls_parses_and_fallbacks():
+    from services.gemini_service import GeminiService
+
+    service = GeminiService()
+    asyncio.run(service._generate_itinerary(trip()))
+    stats = service.telemetry.get_metrics()["itinerary"]
+    assert stats["calls"] >= 1 and stats["parse_success"] >= 1
+    assert stats["fallbacks"] == {}
+
+    for route in (SMALL, LARGE):
+        service.router.routes[route].backend = FakeGeminiBackend(
+            latency="fixed:0", chunk_delay_ms=0, error_rate=1, seed=7, model_name=route
+        )
+    # A different trip, so the first one's cached itinerary isn't served
+    itinerary = asyncio.run(service._generate_itinerary(trip(travelers_count=3)))
+    stats = service.telemetry.get_metrics()["itinerary"]
+    assert sum(stats["errors"].values()) >= 1
+    assert itinerary["generated_by"] == "local_planner"
+    assert stats["fallbacks"] == {"gemini_error": 1}
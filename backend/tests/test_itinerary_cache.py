@@ -0,0 +1,72 @@
+from datetime import date
+
+from models.trip_models import TripRequest
+from services.itinerary_cache import ItineraryCache, make_request_key
+
+
+def trip(**changes):
+    request = {
+        "origin": {"name": "Delhi", "city": "Delhi", "state": "Delhi", "country": "India"},
+        "destination": {"name": "Jaipur", "city": "Jaipur", "state": "Rajasthan", "country": "India"},
+        "start_date": date(2025, 10, 1),
+        "end_date": date(2025, 10, 4),
+        "travelers_count": 2,
+        "preferences": {"themes": ["heritage", "food"], "budget_level": "mid_range", "max_budget": 50000},
+        **changes
+    }
+    return TripRequest(**request)
+
+
+def key(request):
+    return make_request_key(request, "v1")
+
+
+def preferences(**changes):
+    return {"themes": ["heritage", "food"], "budget_level": "mid_range", "max_budget": 50000, **changes}
+
+
+def test_key_ignores_order_case_and_whitespace():
+    reordered = trip(preferences=preferences(themes=["food", "heritage"]))
+    assert key(reordered) == key(trip())
+    assert key(trip(special_requirements="  Wheelchair  access ")) == key(trip(special_requirements="wheelchair access"))
+
+
+def test_key_covers_every_field_the_prompt_reads():
+    base = key(trip())
+    variants = [
+        trip(origin={"name": "Mumbai", "city": "Mumbai", "state": "Maharashtra", "country": "India"}),
+        trip(preferences=preferences(interests=["museums"])),
+        trip(preferences=preferences(dietary_restrictions=["vegan"])),
+        trip(preferences=preferences(accessibility_needs=["wheelchair"])),
+        trip(preferences=preferences(travel_style="relaxed")),
+        trip(special_requirements="Travelling with a toddler"),
+        trip(travelers_count=3),
+        trip(preferences=preferences(max_budget=100000))
+    ]
+    keys = [key(variant) for variant in variants]
+    assert base not in keys
+    assert len(set(keys)) == len(keys)
+
+
+def test_nearby_budgets_share_a_band():
+    assert key(trip(preferences=preferences(max_budget=50500))) == key(trip())
+
+
+def test_disk_tier_hashes_keys_that_are_not_digests(tmp_path):
+    cache = ItineraryCache(disk_dir=str(tmp_path))
+    cache.set("../escape/Pune|04", {"value": 1})
+    digest = key(trip())
+    cache.set(digest, {"value": 2})
+
+    restarted = ItineraryCache(disk_dir=str(tmp_path))
+    assert restarted.get("../escape/Pune|04") == {"value": 1}
+    assert restarted.get(digest) == {"value": 2}
+    assert (tmp_path / digest[:2] / f"{digest}.json").is_file()
+    assert not (tmp_path.parent / "escape").exists()
+
+
+def test_itinerary_cache_reads_its_own_settings(tmp_path, monkeypatch):
+    monkeypatch.setenv("ITINERARY_CACHE_SIZE", "8")
+    monkeypatch.setenv("ITINERARY_CACHE_DIR", str(tmp_path))
+    cache = ItineraryCache()
+    assert cache.max_entries == 8 and cache.disk_dir == str(tmp_path)
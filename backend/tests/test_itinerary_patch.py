@@ -0,0 +1,76 @@
+import pytest
+
+from services.itinerary_patch import PatchError, apply_patch, classify_feedback
+
+FORT = {"name": "Amber Fort", "category": "Heritage", "duration_hours": 3, "cost_per_person": 500}
+MUSEUM = {"name": "City Palace Museum", "category": "Heritage", "duration_hours": 2, "cost_per_person": 300}
+BAZAAR = {"name": "Johari Bazaar", "category": "Shopping", "duration_hours": 2, "cost_per_person": 0}
+SPA = {"name": "Ayurvedic Spa", "category": "Wellness", "duration_hours": 2, "cost_per_person": 2500}
+THALI = {"name": "Chokhi Dhani", "cuisine": "Rajasthani", "price_range": "₹₹"}
+CAFE = {"name": "Tapri Central", "cuisine": "Cafe", "price_range": "₹"}
+
+
+def itinerary():
+    return {
+        "trip_request": {"start_date": "2025-10-01", "end_date": "2025-10-04", "travelers_count": 2},
+        "days": [
+            {"date": "2025-10-01", "activities": [dict(FORT)], "meals": [dict(THALI)]},
+            {"date": "2025-10-02", "activities": [dict(MUSEUM), dict(SPA)], "meals": []},
+            {"date": "2025-10-03", "activities": [dict(BAZAAR)], "meals": []}
+        ],
+        "accommodation": [],
+        "transportation": []
+    }
+
+
+def test_replace_hydrates_from_candidates_and_recomputes_costs():
+    original = itinerary()
+    patched = apply_patch(original, [
+        {"op": "replace", "path": "/days/1/activities/1", "value": {"name": "johari bazaar", "time_slot": "17:00"}},
+        {"op": "remove", "path": "/days/2/activities/0"},
+        {"op": "add", "path": "/days/2/meals/-", "value": "Tapri Central"}
+    ], activities=[BAZAAR, SPA], restaurants=[CAFE], allowed_days=[1, 2])
+
+    assert patched["days"][1]["activities"][1] == {**BAZAAR, "time_slot": "17:00"}
+    assert patched["days"][2] == {**patched["days"][2], "activities": [], "meals": [CAFE]}
+    assert patched["total_cost"] < 2 * (500 + 300 + 2500)
+    # The stored itinerary is left alone
+    assert original["days"][1]["activities"][1] == SPA
+
+
+@pytest.mark.parametrize("patch", [
+    [],
+    [{"op": "move", "path": "/days/0/activities/0", "from": "/days/1/activities/0"}],
+    [{"op": "replace", "path": "/days/0/summary", "value": "x"}],
+    [{"op": "replace", "path": "/days/0/activities/5", "value": "Amber Fort"}],
+    [{"op": "remove", "path": "/days/0/activities/-"}],
+    [{"op": "add", "path": "/days/1/activities/-", "value": "Hawa Mahal"}],
+    [{"op": "add", "path": "/days/1/activities/-", "value": "Amber Fort"}],
+    [{"op": "add", "path": "/days/0/meals/-", "value": "Chokhi Dhani"}],
+    [{"op": "add", "path": "/days/2/activities/-", "value": "Ayurvedic Spa"}],
+])
+def test_invalid_patches_are_rejected(patch):
+    with pytest.raises(PatchError):
+        apply_patch(itinerary(), patch, activities=[FORT, MUSEUM, BAZAAR, SPA], restaurants=[THALI, CAFE], allowed_days=[0, 1])
+
+
+def test_day_limits():
+    crowded = itinerary()
+    extra = [{"name": f"Stop {n}", "duration_hours": 1} for n in range(3)]
+    patch = [{"op": "add", "path": "/days/0/activities/-", "value": item["name"]} for item in extra]
+    assert len(apply_patch(crowded, patch, activities=extra)["days"][0]["activities"]) == 4
+    with pytest.raises(PatchError):
+        apply_patch(crowded, patch + [{"op": "add", "path": "/days/0/activities/-", "value": "Amber Fort"}],
+                    activities=extra)
+
+
+def test_classify_feedback():
+    trip = itinerary()
+    assert classify_feedback(trip, "Swap something on day 3") == [2]
+    assert classify_feedback(trip, "days 1-2 are too rushed") == [0, 1]
+    assert classify_feedback(trip, "The Ayurvedic Spa is too pricey") == [1]
+    assert classify_feedback(trip, "less shopping please") == [2]
+    assert classify_feedback(trip, "the last day looks empty") == [2]
+    assert classify_feedback(trip, "2025-10-01 please") == [0]
+    # Names nothing: the busiest days, capped
+    assert classify_feedback(trip, "make it more relaxed", max_days=1) == [1]
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from utils.json_extractor import JSONExtractionError, extract_itinerary, extract_json, repair_json
+
+ITINERARY = {
+    "title": "Jaipur getaway",
+    "days": [
+        {"day": 1, "activities": [{"name": "Amber Fort", "note": "Say \"hi\" {at} the gate"}]},
+        {"day": 2, "activities": [{"name": "City Palace"}]}
+    ],
+    "total_cost": 24000
+}
+
+
+def test_fenced_output_is_unwrapped():
+    text = "Here is your plan:\n```json\n" + json.dumps(ITINERARY, indent=2) + "\n```\nEnjoy!"
+    assert extract_json(text) == ITINERARY
+
+
+def test_prose_after_the_json_is_ignored():
+    text = json.dumps(ITINERARY) + "\n\nLet me know if you would like any changes {or extras}."
+    assert extract_itinerary(text) == (ITINERARY, False)
+
+
+def test_trailing_commas_are_dropped():
+    assert json.loads(repair_json('{"days": [{"day": 1,}, {"day": 2},], "total_cost": 5,}')) == {
+        "days": [{"day": 1}, {"day": 2}], "total_cost": 5
+    }
+
+
+def test_truncation_mid_string_rolls_back_to_the_last_complete_value():
+    data = extract_json('{"title": "Jaipur", "summary": "Three days of for')
+    assert data == {"title": "Jaipur"}
+
+
+def test_truncation_inside_a_day_drops_that_day():
+    text = json.dumps(ITINERARY)
+    cut = text[:text.index("City Palace") + 4]
+
+    data, truncated = extract_itinerary(cut)
+
+    assert truncated
+    assert data["title"] == "Jaipur getaway"
+    assert data["days"] == ITINERARY["days"][:1]
+
+
+def test_truncation_between_days_keeps_every_complete_day():
+    text = json.dumps(ITINERARY)
+    cut = text[:text.index('"total_cost"')]
+
+    data, truncated = extract_itinerary(cut)
+
+    assert truncated
+    assert data["days"] == ITINERARY["days"]
+
+
+def test_output_without_json_is_rejected():
+    with pytest.raises(JSONExtractionError):
+        extract_json("Sorry, I can't plan this trip.")
+    with pytest.raises(JSONExtractionError):
+        extract_itinerary("[1, 2, 3]")
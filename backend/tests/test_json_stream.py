@@ -0,0 +1,50 @@
+import json
+
+from utils.json_stream import ItineraryStreamParser
+
+ITINERARY = {
+    "title": "Jaipur \"Pink City\" {getaway}",
+    "days": [
+        {"day": 1, "activities": [{"name": "Amber Fort", "note": "Bring water } and a hat ]"}]},
+        {"day": 2, "activities": [{"name": "City Palace", "note": "Escaped \\\" quote and { brace"}]}
+    ],
+    "total_cost": 24000,
+    "within_budget": True
+}
+
+
+def feed_by_character(parser, text):
+    """Feed one character at a time, returning (position, event) pairs"""
+    events = []
+    for position, ch in enumerate(text):
+        events.extend((position, event) for event in parser.feed(ch))
+    return events
+
+
+def test_days_are_emitted_before_the_array_closes():
+    text = json.dumps(ITINERARY)
+    events = feed_by_character(ItineraryStreamParser(), text)
+    days_close = text.index("]}]") + 2
+
+    days = [(position, value) for position, (name, value) in events if name == "day"]
+    assert [value for _, value in days] == ITINERARY["days"]
+    assert all(position < days_close for position, _ in days)
+    assert days[0][0] < text.index('{"day": 2')
+
+
+def test_quotes_and_braces_inside_strings_do_not_break_depth_tracking():
+    parser = ItineraryStreamParser()
+    events = [event for _, event in feed_by_character(parser, json.dumps(ITINERARY))]
+
+    fields = {name: value for name, value in events if name != "day"}
+    assert fields == ITINERARY
+    assert parser.finished
+
+
+def test_leading_prose_and_fences_are_ignored():
+    text = "Sure! Here is the plan:\n```json\n" + json.dumps(ITINERARY, indent=2) + "\n```\nHave a great trip."
+    parser = ItineraryStreamParser()
+    events = [event for _, event in feed_by_character(parser, text)]
+
+    assert [name for name, _ in events] == ["title", "day", "day", "days", "total_cost", "within_budget"]
+    assert parser.feed('{"title": "ignored"}') == []
@@ -0,0 +1,14 @@
+from services.metrics import Histogram
+
+
+def test_histogram_quantiles_and_cumulative_buckets():
+    histogram = Histogram((10, 100, 1000))
+    for value in (5, 50, 60, 70, 500, 2000):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"le_10": 1, "le_100": 4, "le_1000": 5, "le_inf": 6}
+    assert snapshot["p50"] == 100
+    # Past the last bound the largest observation is reported
+    assert histogram.quantile(1.0) == 2000
+    assert Histogram((10,)).snapshot()["p95"] is None
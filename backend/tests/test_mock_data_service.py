@@ -0,0 +1,40 @@
+from services.mock_data_service import MockDataService, is_budget_compatible
+
+
+service = MockDataService()
+
+
+def test_activities_match_destination_and_themes():
+    activities = service.get_activities({"destination": "Mumbai", "themes": ["heritage"], "budget_level": "luxury"})
+    assert activities
+    assert all("Mumbai" in item["location"] for item in activities)
+    assert all(any("heritage" in theme.lower() for theme in item["themes"]) for item in activities)
+
+
+def test_activities_fall_back_instead_of_returning_nothing():
+    activities = service.get_activities({"destination": "Mumbai", "interests": ["no such interest"]})
+    assert 0 < len(activities) <= 3
+
+
+def test_budget_level_limits_accommodation_price():
+    stays = service.get_accommodations({"destination": "Goa", "budget_level": "budget"})
+    assert stays
+    assert all(item["cost_per_night"] <= 2000 for item in stays) or len(stays) <= 3
+
+
+def test_flights_use_reverse_route_swapped():
+    flights = service.get_flights({"from_city": "Jaipur", "to_city": "Delhi", "budget_level": "luxury"})
+    assert flights
+    assert all(flight["from"] == "Jaipur" and flight["to"] == "Delhi" for flight in flights)
+
+
+def test_results_are_copies():
+    first = service.get_restaurants({"destination": "Mumbai"})
+    first[0]["name"] = "changed"
+    assert service.get_restaurants({"destination": "Mumbai"})[0]["name"] != "changed"
+
+
+def test_budget_compatibility():
+    assert is_budget_compatible("budget", 2000) and not is_budget_compatible("budget", 2001)
+    assert is_budget_compatible("luxury", 10 ** 6)
+    assert not is_budget_compatible("unknown", 6000)
@@ -0,0 +1,70 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from models.trip_models import TripRequest
+from services.fake_llm import FakeGeminiBackend
+from services.model_router import LARGE, SMALL, ModelRouter
+
+
+@pytest.fixture(autouse=True)
+def fake_backend(monkeypatch):
+    monkeypatch.setenv("LLM_BACKEND", "fake")
+    monkeypatch.setenv("FAKE_LLM_LATENCY", "fixed:0")
+    monkeypatch.setenv("FAKE_LLM_CHUNK_DELAY_MS", "0")
+    monkeypatch.setenv("FAKE_LLM_SEED", "7")
+    monkeypatch.delenv("GEMINI_MODEL", raising=False)
+    monkeypatch.delenv("GEMINI_LARGE_MODEL", raising=False)
+
+
+def trip():
+    return TripRequest(
+        origin={"name": "Delhi", "city": "Delhi", "state": "Delhi", "country": "India"},
+        destination={"name": "Jaipur", "city": "Jaipur", "state": "Rajasthan", "country": "India"},
+        start_date=date(2025, 10, 1),
+        end_date=date(2025, 10, 4),
+        travelers_count=2,
+        preferences={"themes": ["heritage"], "budget_level": "mid_range", "max_budget": 60000}
+    )
+
+
+def service_with_truncating_small_model():
+    from services.gemini_service import GeminiService
+
+    service = GeminiService()
+    service.router.routes[SMALL].backend = FakeGeminiBackend(
+        latency="fixed:0", chunk_delay_ms=0, truncate_rate=1, seed=7, model_name="small"
+    )
+    return service
+
+
+def test_large_model_defaults_to_a_current_model(monkeypatch):
+    monkeypatch.setenv("GEMINI_MODEL", "gemini-pro")
+    router = ModelRouter()
+    assert router.routes[LARGE].model_name == "fake:gemini-1.5-pro"
+    monkeypatch.setenv("GEMINI_LARGE_MODEL", "gemini-1.5-pro-002")
+    assert ModelRouter().routes[LARGE].model_name == "fake:gemini-1.5-pro-002"
+
+
+def test_escalated_truncation_is_not_counted_as_a_fallback():
+    service = service_with_truncating_small_model()
+    itinerary = asyncio.run(service._generate_itinerary(trip()))
+
+    assert itinerary["generated_by"] == "gemini_ai" and not itinerary.get("salvaged")
+    assert "fallback_reason" not in itinerary
+    stats = service.telemetry.get_metrics()["itinerary"]
+    assert stats["fallbacks"] == {}
+    assert sum(stats["escalations"].values()) == 1
+    assert service.router.get_metrics()["escalations"] == {"itinerary": 1}
+
+
+def test_fallback_is_counted_when_there_is_no_escalation(monkeypatch):
+    monkeypatch.setenv("ROUTER_ESCALATE", "false")
+    service = service_with_truncating_small_model()
+    itinerary = asyncio.run(service._generate_itinerary(trip()))
+
+    assert "fallback_reason" not in itinerary
+    stats = service.telemetry.get_metrics()["itinerary"]
+    assert sum(stats["fallbacks"].values()) == 1
+    assert stats["escalations"] == {}
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from services.paginated_search import PaginatedSearch, provider_limiter
+
+PAGE_SIZE = 3
+
+
+def search(provider, total=8, failing=(), max_pages=None, delay=0):
+    fetched = []
+
+    async def fetch_page(page):
+        fetched.append(page)
+        await asyncio.sleep(delay)
+        if page in failing:
+            raise RuntimeError(f"page {page} failed")
+        # Each page repeats the last item of the previous one, as offset pagination does under churn
+        first = max((page - 1) * PAGE_SIZE - 1, 0)
+        ids = range(first, min(first + PAGE_SIZE, total))
+        return {"data": {"hotels": [{"id": item_id} for item_id in ids], "count": total}}
+
+    return PaginatedSearch(
+        provider, fetch_page, ("data", "hotels"), total=lambda payload: payload["data"]["count"],
+        key=lambda item: item["id"], max_pages=max_pages
+    ), fetched
+
+
+def test_collect_merges_every_page_in_order_without_duplicates(monkeypatch):
+    monkeypatch.setenv("SEARCH_MAX_PAGES", "5")
+    paginated, fetched = search("test-collect")
+
+    payload = asyncio.run(paginated.collect())
+
+    assert [item["id"] for item in payload["data"]["hotels"]] == [0, 1, 2, 3, 4, 5, 6, 7]
+    assert sorted(fetched) == [1, 2, 3]
+    assert paginated.summary() == {"total": 8, "pages": 3, "page_failures": 0, "unique_items": 8}
+    assert provider_limiter("test-collect").stats["duplicates_dropped"] == 1
+
+
+def test_page_count_is_capped_by_the_environment_limit(monkeypatch):
+    monkeypatch.setenv("SEARCH_MAX_PAGES", "2")
+    paginated, fetched = search("test-cap", total=30, max_pages=10)
+
+    asyncio.run(paginated.collect())
+
+    assert sorted(fetched) == [1, 2]
+    assert paginated.summary()["pages"] == 2
+
+
+def test_a_failed_later_page_is_skipped(monkeypatch):
+    monkeypatch.setenv("SEARCH_MAX_PAGES", "5")
+    paginated, _ = search("test-skip", failing=(2,))
+
+    payload = asyncio.run(paginated.collect())
+
+    assert [item["id"] for item in payload["data"]["hotels"]] == [0, 1, 2, 5, 6, 7]
+    assert paginated.summary()["page_failures"] == 1
+
+
+def test_a_failed_first_page_raises(monkeypatch):
+    paginated, _ = search("test-first", failing=(1,))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(paginated.collect())
+
+
+def test_concurrent_searches_share_the_provider_limit(monkeypatch):
+    monkeypatch.setenv("SEARCH_PAGE_CONCURRENCY_TEST-SHARED", "2")
+    monkeypatch.setenv("SEARCH_MAX_PAGES", "5")
+    limiter = provider_limiter("test-shared")
+    peak = 0
+
+    async def run():
+        nonlocal peak
+        searches = [search("test-shared", total=15, delay=0.01)[0] for _ in range(3)]
+
+        async def watch():
+            nonlocal peak
+            while True:
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.001)
+
+        watcher = asyncio.ensure_future(watch())
+        await asyncio.gather(*(paginated.collect() for paginated in searches))
+        watcher.cancel()
+
+    asyncio.run(run())
+
+    assert limiter.concurrency == 2
+    assert peak == 2
+    assert limiter.stats["pages_fetched"] == 15
@@ -0,0 +1,61 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from models.trip_models import GenerationMode, TripRequest
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("LLM_BACKEND", "fake")
+    monkeypatch.setenv("FAKE_LLM_LATENCY", "fixed:0")
+    monkeypatch.setenv("FAKE_LLM_CHUNK_DELAY_MS", "0")
+    monkeypatch.setenv("GEMINI_MAX_CONCURRENCY", "4")
+    monkeypatch.setenv("GEMINI_DAYS_PER_CALL", "2")
+    from services.gemini_service import GeminiService
+
+    service = GeminiService()
+    yield service
+    service.executor.shutdown()
+
+
+def trip(days=6):
+    return TripRequest(
+        origin={"name": "Delhi", "city": "Delhi", "state": "Delhi", "country": "India"},
+        destination={"name": "Jaipur", "city": "Jaipur", "state": "Rajasthan", "country": "India"},
+        start_date=date(2025, 10, 1),
+        end_date=date(2025, 10, 1 + days),
+        travelers_count=2,
+        preferences={"themes": ["heritage"], "budget_level": "mid_range", "max_budget": 80000}
+    )
+
+
+def test_fan_out_uses_only_unclaimed_slots(service):
+    assert service._parallel_day_calls(6) == 3
+    assert service._parallel_day_calls(2) == 1
+    service._reserved_calls = 2
+    assert service._parallel_day_calls(6) == 1
+    service._reserved_calls = 3
+    assert service._parallel_day_calls(6) == 0
+
+
+def test_parallel_generation_falls_back_to_one_call_when_slots_are_taken(service):
+    service._reserved_calls = 3
+    itinerary = asyncio.run(service._generate_itinerary(trip(), mode=GenerationMode.PARALLEL))
+    assert itinerary["generated_by"] == "gemini_ai" and len(itinerary["days"]) == 6
+    assert service.telemetry.get_metrics()["itinerary"]["calls"] == 1
+    assert service._reserved_calls == 3
+
+
+def test_concurrent_parallel_generations_do_not_fan_out_past_the_cap(service):
+    async def scenario():
+        requests = [trip(days) for days in (6, 5, 4, 3)]
+        return await asyncio.gather(*(service._generate_itinerary(request, mode=GenerationMode.PARALLEL) for request in requests))
+
+    itineraries = asyncio.run(scenario())
+    assert all(itinerary["generated_by"] == "gemini_ai" for itinerary in itineraries)
+    # The first claims all four slots (overview and three day calls); the others get one call each
+    # rather than the 3 + 3 + 2 more calls that would queue behind it
+    assert service.telemetry.get_metrics()["itinerary"]["calls"] == 4 + 3
+    assert service._reserved_calls == 0
@@ -0,0 +1,86 @@
+import asyncio
+
+from services.reference_data import PrefixIndex, ReferenceDataStore
+
+
+class FakeAmadeus:
+    def __init__(self):
+        self.calls = []
+
+    async def airports(self, query):
+        self.calls.append(("airports", query.keyword))
+        if query.keyword != "Shillong":
+            return {"data": []}
+        return {"data": [{"iataCode": "SHL", "name": "SHILLONG UMROI",
+                          "address": {"cityName": "SHILLONG", "cityCode": "SHL", "countryCode": "IN"},
+                          "geoCode": {"latitude": 25.7, "longitude": 91.98}}]}
+
+    async def airport_routes(self, query):
+        self.calls.append(("routes", query.departure_airport_code))
+        return {"data": [{"iataCode": "DEL"}, {"iataCode": "BOM"}, {"iataCode": "DEL"}]}
+
+
+def test_prefix_search_matches_from_any_word():
+    index = PrefixIndex({
+        "BOM": ["Chhatrapati Shivaji Maharaj International Airport", "Mumbai"],
+        "DEL": ["Indira Gandhi International Airport", "Delhi"],
+        "GOI": ["Dabolim Airport", "Goa"]
+    })
+
+    assert index.search("shivaji") == ["BOM"]
+    assert index.search("  INTERNATIONAL ") == ["BOM", "DEL"]
+    assert index.search("int", limit=1) == ["BOM"]
+    assert index.search("airport") == ["BOM", "DEL", "GOI"]
+    assert index.search("chennai") == []
+    assert index.search("") == []
+
+
+def test_store_looks_up_seed_data_by_code_and_name(tmp_path):
+    store = ReferenceDataStore(snapshot_path=str(tmp_path / "reference.json"))
+    store.load()
+
+    indigo = store.airline("6E")
+    assert indigo is not None and store.airline(indigo["icao"]) == indigo
+    assert store.airport(" del ")["iata"] == "DEL"
+    assert "DEL" in [airport["iata"] for airport in store.search_airports("delhi")]
+
+
+def test_unknown_cities_are_fetched_once_per_ttl_and_persisted(tmp_path):
+    snapshot = tmp_path / "reference.json"
+    client = FakeAmadeus()
+    store = ReferenceDataStore(client=client, snapshot_path=str(snapshot))
+    store.load()
+
+    async def lookups():
+        found = await store.airports_in_city("Shillong")
+        again = await store.airports_in_city("shillong")
+        missing = await store.airports_in_city("Atlantis")
+        missing_again = await store.airports_in_city("Atlantis")
+        return found, again, missing, missing_again
+
+    found, again, missing, missing_again = asyncio.run(lookups())
+
+    assert [airport["iata"] for airport in found] == [airport["iata"] for airport in again] == ["SHL"]
+    assert missing == missing_again == []
+    assert client.calls == [("airports", "Shillong"), ("airports", "Atlantis")]
+
+    reloaded = ReferenceDataStore(snapshot_path=str(snapshot))
+    reloaded.load()
+    assert reloaded.airport("SHL")["city"] == "Shillong"
+    assert [airport["iata"] for airport in reloaded.search_airports("umroi")] == ["SHL"]
+
+
+def test_routes_are_cached_and_served_offline(tmp_path):
+    client = FakeAmadeus()
+    store = ReferenceDataStore(client=client, snapshot_path=str(tmp_path / "reference.json"))
+    store.load()
+
+    async def routes():
+        return await store.routes_from_airport("jai"), await store.routes_from_airport("JAI")
+
+    assert asyncio.run(routes()) == (["BOM", "DEL"], ["BOM", "DEL"])
+    assert client.calls == [("routes", "JAI")]
+
+    store.client = None
+    assert asyncio.run(store.routes_from_airport("JAI")) == ["BOM", "DEL"]
+    assert asyncio.run(store.routes_from_airport("GOI")) is None
@@ -0,0 +1,92 @@
+import asyncio
+import itertools
+from datetime import date
+
+import pytest
+
+from models.trip_models import GenerationMode, TripRequest
+from utils.single_flight import SingleFlight
+
+main = pytest.importorskip("main")
+
+
+def trip(origin_city="Delhi", max_budget=50000, interests=()):
+    return TripRequest(
+        origin={"name": origin_city, "city": origin_city, "state": "-", "country": "India"},
+        destination={"name": "Jaipur", "city": "Jaipur", "state": "Rajasthan", "country": "India"},
+        start_date=date(2025, 10, 1),
+        end_date=date(2025, 10, 3),
+        travelers_count=2,
+        preferences={"themes": ["heritage"], "budget_level": "mid_range", "max_budget": max_budget,
+                     "interests": list(interests)}
+    )
+
+
+class CountingPlanner:
+    def __init__(self):
+        self.calls = 0
+
+    def plan(self, trip_request):
+        self.calls += 1
+        return {"summary": "plan", "days": [], "trip_request": trip_request.dict()}
+
+
+class RecordingFirebase:
+    def __init__(self):
+        self.ids = itertools.count(1)
+        self.saved = []
+
+    async def save_itinerary(self, itinerary, user_id):
+        self.saved.append(itinerary)
+        return f"itinerary-{next(self.ids)}"
+
+
+def test_single_flight_shares_one_execution():
+    async def scenario():
+        flight = SingleFlight()
+        runs = []
+
+        async def work():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+        return runs, results, flight.get_metrics()
+
+    runs, results, metrics = asyncio.run(scenario())
+    assert len(runs) == 1 and results == ["result"] * 5
+    assert metrics["coalesced"] == 4 and metrics["in_flight"] == 0
+
+
+def test_identical_requests_share_generation_but_get_their_own_records():
+    async def scenario():
+        planner, firebase = CountingPlanner(), RecordingFirebase()
+        services = {"planner": planner, "firebase": firebase}
+        results = await asyncio.gather(*(
+            main.generate_itinerary(trip(), GenerationMode.FAST, services) for _ in range(3)
+        ))
+        return planner, firebase, results
+
+    planner, firebase, results = asyncio.run(scenario())
+    assert planner.calls == 1
+    assert len({result["itinerary_id"] for result in results}) == 3
+    # Each caller's record is its own copy
+    assert len({id(itinerary) for itinerary in firebase.saved}) == 3
+
+
+def test_requests_that_differ_anywhere_are_not_coalesced():
+    async def scenario():
+        planner, firebase = CountingPlanner(), RecordingFirebase()
+        services = {"planner": planner, "firebase": firebase}
+        requests = [trip(), trip(origin_city="Mumbai"), trip(max_budget=50500), trip(interests=["museums"])]
+        results = await asyncio.gather(*(
+            main.generate_itinerary(request, GenerationMode.FAST, services) for request in requests
+        ))
+        return planner, results, requests
+
+    planner, results, requests = asyncio.run(scenario())
+    assert planner.calls == 4
+    for result, request in zip(results, requests):
+        assert result["itinerary"]["trip_request"]["origin"]["city"] == request.origin.city
+        assert result["itinerary"]["trip_request"]["preferences"]["max_budget"] == request.preferences.max_budget
@@ -0,0 +1,52 @@
+import time
+import asyncio
+
+import pytest
+
+from services.amadeus_client import BACKGROUND, INTERACTIVE, AmadeusError, RequestScheduler
+
+
+def test_cancelled_waiters_leave_the_queue():
+    async def scenario():
+        scheduler = RequestScheduler(tps=20, burst=1, max_queue=2)
+        await scheduler.acquire()
+        first = asyncio.ensure_future(scheduler.acquire(BACKGROUND))
+        second = asyncio.ensure_future(scheduler.acquire(BACKGROUND))
+        await asyncio.sleep(0)
+        with pytest.raises(AmadeusError):
+            await scheduler.acquire()
+
+        first.cancel()
+        await asyncio.sleep(0)
+        assert scheduler.get_metrics()["queued"] == 1
+        # The freed slot takes a new caller, which still goes before the background one
+        interactive = asyncio.ensure_future(scheduler.acquire(INTERACTIVE))
+        done, _ = await asyncio.wait({interactive, second}, return_when=asyncio.FIRST_COMPLETED)
+        assert done == {interactive}
+        await second
+
+        metrics = scheduler.get_metrics()
+        await scheduler.close()
+        return metrics
+
+    metrics = asyncio.run(scenario())
+    assert metrics["cancelled"] == 1 and metrics["rejected"] == 1
+    assert sum(metrics["dispatched"].values()) == 3
+
+
+def test_cancelled_waiters_do_not_use_up_tokens():
+    async def scenario():
+        scheduler = RequestScheduler(tps=5, burst=1)
+        await scheduler.acquire()
+        abandoned = asyncio.ensure_future(scheduler.acquire())
+        await asyncio.sleep(0)
+        abandoned.cancel()
+        # The dispatcher gets the next token after 200 ms and keeps it for the next caller
+        await asyncio.sleep(0.25)
+        started = time.monotonic()
+        await scheduler.acquire()
+        waited = time.monotonic() - started
+        await scheduler.close()
+        return waited
+
+    assert asyncio.run(scenario()) < 0.1
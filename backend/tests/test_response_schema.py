@@ -0,0 +1,74 @@
+from typing import Any, Dict, List, Optional
+
+import pytest
+from pydantic import BaseModel
+
+from services.response_schema import ITINERARY_RESPONSE_SCHEMA, SchemaMismatchError, model_schema, validate_itinerary
+
+ACTIVITY = {
+    "name": "Amber Fort", "description": "Hilltop fort", "category": "Heritage", "duration_hours": 3,
+    "cost_per_person": 500, "rating": 4.7, "location": "Amer", "image_url": "", "themes": [], "interests": []
+}
+
+
+def itinerary(days):
+    return {
+        "summary": "Three days in Jaipur",
+        "days": days,
+        "accommodation": [],
+        "transportation": [],
+        "total_cost": 3000,
+        "budget_breakdown": {"activities": 3000},
+        "cultural_insights": [],
+        "safety_tips": [],
+        "local_recommendations": []
+    }
+
+
+def day(date, activities):
+    return {"date": date, "activities": activities, "meals": [], "transportation": [], "total_daily_cost": 1000}
+
+
+class Notes(BaseModel):
+    title: str
+    rank: Optional[int] = None
+    extras: Optional[Dict[str, Any]] = None
+    anything: Optional[Any] = None
+    tags: List[str]
+    blobs: List[Dict[str, Any]] = []
+
+
+def test_optional_free_form_fields_are_left_out_of_the_schema():
+    assert model_schema(Notes) == {
+        "type": "OBJECT",
+        "properties": {
+            "title": {"type": "STRING"},
+            "rank": {"type": "INTEGER", "nullable": True},
+            "tags": {"type": "ARRAY", "items": {"type": "STRING"}}
+        },
+        "required": ["title", "tags"]
+    }
+
+
+def test_itinerary_schema_names_options_and_skips_computed_fields():
+    properties = ITINERARY_RESPONSE_SCHEMA["properties"]
+    day_properties = properties["days"]["items"]["properties"]
+
+    assert "total_cost" not in properties and "budget_breakdown" not in properties
+    assert day_properties["activities"]["items"]["required"] == ["name", "time_slot"]
+    assert "transportation" not in day_properties
+
+
+def test_valid_itinerary_passes():
+    assert validate_itinerary(itinerary([day("2025-10-01", [ACTIVITY])])).days[0].activities[0].name == "Amber Fort"
+
+
+def test_mismatches_are_reported_with_list_indexes_collapsed():
+    bad_activity = {**ACTIVITY, "cost_per_person": "free"}
+    data = itinerary([day("2025-10-01", [ACTIVITY, bad_activity]), day("2025-10-02", [bad_activity])])
+    del data["summary"]
+
+    with pytest.raises(SchemaMismatchError) as error:
+        validate_itinerary(data)
+
+    assert error.value.fields == ["days.*.activities.*.cost_per_person", "summary"]
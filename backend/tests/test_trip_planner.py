@@ -0,0 +1,56 @@
+from datetime import date
+
+from models.trip_models import TripRequest
+from services.trip_planner import allocate_days, estimate_meal_cost, plan_itinerary
+
+ACTIVITIES = [
+    {"name": "Fort", "category": "Heritage", "duration_hours": 3, "cost_per_person": 1500, "rating": 4.8, "themes": ["Heritage"]},
+    {"name": "Market walk", "category": "Shopping", "duration_hours": 2, "cost_per_person": 0, "rating": 4.2, "themes": ["Shopping"]},
+    {"name": "Museum", "category": "Heritage", "duration_hours": 2, "cost_per_person": 500, "rating": 4.5, "themes": ["Heritage"]}
+]
+RESTAURANTS = [
+    {"name": "Palace Dining", "cuisine": "Rajasthani", "price_range": "₹₹₹₹", "rating": 4.9},
+    {"name": "Dhaba", "cuisine": "North Indian", "price_range": "₹", "rating": 4.0}
+]
+FLIGHTS = [{"airline": "IndiGo", "price": 4000}, {"airline": "Air India", "price": 9000}]
+STAYS = [{"name": "Haveli", "cost_per_night": 3000}, {"name": "Palace", "cost_per_night": 20000}]
+
+
+def trip(max_budget, travelers=2, days=3):
+    return TripRequest(
+        origin={"name": "Delhi", "city": "Delhi", "state": "Delhi", "country": "India"},
+        destination={"name": "Jaipur", "city": "Jaipur", "state": "Rajasthan", "country": "India"},
+        start_date=date(2025, 10, 1),
+        end_date=date(2025, 10, 1 + days),
+        travelers_count=travelers,
+        preferences={"themes": ["heritage"], "budget_level": "mid_range", "max_budget": max_budget}
+    )
+
+
+def test_generous_budget_books_full_days():
+    itinerary = plan_itinerary(trip(200000), ACTIVITIES, STAYS, FLIGHTS, RESTAURANTS)
+    assert itinerary["within_budget"]
+    assert all(len(day["meals"]) == 2 for day in itinerary["days"])
+
+
+def test_tight_budget_drops_meals_and_activities_instead_of_overspending():
+    # Flight and stay take 2 * 4000 + 3 * 3000 = 17000, leaving 1000 for three days
+    itinerary = plan_itinerary(trip(18000), ACTIVITIES, STAYS, FLIGHTS, RESTAURANTS)
+    assert itinerary["total_cost"] <= 18000
+    assert itinerary["within_budget"]
+    assert all(item["cost_per_person"] == 0 for day in itinerary["days"] for item in day["activities"])
+
+
+def test_allowance_is_never_exceeded_per_day_with_rollover():
+    plan = allocate_days(ACTIVITIES, RESTAURANTS, 4, {"themes": ["heritage"]}, travelers_count=1, daily_allowance=700)
+    spent = 0
+    for index, day in enumerate(plan, start=1):
+        spent += sum(estimate_meal_cost(item) for item in day["meals"])
+        spent += sum(item["cost_per_person"] for item in day["activities"])
+        assert spent <= 700 * index
+
+
+def test_essentials_over_budget_are_reported():
+    itinerary = plan_itinerary(trip(5000), ACTIVITIES, STAYS, FLIGHTS, RESTAURANTS)
+    assert not itinerary["within_budget"]
+    assert all(not day["meals"] and all(item["cost_per_person"] == 0 for item in day["activities"]) for day in itinerary["days"])
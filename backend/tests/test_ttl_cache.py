@@ -0,0 +1,26 @@
+from services.ttl_cache import TTLCache
+
+
+def test_ttl_expiry_and_lru_eviction(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("services.ttl_cache.time.time", lambda: now[0])
+    cache = TTLCache(max_entries=2, ttl_seconds=10)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}
+    cache.set("c", {"v": 3})  # evicts b, the least recently used
+    assert cache.get("b") is None
+    now[0] += 11
+    assert cache.get("a") is None
+    metrics = cache.get_metrics()
+    assert metrics["evictions"] == 1 and metrics["expirations"] == 1
+
+
+def test_values_are_copied(tmp_path):
+    cache = TTLCache(max_entries=4, ttl_seconds=60, disk_dir=str(tmp_path))
+    value = {"days": [1]}
+    cache.set("k" * 64, value)
+    value["days"].append(2)
+    assert cache.get("k" * 64) == {"days": [1]}
+    # A fresh instance reads the disk tier
+    assert TTLCache(max_entries=4, ttl_seconds=60, disk_dir=str(tmp_path)).get("k" * 64) == {"days": [1]}
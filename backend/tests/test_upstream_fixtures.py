@@ -0,0 +1,34 @@
+import pytest
+
+from services import upstream_fixtures
+from services.metrics import LatencyDistribution
+
+
+def test_shared_fixtures_read_the_environment_on_first_use(monkeypatch, tmp_path):
+    monkeypatch.setattr(upstream_fixtures, "_shared", None)
+    monkeypatch.setenv("UPSTREAM_MODE", "replay")
+    monkeypatch.setenv("UPSTREAM_FIXTURES_DIR", str(tmp_path))
+
+    fixtures = upstream_fixtures.get_upstream_fixtures()
+
+    assert fixtures.replaying
+    assert fixtures.fixtures_dir == tmp_path
+    assert upstream_fixtures.get_upstream_fixtures() is fixtures
+
+
+def test_replay_serves_the_recorded_response_for_equal_params(tmp_path):
+    fixtures = upstream_fixtures.UpstreamFixtures(mode="replay", fixtures_dir=str(tmp_path), strict=True)
+    recorder = upstream_fixtures.UpstreamFixtures(mode="record", fixtures_dir=str(tmp_path))
+    recorder.record("amadeus/v1_test", {"city": "JAI", "page": 1}, {"data": [1]})
+
+    body, delay = fixtures.lookup("amadeus/v1_test", {"page": "1", "city": " JAI ", "empty": ""})
+
+    assert body == {"data": [1]}
+    assert delay == 0
+    with pytest.raises(upstream_fixtures.UpstreamFixtureMissing):
+        fixtures.lookup("amadeus/v1_test", {"city": "DEL"})
+
+
+def test_latency_distribution_rejects_unknown_specs():
+    with pytest.raises(ValueError):
+        LatencyDistribution("poisson:3")
@@ -0,0 +1,170 @@
+import re
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+_FENCE_OPEN = re.compile(r"```[ \t]*[A-Za-z0-9_-]*[ \t]*\r?\n?")
+_CLOSERS = {"{": "}", "[": "]"}
+_LITERAL_END = set(",}]: \t\r\n")
+
+
+class JSONExtractionError(ValueError):
+    """Raised when no usable JSON value can be recovered from model output"""
+
+
+def strip_code_fences(text: str) -> str:
+    """Return the body of the first markdown code fence, or the text unchanged"""
+    match = _FENCE_OPEN.search(text)
+    if not match:
+        return text
+    end = text.find("```", match.end())
+    return text[match.end():end] if end != -1 else text[match.end():]
+
+
+def repair_json(text: str) -> str:
+    """Drop trailing commas and close anything a truncated response left open"""
+    return _repair(text)[0]
+
+
+def extract_json(text: str) -> Any:
+    """Parse the JSON value embedded in a model response"""
+    return _extract(text)[0]
+
+
+def extract_itinerary(text: str) -> Tuple[Dict[str, Any], bool]:
+    """Parse an itinerary response, salvaging the complete days of a truncated one.
+
+    Returns the itinerary and whether it was truncated. When the output was
+    cut off inside a ``days`` entry, that partial day is dropped so only
+    fully generated days are kept.
+    """
+    data, open_path = _extract(text)
+    if not isinstance(data, dict):
+        raise JSONExtractionError("Itinerary response is not a JSON object")
+
+    truncated = open_path is not None
+    if truncated and len(open_path) >= 2 and open_path[0] == "days" and isinstance(data.get("days"), list):
+        # The cut happened inside days[open_path[1]], so that entry is incomplete
+        del data["days"][open_path[1]:]
+
+    return data, truncated
+
+
+def _extract(text: str) -> Tuple[Any, Optional[List[Any]]]:
+    candidate = strip_code_fences(text).strip()
+    try:
+        return json.loads(candidate), None
+    except json.JSONDecodeError:
+        pass
+
+    starts = [idx for idx in (candidate.find("{"), candidate.find("[")) if idx != -1]
+    if not starts:
+        raise JSONExtractionError("No JSON value found in response")
+
+    start = min(starts)
+    try:
+        # Well-formed JSON followed by prose
+        return json.JSONDecoder().raw_decode(candidate, start)[0], None
+    except json.JSONDecodeError:
+        pass
+
+    repaired, open_path = _repair(candidate[start:])
+    try:
+        return json.loads(repaired), open_path
+    except json.JSONDecodeError as e:
+        raise JSONExtractionError(f"Unrecoverable JSON in response: {str(e)}")
+
+
+def _repair(text: str) -> Tuple[str, Optional[List[Any]]]:
+    """Single pass over ``text`` that removes trailing commas and, if the
+    input ends early, rolls back to the last complete value and closes the
+    containers that are still open.
+
+    Returns the repaired text and, when truncated, the path of keys and
+    indexes leading into the innermost container left open at the cut.
+    """
+    out: List[str] = []
+    # Each frame is [opener, state, current key, element index]
+    stack: List[List[Any]] = []
+    in_string = False
+    escape = False
+    string_start = 0
+    in_literal = False
+    safe: Optional[Tuple[int, List[str], List[Any]]] = None
+
+    def mark_safe():
+        nonlocal safe
+        closers = [_CLOSERS[frame[0]] for frame in reversed(stack)]
+        path = [frame[2] if frame[0] == "{" else frame[3] for frame in stack[:-1]]
+        safe = (len(out), closers, path)
+
+    def value_done():
+        if stack:
+            stack[-1][1] = "comma"
+        mark_safe()
+
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+                if stack and stack[-1][0] == "{" and stack[-1][1] == "key":
+                    stack[-1][2] = json.loads("".join(out[string_start:]))
+                    stack[-1][1] = "colon"
+                else:
+                    value_done()
+            continue
+
+        if in_literal and ch in _LITERAL_END:
+            in_literal = False
+            value_done()
+
+        if ch == '"':
+            in_string = True
+            string_start = len(out)
+            out.append(ch)
+        elif ch in "{[":
+            stack.append([ch, "key" if ch == "{" else "value", None, 0])
+            out.append(ch)
+            mark_safe()
+        elif ch in "}]":
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if not stack:
+                break
+            out.append(_CLOSERS[stack.pop()[0]])
+            if not stack:
+                return "".join(out), None
+            value_done()
+        elif ch == ",":
+            out.append(ch)
+            if stack:
+                frame = stack[-1]
+                frame[1] = "key" if frame[0] == "{" else "value"
+                if frame[0] == "[":
+                    frame[3] += 1
+        elif ch == ":":
+            out.append(ch)
+            if stack:
+                stack[-1][1] = "value"
+        elif ch.isspace():
+            out.append(ch)
+        else:
+            in_literal = True
+            out.append(ch)
+
+    if not stack:
+        return "".join(out), None
+    if safe is None:
+        raise JSONExtractionError("Response ended before any complete JSON value")
+
+    length, closers, path = safe
+    repaired = "".join(out[:length]).rstrip()
+    if repaired.endswith(","):
+        repaired = repaired[:-1]
+    return repaired + "".join(closers), path
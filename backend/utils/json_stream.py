@@ -0,0 +1,109 @@
+import json
+import logging
+from typing import Any, List, Tuple
+
+from utils.json_extractor import JSONExtractionError, repair_json
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ItineraryStreamParser:
+    """Incrementally scans a streamed itinerary JSON object.
+
+    Text is fed in arbitrary chunks. Whenever a top-level field finishes, a
+    ``(field_name, value)`` event is produced; entries of the ``days`` array
+    are produced individually as ``("day", value)`` as soon as each one
+    closes, before the rest of the array has arrived. Anything before the
+    first ``{`` (prose, markdown fences) is ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.finished = False
+
+        self._pos = 0
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._current_key = None
+        self._expecting_key = True
+        self._value_start = None
+        self._item_start = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk of text and return the events it completed"""
+        if self.finished:
+            return []
+
+        self.buffer += chunk
+        events = []
+        buf = self.buffer
+
+        for i in range(self._pos, len(buf)):
+            ch = buf[i]
+
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expecting_key:
+                        self._current_key = buf[self._string_start + 1:i]
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+                if self._depth == 1 and not self._expecting_key and self._value_start is None:
+                    self._value_start = i
+            elif ch == ":" and self._depth == 1:
+                self._expecting_key = False
+            elif ch in "{[":
+                if self._depth == 1 and self._value_start is None:
+                    self._value_start = i
+                self._depth += 1
+                if ch == "{" and self._depth == 3 and self._current_key == "days":
+                    self._item_start = i
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 2 and self._item_start is not None:
+                    self._emit(events, "day", buf[self._item_start:i + 1])
+                    self._item_start = None
+                elif self._depth == 0:
+                    self._finish_value(events, buf, i)
+                    self.finished = True
+                    self._pos = i + 1
+                    return events
+            elif ch == "," and self._depth == 1:
+                self._finish_value(events, buf, i)
+            elif self._depth == 1 and not self._expecting_key and self._value_start is None and not ch.isspace():
+                # Bare literal such as a number, true/false or null
+                self._value_start = i
+
+        self._pos = len(buf)
+        return events
+
+    def _finish_value(self, events: List[Tuple[str, Any]], buf: str, end: int):
+        if self._current_key is not None and self._value_start is not None:
+            self._emit(events, self._current_key, buf[self._value_start:end].strip())
+        self._current_key = None
+        self._value_start = None
+        self._expecting_key = True
+
+    def _emit(self, events: List[Tuple[str, Any]], name: str, text: str):
+        try:
+            events.append((name, json.loads(repair_json(text))))
+        except (json.JSONDecodeError, JSONExtractionError) as e:
+            logger.warning(f"Skipping malformed streamed field '{name}': {str(e)}")
@@ -0,0 +1,53 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key onto a single execution.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it is running wait on the same task and receive the same
+    result or exception. The work is shielded, so one caller going away
+    (e.g. a dropped connection) does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._calls = 0
+        self._executions = 0
+        self._coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn()`` for ``key`` unless an identical call is already running"""
+        self._calls += 1
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._coalesced += 1
+            logger.info(f"Coalescing request onto in-flight call {key[:12]}")
+        else:
+            self._executions += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved even if every waiter has gone away
+        if not task.cancelled():
+            task.exception()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return how many calls ran and how many were coalesced"""
+        return {
+            "calls": self._calls,
+            "executions": self._executions,
+            "coalesced": self._coalesced,
+            "in_flight": len(self._in_flight)
+        }